@@ -0,0 +1,67 @@
+"""Formato de los IDs de detección, compartido por el detector y el procesador.
+
+Un ID es "<hora>-<cámara>-<objeto>" (o "<hora>-<cámara>" para las imágenes),
+con la hora en milisegundos desde la época codificada en TIME_LENGTH
+caracteres base32 de Crockford. Como la hora va primero y tiene largo fijo,
+el orden lexicográfico de los IDs es su orden por hora.
+
+Solo usa la biblioteca estándar: en los contenedores la carpeta se monta
+como /app/common junto al código de cada servicio.
+"""
+from typing import Tuple
+
+
+# Alfabeto base32 de Crockford: sin I, L, O ni U, y ordenado igual que los valores
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Caracteres del componente de tiempo: 10 x 5 bits = 50 bits de milisegundos
+TIME_LENGTH = 10
+
+SEPARATOR = "-"
+
+
+def encode_base32(value: int, length: int = None) -> str:
+    """Codifica un entero no negativo en base32 de Crockford.
+
+    args:
+        value (int): Valor a codificar.
+        length (int, optional): Largo fijo, con ceros a la izquierda. Por defecto el mínimo necesario.
+    returns:
+        str: Valor codificado.
+    """
+    characters = []
+    while value or not characters or (length is not None and len(characters) < length):
+        characters.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(characters))
+
+
+def decode_base32(text: str) -> int:
+    value = 0
+    for character in text.upper():
+        value = (value << 5) | ALPHABET.index(character)
+    return value
+
+
+def time_prefix(seconds: float) -> str:
+    """Componente de tiempo de un ID: milisegundos desde la época, de largo fijo."""
+    return encode_base32(int(seconds * 1000), TIME_LENGTH)
+
+
+def time_range(start: float, end: float) -> Tuple[str, str]:
+    """Límites para recorrer por rango de tiempo un índice ordenado por ID.
+
+    Un ID con hora en [start, end) cumple `lower <= id < upper`.
+
+    args:
+        start (float): Hora inicial, en segundos desde la época.
+        end (float): Hora final (excluida), en segundos desde la época.
+    returns:
+        Tuple[str, str]: Límites inferior y superior.
+    """
+    return time_prefix(start), time_prefix(end)
+
+
+def is_sortable_id(detection_id: str) -> bool:
+    """Indica si el ID tiene el formato ordenable por hora; los IDs anteriores eran un timestamp seguido del objeto."""
+    return len(detection_id) > TIME_LENGTH and detection_id[TIME_LENGTH] == SEPARATOR
@@ -0,0 +1,347 @@
+"""Elige los pesos, el tamaño de inferencia y el backend de una cámara para esta máquina.
+
+Uso (desde la carpeta detector/):
+    python autotune.py --camara-id 1 --fps 10
+    python autotune.py --camara-id 1 --fps 10 --latency 80 --video muestra.mp4 --dry-run
+
+Lee cuadros de muestra de la cámara (o de `--video`) con su captura y su
+región de interés, y mide cada combinación de pesos en weights/, tamaño y
+backend con lote 1 sobre esos cuadros, igual que el detector.
+
+No hay etiquetas en los cuadros de la cámara, por lo que la exactitud se
+estima como la coincidencia (F1 con IoU >= 0.5 y la misma clase) con la
+configuración de referencia: los pesos más grandes al mayor tamaño con
+PyTorch. Entre las combinaciones que cumplen los FPS y la latencia p95
+objetivo se elige la de mayor coincidencia y, entre las que están a menos
+de `--tolerance` de ella, la más rápida. El resultado se escribe en las
+llaves weights, size y backend de la cámara en camera_config.json.
+
+Las exportaciones ONNX y OpenVINO quedan guardadas junto a los pesos, de
+modo que el detector reutiliza la elegida al iniciar. Dentro de cada pesos
+y backend los tamaños se miden de menor a mayor y se dejan de medir en
+cuanto uno no alcanza el objetivo.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from camera_controller import CONFIG_FILE, get_registry, update_camera_config
+from config import BASE_DIR
+from modules.model_loader import BACKENDS, ModelLoader, preload
+from modules.region import RegionOfInterest
+from tools import messages
+from tools.cpu_quota import configure_capture_threads, configure_torch_threads
+from tools.video_info import VideoInfo
+
+
+# Tamaños de inferencia candidatos, múltiplos de 32
+SIZES = (320, 416, 512, 640, 768, 960, 1280)
+
+
+def sample_frames(source_info: VideoInfo, frames: int, every: int) -> List[np.array]:
+    """Lee `frames` cuadros de la captura abierta, uno de cada `every`, para cubrir más escenas.
+
+    args:
+        source_info (VideoInfo): Información de la fuente con la captura abierta.
+        frames (int): Cuadros de muestra.
+        every (int): Paso entre cuadros de muestra.
+    returns:
+        List[np.array]: Cuadros leídos; menos de `frames` si el video termina antes.
+    """
+    capture = source_info.capture
+    images = []
+    read_count = 0
+    while len(images) < frames:
+        success, image = capture.read()
+        if not success:
+            break
+        if read_count % every == 0:
+            images.append(image.copy())
+        read_count += 1
+    capture.release()
+    source_info.capture = None
+    return images
+
+
+def boxes(results) -> Tuple[np.array, np.array, np.array]:
+    """Cajas, clases y confianzas de un resultado de ultralytics como arreglos de numpy."""
+    return results.boxes.xyxy.cpu().numpy(), results.boxes.cls.cpu().numpy().astype(int), results.boxes.conf.cpu().numpy()
+
+
+def box_iou(boxes_a: np.array, boxes_b: np.array) -> np.array:
+    """IoU entre cada caja de `boxes_a` y cada caja de `boxes_b`, en formato xyxy."""
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return intersection / np.maximum(area_a[:, None] + area_b[None, :] - intersection, 1e-9)
+
+
+def agreement(reference: list, candidate: list, iou_threshold: float = 0.5) -> float:
+    """Coincidencia F1 de las detecciones de un candidato con las de la referencia.
+
+    Cada detección de la referencia se empareja como máximo con una del
+    candidato de la misma clase, de mayor a menor IoU.
+
+    args:
+        reference (list): Cajas y clases (xyxy, cls, ...) de la referencia en cada cuadro.
+        candidate (list): Cajas y clases del candidato en los mismos cuadros.
+        iou_threshold (float, optional): IoU mínimo para emparejar. Por defecto es 0.5.
+    returns:
+        float: F1 entre 0 y 1; 1 si ninguno detecta nada.
+    """
+    matched, reference_total, candidate_total = 0, 0, 0
+    for reference_frame, candidate_frame in zip(reference, candidate):
+        (reference_xyxy, reference_cls), (candidate_xyxy, candidate_cls) = reference_frame[:2], candidate_frame[:2]
+        reference_total += len(reference_xyxy)
+        candidate_total += len(candidate_xyxy)
+        if len(reference_xyxy) == 0 or len(candidate_xyxy) == 0:
+            continue
+
+        iou = box_iou(reference_xyxy, candidate_xyxy)
+        iou[reference_cls[:, None] != candidate_cls[None, :]] = 0
+        for index in np.argsort(-iou, axis=None):
+            reference_index, candidate_index = np.unravel_index(index, iou.shape)
+            if iou[reference_index, candidate_index] < iou_threshold:
+                break
+            matched += 1
+            iou[reference_index, :] = 0
+            iou[:, candidate_index] = 0
+
+    if reference_total + candidate_total == 0:
+        return 1.0
+    return 2 * matched / (reference_total + candidate_total)
+
+
+def measure(weights: Path, backend: str, image_size: int, images: List[np.array], confidence: float, classes: List[int], batch: int = 1) -> dict:
+    """Mide la latencia por cuadro de una combinación y guarda sus detecciones.
+
+    args:
+        weights (Path): Pesos `.pt`.
+        backend (str): Backend de ModelLoader.
+        image_size (int): Tamaño de inferencia de las imágenes.
+        images (List[np.array]): Cuadros o recortes de la región de interés.
+        confidence (float): Umbral de confianza de la cámara.
+        classes (List[int]): Clases de la cámara.
+        batch (int, optional): Lote del modelo; con OpenVINO y lote mayor a 1 se
+            mide el modelo de lote dinámico con una imagen por inferencia. Por defecto es 1.
+    returns:
+        dict: Latencias p50 y p95 en ms, FPS y detecciones (xyxy, cls, conf) de cada imagen.
+    """
+    model = ModelLoader(weights_path=str(weights), image_size=image_size, confidence=confidence, class_filter=classes, backend=backend, batch=batch)
+    model.warmup()
+
+    latencies, detections = [], []
+    for image in images:
+        time_start = time.perf_counter()
+        results = model.detect(image)
+        latencies.append(time.perf_counter() - time_start)
+        detections.append(boxes(results))
+
+    latencies.sort()
+    return {
+        "latency_ms_p50": 1000 * statistics.median(latencies),
+        "latency_ms_p95": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        "fps": len(latencies) / sum(latencies),
+        "detections": detections,
+    }
+
+
+def meets_target(result: dict, target_fps: float, max_latency_ms: float) -> bool:
+    return result["fps"] >= target_fps and result["latency_ms_p95"] <= max_latency_ms
+
+
+def choose(candidates: List[dict], target_fps: float, max_latency_ms: float, tolerance: float = 0.01) -> dict:
+    """Elige la combinación más exacta que cumple el objetivo.
+
+    args:
+        candidates (List[dict]): Combinaciones medidas con `score`, `fps` y `latency_ms_p95`.
+        target_fps (float): FPS mínimos.
+        max_latency_ms (float): Latencia p95 máxima en milisegundos.
+        tolerance (float, optional): Diferencia de coincidencia que se considera
+            empate; entre empatadas se elige la más rápida. Por defecto es 0.01.
+    returns:
+        dict: Combinación elegida, o None si ninguna cumple el objetivo.
+    """
+    feasible = [candidate for candidate in candidates if meets_target(candidate, target_fps, max_latency_ms)]
+    if not feasible:
+        return None
+    best_score = max(candidate["score"] for candidate in feasible)
+    return max((candidate for candidate in feasible if candidate["score"] >= best_score - tolerance), key=lambda candidate: candidate["fps"])
+
+
+def config_path(weights: Path) -> str:
+    """Ruta de los pesos como se escribe en camera_config.json: relativa a la carpeta del detector si está dentro."""
+    try:
+        return weights.resolve().relative_to(BASE_DIR.resolve()).as_posix()
+    except ValueError:
+        return str(weights.resolve())
+
+
+def main(
+    camera_id: str,
+    weights: List[str],
+    sizes: List[int],
+    backends: List[str],
+    target_fps: float,
+    max_latency_ms: float,
+    frames: int,
+    every: int,
+    video: str,
+    tolerance: float,
+    dry_run: bool,
+    config_file: str
+) -> dict:
+    step_count = iter(range(1, 100))
+    camera_config = get_registry(config_file).get(camera_id)
+    classes = camera_config["clases"]
+    confidence = float(camera_config.get("confidence", 0.5))
+
+    # Los mismos hilos y la misma captura que usa el detector de la cámara
+    thread_settings = configure_capture_threads(camera_config.get("threads"))
+    configure_torch_threads(thread_settings["threads"])
+    capture_options = dict(camera_config.get("capture") or {})
+    if capture_options.get("backend") == "ffmpeg":
+        capture_options.setdefault("threads", thread_settings["threads"])
+    source_info = VideoInfo(source=video or camera_config["url"], keep_open=True, capture_options=capture_options)
+    preload()
+
+    target_fps = target_fps or float((camera_config.get("rate") or {}).get("target_fps", 0)) or source_info.fps
+    max_latency_ms = max_latency_ms or 1000 / target_fps
+    messages.step_message(next(step_count), f"Objetivo: {target_fps:g} FPS y latencia p95 <= {max_latency_ms:.0f} ms · Hilos: {thread_settings['threads']}")
+
+    images = sample_frames(source_info, frames, every)
+    if not images:
+        raise Exception('Source video not available ❌')
+    region = camera_config.get("region")
+    region_of_interest = RegionOfInterest(polygon=source_info.scale_polygon(region), resolution_wh=source_info.resolution_wh) if region else None
+    if region_of_interest is not None:
+        images = [region_of_interest.crop(image) for image in images]
+    messages.step_message(next(step_count), f"{len(images)} cuadros de muestra de {source_info.width} x {source_info.height}{' (región de interés)' if region_of_interest is not None else ''} ✅")
+
+    # Tamaños útiles: no mayores que el cuadro, redondeado a múltiplo de 32
+    max_frame_size = 32 * -(-max(source_info.resolution_wh) // 32)
+    sizes = sorted({size for size in sizes if size <= max_frame_size}) or [max_frame_size]
+    weights = sorted((Path(path) for path in weights), key=lambda path: path.stat().st_size, reverse=True)
+
+    def inference_size(size: int) -> int:
+        return region_of_interest.inference_size(size) if region_of_interest is not None else size
+
+    # Referencia de exactitud: los pesos más grandes al mayor tamaño con PyTorch
+    reference_key = (weights[0], "pt", inference_size(sizes[-1]))
+    messages.step_message(next(step_count), f"Referencia: {weights[0].name} {sizes[-1]} px (pt)")
+    measured = {reference_key: measure(weights[0], "pt", reference_key[2], images, confidence, classes)}
+    reference = measured[reference_key]["detections"]
+
+    candidates = []
+    for weights_path in weights:
+        for backend in backends:
+            for size in sizes:
+                key = (weights_path, backend, inference_size(size))
+                if any(candidate["key"] == key for candidate in candidates):
+                    # Con región de interés varios tamaños pueden dar la misma inferencia
+                    continue
+                try:
+                    result = measured.get(key) or measure(weights_path, backend, key[2], images, confidence, classes)
+                except Exception as e:
+                    messages.step_message("Error", f"{weights_path.name} {size} px ({backend}): {e}")
+                    break
+
+                candidate = {
+                    "key": key,
+                    "weights": config_path(weights_path),
+                    "backend": backend,
+                    "size": size,
+                    "inference_size": key[2],
+                    "latency_ms_p50": result["latency_ms_p50"],
+                    "latency_ms_p95": result["latency_ms_p95"],
+                    "fps": result["fps"],
+                    "score": agreement(reference, result["detections"]),
+                    "detections": sum(len(detection[1]) for detection in result["detections"]),
+                }
+                candidates.append(candidate)
+                messages.autotune_message(candidate, meets_target(candidate, target_fps, max_latency_ms))
+
+                # Un tamaño mayor será más lento: no seguir con estos pesos y backend
+                if not meets_target(candidate, target_fps, max_latency_ms):
+                    break
+
+    for candidate in candidates:
+        del candidate["key"]
+    report = {
+        "camera_id": camera_id,
+        "target_fps": target_fps,
+        "max_latency_ms": max_latency_ms,
+        "frames": len(images),
+        "candidates": candidates,
+        "chosen": choose(candidates, target_fps, max_latency_ms, tolerance),
+    }
+
+    chosen = report["chosen"]
+    if chosen is None:
+        fastest = max(candidates, key=lambda candidate: candidate["fps"], default=None)
+        messages.step_message("Error", f"Ninguna combinación cumple el objetivo; la más rápida es {fastest['weights']} {fastest['size']} px ({fastest['backend']}) con {fastest['fps']:.1f} FPS" if fastest else "Ninguna combinación se pudo medir")
+        return report
+
+    messages.step_message(next(step_count), f"Elegido: {chosen['weights']} {chosen['size']} px ({chosen['backend']}) · {chosen['fps']:.1f} FPS · p95 {chosen['latency_ms_p95']:.1f} ms · coincidencia {chosen['score']:.2f}")
+    if dry_run:
+        return report
+
+    update_camera_config(camera_id, {"weights": chosen["weights"], "size": chosen["size"], "backend": chosen["backend"]}, path=config_file)
+    messages.step_message(next(step_count), f"{Path(config_file).name}: cámara {camera_id} actualizada; reinicie su detector para aplicar ✅")
+
+    # El modo en lote exige los mismos pesos y backend en todas sus cámaras
+    others = [
+        other_id for other_id, other_config in get_registry(config_file).cameras.items()
+        if other_id != camera_id and (other_config.get("weights", 'weights/tunel_yolo11n.pt'), other_config.get("backend", "pt")) != (chosen["weights"], chosen["backend"]) ]
+    if others:
+        messages.step_message("Aviso", f"Las cámaras {', '.join(others)} usan otros pesos o backend y no se pueden procesar en lote con la {camera_id}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--camara-id', type=str, required=True, help='id de la cámara en camera_config.json')
+    parser.add_argument('--fps', type=float, default=None, help='FPS objetivo; por defecto rate.target_fps de la cámara o los FPS de la fuente')
+    parser.add_argument('--latency', type=float, default=None, help='latencia p95 máxima en ms; por defecto 1000 / FPS objetivo')
+    parser.add_argument('--weights', nargs='+', default=None, help='pesos .pt a comparar; por defecto todos los de weights/')
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES), help='tamaños de inferencia a comparar')
+    parser.add_argument('--backends', nargs='+', default=[backend for backend in BACKENDS if backend != "openvino_int8"], choices=BACKENDS, help='backends a comparar; openvino_int8 requiere quantize.py')
+    parser.add_argument('--frames', type=int, default=50, help='cuadros de muestra')
+    parser.add_argument('--every', type=int, default=5, help='paso entre cuadros de muestra')
+    parser.add_argument('--video', type=str, default=None, help='video local en lugar de la cámara')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='diferencia de coincidencia considerada empate')
+    parser.add_argument('--config', type=str, default=CONFIG_FILE, help='archivo de configuración de las cámaras')
+    parser.add_argument('--dry-run', action='store_true', help='solo mostrar el resultado, sin escribir la configuración')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    weights = option.weights or sorted(str(path) for path in BASE_DIR.joinpath("weights").glob("*.pt"))
+    if not weights:
+        parser.error("no hay pesos .pt en weights/; indíquelos con --weights")
+
+    report = main(
+        camera_id=option.camara_id,
+        weights=weights,
+        sizes=option.sizes,
+        backends=option.backends,
+        target_fps=option.fps,
+        max_latency_ms=option.latency,
+        frames=option.frames,
+        every=option.every,
+        video=option.video,
+        tolerance=option.tolerance,
+        dry_run=option.dry_run,
+        config_file=option.config )
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if report["chosen"] is not None else 1)
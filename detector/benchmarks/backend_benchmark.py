@@ -0,0 +1,107 @@
+"""Compara la latencia y el rendimiento en CPU de los backends de ModelLoader.
+
+Uso (desde la carpeta detector/):
+    python -m benchmarks.backend_benchmark --weights weights/tunel_yolo11n.pt --video muestra.mp4 --size 352
+
+Para cada backend se exporta (o reutiliza) el modelo con tamaño fijo, se
+calienta y se mide la latencia por cuadro con lote 1 y el rendimiento con un
+lote de `--batch` imágenes. El tiempo de carga incluye la exportación si no
+existía en caché.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.model_loader import ModelLoader, BACKENDS
+
+
+def read_frames(video: str, frames: int) -> list:
+    """Lee los primeros cuadros del video, o genera cuadros aleatorios si no se indica video."""
+    if video is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(frames)]
+
+    capture = cv2.VideoCapture(video)
+    images = []
+    while len(images) < frames:
+        success, image = capture.read()
+        if not success:
+            break
+        images.append(image)
+    capture.release()
+    return images
+
+
+def run(backend: str, weights: str, size: int, batch: int, images: list) -> dict:
+    """Mide un backend: carga, latencia con lote 1 y cuadros por segundo en lote."""
+    time_start = time.perf_counter()
+    model = ModelLoader(weights_path=weights, image_size=size, confidence=0.25, backend=backend)
+    model.warmup()
+    load_time = time.perf_counter() - time_start
+
+    latencies = []
+    for image in images:
+        time_start = time.perf_counter()
+        model.detect(image)
+        latencies.append(time.perf_counter() - time_start)
+
+    batch_model = model if batch == 1 else ModelLoader(weights_path=weights, image_size=size, confidence=0.25, backend=backend, batch=batch)
+    batch_model.warmup()
+    batches = [images[i:i + batch] for i in range(0, len(images) - batch + 1, batch)]
+    time_start = time.perf_counter()
+    for batch_images in batches:
+        batch_model.detect_batch(batch_images)
+    batch_time = time.perf_counter() - time_start
+
+    latencies.sort()
+    return {
+        "load_s": load_time,
+        "latency_ms_p50": 1000 * statistics.median(latencies),
+        "latency_ms_p95": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        "fps": len(images) / sum(latencies),
+        "batch_fps": batch * len(batches) / batch_time if batches else float("nan"),
+    }
+
+
+def main(weights: str, video: str, size: int, frames: int, batch: int, backends: list) -> dict:
+    images = read_frames(video, frames)
+
+    report = {}
+    for backend in backends:
+        report[backend] = run(backend, weights, size, batch, images)
+        result = report[backend]
+        print(f"{backend:<9} carga {result['load_s']:6.1f} s   p50 {result['latency_ms_p50']:7.1f} ms   p95 {result['latency_ms_p95']:7.1f} ms   {result['fps']:6.1f} FPS   lote {batch}: {result['batch_fps']:6.1f} FPS")
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--weights', type=str, default='weights/tunel_yolo11n.pt', help='pesos .pt del modelo')
+    parser.add_argument('--video', type=str, default=None, help='video local; por defecto cuadros aleatorios')
+    parser.add_argument('--size', type=int, default=640, help='tamaño de inferencia en píxeles')
+    parser.add_argument('--frames', type=int, default=100, help='cuadros a procesar por backend')
+    parser.add_argument('--batch', type=int, default=4, help='tamaño de lote para medir el rendimiento')
+    parser.add_argument('--backends', nargs='+', default=[backend for backend in BACKENDS if backend != "openvino_int8"], choices=BACKENDS, help='backends a comparar; openvino_int8 requiere quantize.py')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = main(
+        weights=option.weights,
+        video=option.video,
+        size=option.size,
+        frames=option.frames,
+        batch=option.batch,
+        backends=option.backends )
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
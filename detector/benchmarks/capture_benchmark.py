@@ -0,0 +1,120 @@
+"""Compara el CPU por cuadro de los backends de captura sobre un archivo local.
+
+Uso (desde la carpeta detector/):
+    python -m benchmarks.capture_benchmark --source video.mp4 --max-size 1280 --frames 300
+
+Lee el video con LatestFrameStream en modo ordenado, como la captura del
+detector, con cada backend:
+
+- opencv: decodifica a la resolución original y reduce con cv2.resize, que es
+  lo que cuesta llegar a la misma resolución en el proceso del detector.
+- ffmpeg: FFmpeg decodifica y reduce en su propio proceso y entrega los
+  cuadros ya reducidos en los buffers del pool.
+
+El CPU incluye todos los hilos del proceso y, para FFmpeg, el del subproceso
+(medido al terminar). Sin ffmpeg instalado ese backend se omite.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import time
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.frame_pool import FramePool
+from modules.image_profile import interpolation
+from modules.video_stream import LatestFrameStream
+from tools.cpu_quota import configure_capture_threads
+from tools.ffmpeg_capture import output_resolution
+from tools.video_info import VideoInfo
+
+
+def children_cpu() -> float:
+    """Segundos de CPU de los subprocesos ya terminados."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(source: str, options: dict, max_size: int, frames: int) -> dict:
+    """Lee hasta `frames` cuadros con un backend y mide el CPU y el tiempo por cuadro."""
+    cpu_start, children_start = time.process_time(), children_cpu()
+    time_start = time.perf_counter()
+
+    source_info = VideoInfo(source, keep_open=True, capture_options=options)
+    target_wh = output_resolution(source_info.source_wh, max_size)
+    resize = source_info.resolution_wh != target_wh
+    scale = target_wh[0] / source_info.width
+
+    pool = FramePool.from_resolution(source_info.resolution_wh, size=3)
+    video_stream = LatestFrameStream(
+        source,
+        frame_pool=pool,
+        drop_frames=False,
+        skip_duplicates=False,
+        capture=source_info.capture,
+        capture_options=options ).start()
+
+    frames_read = 0
+    while video_stream.more() and frames_read < frames:
+        frame = video_stream.read()
+        if frame is None:
+            continue
+        if resize:
+            cv2.resize(frame, target_wh, interpolation=interpolation(scale))
+        video_stream.release(frame)
+        frames_read += 1
+    video_stream.stop()
+
+    wall_time = time.perf_counter() - time_start
+    cpu_time = time.process_time() - cpu_start + children_cpu() - children_start
+    return {
+        "frames": frames_read,
+        "decoded_wh": list(source_info.resolution_wh),
+        "output_wh": list(target_wh),
+        "cpu_ms_per_frame": 1000 * cpu_time / max(1, frames_read),
+        "wall_ms_per_frame": 1000 * wall_time / max(1, frames_read),
+        "buffers": pool.allocated,
+    }
+
+
+def main(source: str, max_size: int, frames: int, threads: int) -> dict:
+    thread_settings = configure_capture_threads(threads)
+    backends = {"opencv": {"backend": "opencv"}}
+    if shutil.which("ffmpeg"):
+        backends["ffmpeg"] = {"backend": "ffmpeg", "max_size": max_size, "threads": thread_settings["threads"]}
+    else:
+        print("ffmpeg no está instalado: se omite el backend ffmpeg")
+
+    report = {}
+    for name, options in backends.items():
+        report[name] = result = run(source, options, max_size, frames)
+        print(
+            f"{name:<8} {result['decoded_wh'][0]:>4} x {result['decoded_wh'][1]:<4} -> {result['output_wh'][0]:>4} x {result['output_wh'][1]:<4}"
+            f"  CPU {result['cpu_ms_per_frame']:7.2f} ms/cuadro   tiempo {result['wall_ms_per_frame']:7.2f} ms/cuadro"
+            f"   ({result['frames']} cuadros, {result['buffers']} buffers)" )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--source', type=str, required=True, help='video local de entrada')
+    parser.add_argument('--max-size', type=int, default=1280, help='lado mayor de los cuadros de salida')
+    parser.add_argument('--frames', type=int, default=300, help='cuadros a leer por backend')
+    parser.add_argument('--threads', type=int, default=None, help='hilos de captura; por defecto según la cuota de CPU')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = main(
+        source=option.source,
+        max_size=option.max_size,
+        frames=option.frames,
+        threads=option.threads )
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,146 @@
+"""Compara el tiempo de codificación y el tamaño del mensaje de cada perfil de imagen.
+
+Uso (desde la carpeta detector/):
+    python -m benchmarks.encode_benchmark --source video.mp4 --frames 100
+
+Mide, para cada perfil y cada codificador disponible (OpenCV y simplejpeg),
+el tiempo de recortar, reducir y codificar la imagen de contexto de un cuadro
+(más sus miniaturas, si el perfil las incluye) y los bytes en base64 que se
+publican en Redis. Sin --source se usa una escena sintética.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import image_profile as image_profile_module
+from modules.image_profile import ImageProfile, interpolation
+from modules.region import RegionOfInterest
+
+
+REGION = [[570, 120], [930, 120], [1240, 530], [540, 530]]
+
+# Perfiles comparados, con la misma forma que la llave "image" de camera_config.json
+PROFILES = {
+    "por_defecto": {},
+    "960_q80": {"max_size": 960, "quality": 80},
+    "region_q80": {"crop": "region", "max_size": 640, "quality": 80},
+    "region_miniaturas": {"crop": "region", "max_size": 640, "quality": 80, "thumbnail": 160},
+}
+
+# Cajas de objetos en el cuadro de 1280 x 720, escaladas a la resolución real
+BOXES = np.array([[600, 300, 720, 400], [800, 350, 980, 480], [1000, 200, 1060, 330]], dtype=np.float32)
+
+
+def load_frames(source: str, frames: int, width: int, height: int) -> list:
+    """Lee los cuadros del video, o genera una escena sintética con bordes y ruido."""
+    if source is not None:
+        capture = cv2.VideoCapture(source)
+        images = []
+        while len(images) < frames:
+            success, image = capture.read()
+            if not success:
+                break
+            images.append(image)
+        capture.release()
+        if not images:
+            raise ValueError(f"No se pudieron leer cuadros de {source}")
+        return images
+
+    rng = np.random.default_rng(0)
+    images = []
+    for step in range(min(frames, 16)):
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        image[:] = np.linspace(40, 200, width, dtype=np.uint8)[None, :, None]
+        for _ in range(12):
+            x, y = int(rng.integers(0, width - 100)), int(rng.integers(0, height - 100))
+            cv2.rectangle(image, (x, y), (x + 100, y + 60), [int(c) for c in rng.integers(0, 255, 3)], -1)
+        image = cv2.add(image, rng.integers(0, 12, image.shape, dtype=np.uint8))
+        images.append(image)
+    return [images[i % len(images)] for i in range(frames)]
+
+
+def encode_frame(profile: ImageProfile, image: np.array, boxes: np.array) -> int:
+    """Codifica la imagen de contexto y las miniaturas de un cuadro; devuelve los bytes en base64."""
+    x, y, width, height = profile.box
+    context = image[y:y + height, x:x + width]
+    if profile.scale != 1.0:
+        context = cv2.resize(context, profile.output_wh, interpolation=interpolation(profile.scale))
+    payload = len(profile.encode(context))
+
+    if profile.thumbnail:
+        for xyxy in boxes:
+            payload += len(profile.encode_thumbnail(image, xyxy) or "")
+    return payload
+
+
+def run(profile: ImageProfile, images: list, boxes: np.array) -> dict:
+    latencies, payloads = [], []
+    for image in images:
+        time_start = time.perf_counter()
+        payloads.append(encode_frame(profile, image, boxes))
+        latencies.append(time.perf_counter() - time_start)
+
+    latencies.sort()
+    return {
+        "output_wh": list(profile.output_wh),
+        "latency_ms_p50": 1000 * statistics.median(latencies),
+        "latency_ms_p95": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        "payload_kb": statistics.mean(payloads) / 1024,
+    }
+
+
+def main(source: str, frames: int, width: int, height: int) -> dict:
+    images = load_frames(source, frames, width, height)
+    frame_height, frame_width = images[0].shape[:2]
+    region = RegionOfInterest(polygon=REGION, resolution_wh=(frame_width, frame_height))
+    boxes = BOXES * np.array([frame_width / 1280, frame_height / 720] * 2, dtype=np.float32)
+
+    simplejpeg = image_profile_module.simplejpeg
+    encoders = {"opencv": None}
+    if simplejpeg is not None:
+        encoders["simplejpeg"] = simplejpeg
+
+    report = {}
+    try:
+        for encoder_name, encoder in encoders.items():
+            image_profile_module.simplejpeg = encoder
+            for profile_name, image_config in PROFILES.items():
+                profile = ImageProfile.from_config(image_config, (frame_width, frame_height), region)
+                run(profile, images[:5], boxes)  # Calentamiento
+                result = run(profile, images, boxes)
+                report[f"{profile_name}/{encoder_name}"] = result
+                print(
+                    f"{profile_name:<18} {encoder_name:<10} {result['output_wh'][0]:>4} x {result['output_wh'][1]:<4}"
+                    f"  p50 {result['latency_ms_p50']:7.2f} ms   p95 {result['latency_ms_p95']:7.2f} ms   {result['payload_kb']:8.1f} KB" )
+    finally:
+        image_profile_module.simplejpeg = simplejpeg
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--source', type=str, default=None, help='video de entrada; por defecto una escena sintética')
+    parser.add_argument('--frames', type=int, default=100, help='cuadros a codificar por perfil')
+    parser.add_argument('--width', type=int, default=1280, help='ancho de la escena sintética')
+    parser.add_argument('--height', type=int, default=720, help='alto de la escena sintética')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = main(
+        source=option.source,
+        frames=option.frames,
+        width=option.width,
+        height=option.height )
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
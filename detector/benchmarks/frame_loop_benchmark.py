@@ -0,0 +1,125 @@
+"""Compara la asignación de memoria y la latencia por cuadro del ciclo de detección.
+
+Uso (desde la carpeta detector/):
+    python -m benchmarks.frame_loop_benchmark --frames 300
+
+Mide solo el trabajo del ciclo alrededor del modelo (copia de anotación,
+enmascarado de la región y liberación de memoria), antes y después de usar la
+región precalculada y el pool de buffers. El modelo se omite para aislar
+estos costos.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.frame_pool import FramePool
+from modules.region import RegionOfInterest
+
+
+REGION = [[570, 120], [930, 120], [1240, 530], [540, 530]]
+
+
+def loop_before(image: np.array, state: dict) -> None:
+    """Ciclo original: copia, máscara nueva por cuadro y recolección completa."""
+    annotated_image = image.copy()
+    mask = np.zeros_like(annotated_image[:, :, 0])
+    mask = cv2.fillPoly(mask, [np.array(REGION)], 255)
+    masked_frame = cv2.bitwise_and(annotated_image, annotated_image, mask=mask)
+    del masked_frame
+    del annotated_image
+    gc.collect()
+
+
+def loop_after(image: np.array, state: dict) -> None:
+    """Ciclo con región precalculada y buffers reutilizables."""
+    annotated_image = state["frame_pool"].copy(image)
+    roi_buffer = state["roi_pool"].acquire()
+    state["region"].crop(image, out=roi_buffer)
+    state["roi_pool"].release(roi_buffer)
+    state["frame_pool"].release(annotated_image)
+
+
+def run(loop, frames: list, state: dict) -> dict:
+    """Ejecuta el ciclo sobre los cuadros y mide latencia y asignación por cuadro."""
+    # Latencia, sin el costo de rastrear la memoria
+    latencies = []
+    for image in frames:
+        time_start = time.perf_counter()
+        loop(image, state)
+        latencies.append(time.perf_counter() - time_start)
+
+    # Memoria asignada por cuadro (pico de tracemalloc dentro del ciclo, Python 3.9+)
+    allocations = [float("nan")]
+    if hasattr(tracemalloc, "reset_peak"):
+        allocations = []
+        tracemalloc.start()
+        for image in frames:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            loop(image, state)
+            _, peak = tracemalloc.get_traced_memory()
+            allocations.append(peak - baseline)
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "latency_ms_p50": 1000 * statistics.median(latencies),
+        "latency_ms_p95": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        "allocated_kb_per_frame": statistics.mean(allocations) / 1024,
+    }
+
+
+def main(frames: int, width: int, height: int, heap_objects: int) -> dict:
+    # Montón de objetos vivos similar al de un proceso con torch y ultralytics cargados
+    heap = [{"objeto": i} for i in range(heap_objects)]
+
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(min(frames, 16))]
+    images = [images[i % len(images)] for i in range(frames)]
+
+    region = RegionOfInterest(polygon=REGION, resolution_wh=(width, height))
+    state = {
+        "region": region,
+        "frame_pool": FramePool.from_resolution((width, height), size=2),
+        "roi_pool": FramePool.from_resolution(region.crop_wh, size=2),
+    }
+
+    report = {
+        "antes": run(loop_before, images, state),
+        "despues": run(loop_after, images, state),
+    }
+    for name, result in report.items():
+        print(f"{name:<8} p50 {result['latency_ms_p50']:8.3f} ms   p95 {result['latency_ms_p95']:8.3f} ms   {result['allocated_kb_per_frame']:10.1f} KB/cuadro")
+
+    del heap
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=300, help='cuadros a procesar por variante')
+    parser.add_argument('--width', type=int, default=1280, help='ancho del cuadro')
+    parser.add_argument('--height', type=int, default=720, help='alto del cuadro')
+    parser.add_argument('--heap-objects', type=int, default=300000, help='objetos vivos simulados en el proceso')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = main(
+        frames=option.frames,
+        width=option.width,
+        height=option.height,
+        heap_objects=option.heap_objects )
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,130 @@
+"""Compara N procesos `detector_controller.main` contra un proceso en lote.
+
+Uso (desde la carpeta detector/):
+    python -m benchmarks.multi_camera_benchmark --video muestra.mp4 --camera-ids 1 2 3 4
+
+Cada cámara procesa el mismo video local. Se reportan los cuadros por segundo
+agregados y la memoria residente (RSS) máxima sumada de todos los procesos.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera_controller import load_camera_config
+
+
+def _silent(target, kwargs: dict) -> None:
+    """Ejecuta el controlador sin imprimir el progreso en la terminal."""
+    sys.stdout = open(os.devnull, "w")
+    target(**kwargs)
+
+
+def _run_separate(camera_id: str, video: str, weights: str, size: int, frames: int) -> None:
+    import detector_controller
+
+    camera_config = load_camera_config(camera_id)
+    _silent(detector_controller.main, dict(
+        source=video,
+        camera_id=camera_id,
+        classes=camera_config["clases"],
+        weights=weights,
+        size=size,
+        confidence=float(camera_config.get("confidence", 0.5)),
+        clip=0,
+        region=camera_config.get("region", None),
+        max_frames=frames ))
+
+
+def _run_batched(camera_ids: list, video: str, weights: str, size: int, frames: int) -> None:
+    import multi_detector_controller
+
+    cameras = {camera_id: {**load_camera_config(camera_id), "url": video} for camera_id in camera_ids}
+    _silent(multi_detector_controller.main, dict(
+        cameras=cameras,
+        weights=weights,
+        size=size,
+        max_frames=frames ))
+
+
+def _rss_bytes(pid: int) -> int:
+    """Lee la memoria residente de un proceso desde /proc."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def measure(processes: list, sample_interval: float = 0.2) -> dict:
+    """Inicia los procesos y mide el tiempo total y el RSS máximo sumado."""
+    time_start = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    peak_rss = 0
+    while any(process.is_alive() for process in processes):
+        peak_rss = max(peak_rss, sum(_rss_bytes(process.pid) for process in processes))
+        time.sleep(sample_interval)
+
+    for process in processes:
+        process.join()
+
+    return {
+        "seconds": time.perf_counter() - time_start,
+        "peak_rss_mb": peak_rss / 2**20,
+        "exit_codes": [process.exitcode for process in processes],
+    }
+
+
+def main(video: str, camera_ids: list, weights: str, size: int, frames: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    total_frames = int(cv2.VideoCapture(video).get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = min(frames, total_frames) if total_frames > 0 else frames
+    processed = frames * len(camera_ids)
+
+    separate = measure([
+        context.Process(target=_run_separate, args=(camera_id, video, weights, size, frames))
+        for camera_id in camera_ids ])
+    batched = measure([
+        context.Process(target=_run_batched, args=(camera_ids, video, weights, size, frames)) ])
+
+    report = {}
+    for name, result in (("separados", separate), ("lote", batched)):
+        result["fps"] = processed / result["seconds"]
+        report[name] = result
+        print(f"{name:<10} {result['fps']:8.2f} FPS   {result['peak_rss_mb']:8.1f} MB RSS   {result['seconds']:8.2f} s")
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', type=str, required=True, help='video local usado como fuente de todas las cámaras')
+    parser.add_argument('--camera-ids', nargs='+', type=str, default=["1", "2", "3", "4"], help='ids de camera_config.json')
+    parser.add_argument('--weights', type=str, default='weights/tunel_yolo11n.pt', help='ruta a los pesos del modelo')
+    parser.add_argument('--size', type=int, default=1280, help='tamaño de inferencia en pixeles')
+    parser.add_argument('--frames', type=int, default=300, help='cuadros a procesar por cámara')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = main(
+        video=option.video,
+        camera_ids=option.camera_ids,
+        weights=str(Path(option.weights).resolve()),
+        size=option.size,
+        frames=option.frames )
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
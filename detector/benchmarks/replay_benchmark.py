@@ -0,0 +1,198 @@
+"""Reproduce un video local a través de `detector_controller.main` sin GPU, cámara ni Redis.
+
+Uso (desde la carpeta detector/):
+    python -m benchmarks.replay_benchmark --video muestra.mp4 --frames 300 --output replay.json
+    python -m benchmarks.replay_benchmark --video muestra.mp4 --baseline replay.json --threshold 0.15
+    python -m benchmarks.replay_benchmark --video muestra.mp4 --model openvino --weights weights/tunel_yolo11n.pt
+
+El video se lee completo en modo ordenado, como cualquier archivo. El modelo
+puede ser un stub determinista, que genera objetos en movimiento con ID de
+seguimiento y una latencia fija, o un backend real en CPU. Redis se reemplaza
+por una cola en memoria. Se reportan los cuadros por segundo, los tiempos por
+etapa y los mensajes producidos; con `--baseline` el proceso termina con
+código 1 si los FPS bajan o el p95 por cuadro sube más que `--threshold`.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import detector_controller
+from camera_controller import load_camera_config
+from modules.model_loader import BACKENDS
+
+if TYPE_CHECKING:
+    from ultralytics.engine.results import Results
+
+
+class StubModelLoader:
+    """Modelo determinista con la interfaz de ModelLoader.
+
+    Genera `objects` cajas que cruzan la imagen de izquierda a derecha, con
+    ID de seguimiento estable, y espera `latency` segundos por inferencia
+    para simular el costo del modelo.
+    """
+    backend = "stub"
+    device = "cpu"
+    fixed_shape = False
+    class_names = {0: "person", 2: "car", 3: "motorcycle", 5: "bus", 7: "truck"}
+
+    def __init__(self, weights_path: str = None, image_size: int = 640, latency: float = 0.0, objects: int = 3, **kwargs) -> None:
+        self.image_size = image_size
+        self.latency = latency
+        self.objects = objects
+        self.frame_number = 0
+
+
+    def warmup(self, runs: int = 2) -> float:
+        return 0.0
+
+
+    def clear_tracks(self) -> int:
+        # Los IDs de seguimiento los asigna el stub: no hay estado de ByteTrack que descartar
+        return 0
+
+
+    def track(self, image: np.array, image_size: int = None) -> "Results":
+        import torch
+        from ultralytics.engine.results import Results
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        height, width = image.shape[:2]
+        classes = list(self.class_names)
+        boxes = []
+        for index in range(self.objects):
+            # Cada objeto cruza la imagen en 100 cuadros y vuelve a entrar con un ID nuevo
+            step = self.frame_number + 37 * index
+            lap, position = divmod(step, 100)
+            x = position / 100 * (width - width // 8)
+            y = (index + 1) * height / (self.objects + 2)
+            boxes.append([
+                x, y, x + width // 8, y + height // 8,
+                1 + index + self.objects * lap,
+                0.6 + 0.3 * (position % 10) / 10,
+                classes[index % len(classes)] ])
+        self.frame_number += 1
+
+        return Results(
+            orig_img=image,
+            path="",
+            names=self.class_names,
+            boxes=torch.tensor(boxes, dtype=torch.float32).reshape(-1, 7) )
+
+
+class FakeRedis:
+    """Cola de Redis en memoria con los métodos que usan SaveResults y RedisPublisher."""
+    def __init__(self) -> None:
+        self.queues = {}
+
+    def lpush(self, name: str, *values) -> int:
+        queue = self.queues.setdefault(name, [])
+        queue[:0] = reversed(values)
+        return len(queue)
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedis":
+        return self
+
+    def execute(self) -> list:
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+def run(video: str, camera_id: str, frames: int, model: str, weights: str, size: int, stub_latency: float) -> dict:
+    """Ejecuta el controlador sobre el video y devuelve sus estadísticas."""
+    camera_config = load_camera_config(camera_id)
+    fake_redis = FakeRedis()
+
+    patches = [
+        mock.patch("modules.save_results.redis_client", fake_redis),
+        mock.patch("modules.publisher.redis_client", fake_redis) ]
+    if model == "stub":
+        patches.append(mock.patch.object(
+            detector_controller, "ModelLoader",
+            lambda **kwargs: StubModelLoader(latency=stub_latency, **kwargs) ))
+
+    with contextlib.ExitStack() as stack:
+        for patch in patches:
+            stack.enter_context(patch)
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+
+        stats = detector_controller.main(
+            source=video,
+            camera_id=camera_id,
+            classes=camera_config["clases"],
+            weights=weights,
+            size=size,
+            confidence=float(camera_config.get("confidence", 0.5)),
+            clip=0,
+            region=camera_config.get("region", None),
+            max_frames=frames,
+            backend="pt" if model == "stub" else model )
+
+    stats["queued_messages"] = sum(len(queue) for queue in fake_redis.queues.values())
+    stats["model"] = model
+    return stats
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Compara con una ejecución anterior y devuelve las regresiones encontradas."""
+    regressions = []
+    if report["fps"] < baseline["fps"] * (1 - threshold):
+        regressions.append(f"FPS {report['fps']:.2f} < {baseline['fps']:.2f} (-{threshold:.0%})")
+
+    frame_p95, baseline_p95 = report["stages"]["frame"]["p95"], baseline["stages"]["frame"]["p95"]
+    if frame_p95 > baseline_p95 * (1 + threshold):
+        regressions.append(f"p95 por cuadro {1000 * frame_p95:.2f} ms > {1000 * baseline_p95:.2f} ms (+{threshold:.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', type=str, required=True, help='video local a reproducir')
+    parser.add_argument('--camera-id', type=str, default='1', help='cámara de camera_config.json (región, clases)')
+    parser.add_argument('--frames', type=int, default=300, help='cuadros a procesar')
+    parser.add_argument('--model', type=str, default='stub', choices=('stub',) + BACKENDS, help='stub determinista o backend real')
+    parser.add_argument('--weights', type=str, default='weights/tunel_yolo11n.pt', help='pesos para los backends reales')
+    parser.add_argument('--size', type=int, default=640, help='tamaño de inferencia en píxeles')
+    parser.add_argument('--stub-latency', type=float, default=0.02, help='segundos por inferencia del stub')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--threshold', type=float, default=0.1, help='regresión máxima aceptada respecto a la base')
+    option = parser.parse_args()
+
+    report = run(
+        video=option.video,
+        camera_id=option.camera_id,
+        frames=option.frames,
+        model=option.model,
+        weights=option.weights,
+        size=option.size,
+        stub_latency=option.stub_latency )
+
+    print(f"{report['frames']} cuadros en {report['elapsed_s']:.2f} s: {report['fps']:.2f} FPS, {report['messages']} mensajes ({report['message_bytes'] // 1024} KB)")
+    for stage, values in report["stages"].items():
+        print(f"  {stage:<11} p50 {1000 * values['p50']:8.2f} ms   p95 {1000 * values['p95']:8.2f} ms   p99 {1000 * values['p99']:8.2f} ms")
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if option.baseline:
+        with open(option.baseline) as f:
+            regressions = compare(report, json.load(f), option.threshold)
+        for regression in regressions:
+            print(f"Regresión: {regression}")
+        sys.exit(1 if regressions else 0)
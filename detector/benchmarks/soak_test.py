@@ -0,0 +1,321 @@
+"""Prueba de resistencia: ejecuta el detector durante horas sobre un video local en bucle
+y falla si la memoria crece sin límite.
+
+Uso (desde la carpeta detector/):
+    python -m benchmarks.soak_test --video muestra.mp4 --hours 6
+    python -m benchmarks.soak_test --video muestra.mp4 --hours 2 --gc off --output soak.json
+
+El video se repite sin fin y los cuadros se procesan tan rápido como se
+puede, de modo que `--hours` son horas de cámara a los FPS del video, en
+mucho menos tiempo real. El modelo es un stub con objetos que entran y salen
+(con escena vacía entre rondas) seguidos por ByteTrack real, de modo que se
+ejercitan todos los estados por objeto: ByteTrack, registro de seguimiento,
+IDs, rastros y publicador. Redis se reemplaza por un sumidero que descarta
+los mensajes.
+
+Un hilo muestrea cada `--sample-every` segundos el RSS del proceso y la
+memoria de Python registrada por tracemalloc. Tras descartar el calentamiento,
+se ajusta una recta de cada una contra los cuadros procesados, por separado en
+cada mitad de la ejecución: un escalón aislado (por ejemplo una reserva del
+asignador de memoria) solo afecta a una mitad, mientras que una fuga crece en
+ambas. Si el crecimiento por hora de cámara supera el límite en las dos
+mitades, el proceso termina con código 1 y muestra las líneas que más
+memoria sumaron.
+
+Con `--gc off` se desactiva el recolector cíclico, para saber si la memoria
+queda acotada solo gracias a él (ciclos de referencias en cada cuadro); con
+`--gc frame` se recolecta en cada cuadro.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import detector_controller
+import tools.video_info as video_info
+from benchmarks.replay_benchmark import StubModelLoader, FakeRedis
+from camera_controller import load_camera_config
+from modules.camera_tracker import CameraTracker
+
+if TYPE_CHECKING:
+    from ultralytics.engine.results import Results
+
+
+GC_MODES = ("auto", "off", "frame")
+
+
+class LoopingCapture:
+    """Captura de un archivo que vuelve al inicio al terminar, con la interfaz de cv2.VideoCapture.
+
+    attributes:
+        capture (cv2.VideoCapture): Captura del archivo.
+        reads (int): Cuadros leídos en total.
+        loops (int): Veces que el video volvió al inicio.
+        collect (bool): Ejecutar gc.collect() en cada cuadro.
+    """
+    def __init__(self, capture: cv2.VideoCapture, collect: bool = False) -> None:
+        self.capture = capture
+        self.collect = collect
+        self.reads = 0
+        self.loops = 0
+
+
+    def read(self, image: np.array = None):
+        success, frame = self.capture.read(image)
+        if not success:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.loops += 1
+            success, frame = self.capture.read(image)
+        if success:
+            self.reads += 1
+        if self.collect:
+            gc.collect()
+        return success, frame
+
+
+    def isOpened(self) -> bool:
+        return self.capture.isOpened()
+
+
+    def get(self, prop: int) -> float:
+        return self.capture.get(prop)
+
+
+    def release(self) -> None:
+        self.capture.release()
+
+
+class SoakModelLoader(StubModelLoader):
+    """Stub con rondas de objetos y escena vacía, seguidos por ByteTrack real.
+
+    Durante `active_frames` cuadros hay objetos que cruzan la imagen; luego
+    hay `idle_frames` cuadros sin objetos, como una vía sin tráfico.
+    """
+    def __init__(self, active_frames: int = 600, idle_frames: int = 300, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.active_frames = active_frames
+        self.idle_frames = idle_frames
+        self.tracker = CameraTracker()
+
+
+    def track(self, image: np.array, image_size: int = None) -> "Results":
+        import torch
+        from ultralytics.engine.results import Results
+
+        idle = self.frame_number % (self.active_frames + self.idle_frames) >= self.active_frames
+        stub_results = super().track(image, image_size)
+
+        # Sin el ID del stub: ByteTrack asigna los IDs
+        boxes = stub_results.boxes.data[:, [0, 1, 2, 3, 5, 6]] if not idle else torch.zeros((0, 6))
+        return self.tracker.update(Results(orig_img=image, path="", names=self.class_names, boxes=boxes))
+
+
+    def clear_tracks(self) -> int:
+        return self.tracker.clear()
+
+
+class SinkRedis(FakeRedis):
+    """Redis que solo cuenta los mensajes, para no acumularlos en memoria durante horas."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages = 0
+
+    def lpush(self, name: str, *values) -> int:
+        self.messages += len(values)
+        return self.messages
+
+
+def rss_bytes() -> int:
+    """Memoria residente del proceso."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def growth_per_hour(samples: list, key: str, fps: float) -> float:
+    """Pendiente de la recta de `key` contra los cuadros, en bytes por hora de cámara."""
+    frames = np.array([sample["frames"] for sample in samples], dtype=np.float64)
+    values = np.array([sample[key] for sample in samples], dtype=np.float64)
+    if len(samples) < 2 or np.ptp(frames) == 0:
+        return 0.0
+    slope = np.polyfit(frames, values, 1)[0]
+    return float(slope * fps * 3600)
+
+
+def sustained_growth(samples: list, key: str, fps: float) -> float:
+    """Crecimiento por hora de cámara presente en ambas mitades de las muestras: el menor de los dos."""
+    half = len(samples) // 2
+    return min(growth_per_hour(samples[:half], key, fps), growth_per_hour(samples[half:], key, fps))
+
+
+def run(video: str, camera_id: str, hours: float, frames: int, sample_every: float, warmup: float, gc_mode: str, stub_latency: float) -> dict:
+    """Ejecuta el controlador sobre el video en bucle mientras se muestrea la memoria."""
+    camera_config = load_camera_config(camera_id)
+    probe = cv2.VideoCapture(video)
+    fps = probe.get(cv2.CAP_PROP_FPS) or 25.0
+    probe.release()
+    total_frames = frames if frames is not None else int(hours * 3600 * fps)
+
+    captures = []
+    open_capture = video_info.open_capture
+
+    def looping_capture(source: str, timeout_ms: int = 10000, options: dict = None) -> LoopingCapture:
+        captures.append(LoopingCapture(open_capture(source, timeout_ms, options), collect=gc_mode == "frame"))
+        return captures[-1]
+
+    samples = []
+    snapshots = {}
+    stop_sampling = threading.Event()
+    time_start = time.perf_counter()
+
+    def sample() -> None:
+        """Muestrea la memoria hasta que termine la ejecución."""
+        while not stop_sampling.wait(sample_every):
+            processed = captures[-1].reads if captures else 0
+            # Instantánea al terminar el calentamiento, para comparar las líneas que crecieron. La
+            # instantánea ocupa memoria del proceso: solo se evalúan las muestras tomadas después
+            if "warmup" not in snapshots and processed >= warmup * total_frames:
+                snapshots["warmup"] = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            samples.append({
+                "elapsed_s": time.perf_counter() - time_start,
+                "frames": processed,
+                "rss": rss_bytes(),
+                "traced": current,
+                "traced_peak": peak,
+                "steady": "warmup" in snapshots })
+            print(
+                f"{processed / fps / 3600:7.2f} h de cámara ({processed} cuadros, {samples[-1]['elapsed_s']:.0f} s)"
+                f"   RSS {samples[-1]['rss'] / 2**20:8.1f} MB   Python {current / 2**20:8.1f} MB",
+                file=sys.__stdout__, flush=True )
+
+    if gc_mode == "off":
+        gc.disable()
+    tracemalloc.start()
+    sampler = threading.Thread(target=sample, name="muestreo-memoria", daemon=True)
+    sampler.start()
+
+    sink = SinkRedis()
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(video_info, "open_capture", looping_capture))
+        stack.enter_context(mock.patch("modules.save_results.redis_client", sink))
+        stack.enter_context(mock.patch("modules.publisher.redis_client", sink))
+        stack.enter_context(mock.patch.object(detector_controller, "SPOOL_DIR", ""))
+        stack.enter_context(mock.patch.object(
+            detector_controller, "ModelLoader",
+            lambda **kwargs: SoakModelLoader(latency=stub_latency, **kwargs) ))
+        # Los mensajes de progreso se descartan: acumularlos también crecería sin límite
+        stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+
+        stats = detector_controller.main(
+            source=video,
+            camera_id=camera_id,
+            classes=camera_config["clases"],
+            weights="stub",
+            size=640,
+            confidence=float(camera_config.get("confidence", 0.5)),
+            clip=0,
+            region=camera_config.get("region", None),
+            max_frames=total_frames,
+            config_reload=None )
+
+    stop_sampling.set()
+    sampler.join()
+    final_snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    unreachable = gc.collect()
+    gc.enable()
+
+    # Crecimiento después del calentamiento
+    steady = [sample for sample in samples if sample["steady"]]
+    top_growth = []
+    if "warmup" in snapshots:
+        top_growth = [
+            {"line": str(stat.traceback), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+            for stat in final_snapshot.compare_to(snapshots["warmup"], "lineno")[:10] ]
+
+    return {
+        "frames": stats["frames"],
+        "camera_hours": stats["frames"] / fps / 3600,
+        "elapsed_s": stats["elapsed_s"],
+        "loops": captures[-1].loops if captures else 0,
+        "messages": sink.messages,
+        "gc": gc_mode,
+        "unreachable_at_end": unreachable,
+        "samples": samples,
+        "steady_samples": len(steady),
+        "rss_growth_mb_per_hour": growth_per_hour(steady, "rss", fps) / 2**20,
+        "traced_growth_mb_per_hour": growth_per_hour(steady, "traced", fps) / 2**20,
+        "rss_sustained_mb_per_hour": sustained_growth(steady, "rss", fps) / 2**20,
+        "traced_sustained_mb_per_hour": sustained_growth(steady, "traced", fps) / 2**20,
+        "top_growth": top_growth,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', type=str, required=True, help='video local que se repite en bucle')
+    parser.add_argument('--camera-id', type=str, default='1', help='cámara de camera_config.json (región, clases)')
+    parser.add_argument('--hours', type=float, default=1.0, help='horas de cámara a simular, a los FPS del video')
+    parser.add_argument('--frames', type=int, default=None, help='cuadros a procesar; reemplaza a --hours')
+    parser.add_argument('--sample-every', type=float, default=10.0, help='segundos entre muestras de memoria')
+    parser.add_argument('--warmup', type=float, default=0.25, help='fracción inicial de la ejecución que no se evalúa')
+    parser.add_argument('--gc', type=str, default='auto', choices=GC_MODES, help='recolector cíclico: automático, desactivado o en cada cuadro')
+    parser.add_argument('--stub-latency', type=float, default=0.0, help='segundos por inferencia del stub')
+    parser.add_argument('--max-growth-mb', type=float, default=2.0, help='crecimiento máximo de la memoria de Python por hora de cámara')
+    parser.add_argument('--max-rss-growth-mb', type=float, default=20.0, help='crecimiento máximo del RSS por hora de cámara')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = run(
+        video=option.video,
+        camera_id=option.camera_id,
+        hours=option.hours,
+        frames=option.frames,
+        sample_every=option.sample_every,
+        warmup=option.warmup,
+        gc_mode=option.gc,
+        stub_latency=option.stub_latency )
+
+    print(
+        f"{report['frames']} cuadros ({report['camera_hours']:.2f} h de cámara, {report['loops']} vueltas) en {report['elapsed_s']:.0f} s,"
+        f" {report['messages']} mensajes, gc {report['gc']} (inalcanzables al final: {report['unreachable_at_end']})" )
+    print(
+        f"Crecimiento por hora de cámara: Python {report['traced_growth_mb_per_hour']:.2f} MB (sostenido {report['traced_sustained_mb_per_hour']:.2f} MB),"
+        f" RSS {report['rss_growth_mb_per_hour']:.2f} MB (sostenido {report['rss_sustained_mb_per_hour']:.2f} MB)" )
+
+    failures = []
+    if report["steady_samples"] < 8:
+        failures.append(f"solo {report['steady_samples']} muestras después del calentamiento; aumente --hours o reduzca --sample-every")
+    if report["traced_sustained_mb_per_hour"] > option.max_growth_mb:
+        failures.append(f"memoria de Python crece {report['traced_sustained_mb_per_hour']:.2f} MB/h > {option.max_growth_mb} MB/h")
+    if report["rss_sustained_mb_per_hour"] > option.max_rss_growth_mb:
+        failures.append(f"RSS crece {report['rss_sustained_mb_per_hour']:.2f} MB/h > {option.max_rss_growth_mb} MB/h")
+
+    if failures:
+        print("Líneas que más memoria sumaron después del calentamiento:")
+        for growth in report["top_growth"]:
+            print(f"  {growth['size_diff'] / 1024:+10.1f} KB  {growth['count_diff']:+8d}  {growth['line']}")
+        for failure in failures:
+            print(f"Falla: {failure}")
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    sys.exit(1 if failures else 0)
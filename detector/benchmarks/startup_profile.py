@@ -0,0 +1,117 @@
+"""Desglosa el tiempo de arranque del detector hasta la primera inferencia.
+
+Uso (desde la carpeta detector/):
+    python -m benchmarks.startup_profile --source rtsp://camara/stream --weights weights/tunel_yolo11n.pt
+    python -m benchmarks.startup_profile --source muestra.mp4 --runs 3 --output arranque.json
+
+Cada ejecución corre en un proceso nuevo, como un reinicio del contenedor,
+con Redis reemplazado por una cola en memoria. Se reporta:
+
+- importación: tiempo de `import detector_controller` (torch y ultralytics se importan después).
+- fuente: apertura de la cámara en otro hilo, solapada con la importación de torch y ultralytics.
+- modelo, calentamiento y primera inferencia, medidos por `detector_controller.main`.
+- proceso: desde el lanzamiento del proceso hasta la primera inferencia.
+
+Al final se listan los módulos de mayor costo de importación (`python -X importtime`).
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DETECTOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_startup(option: dict, launch_time: float, results: multiprocessing.Queue) -> None:
+    time_import = time.perf_counter()
+    import detector_controller
+    import_time = time.perf_counter() - time_import
+
+    from benchmarks.replay_benchmark import FakeRedis
+
+    # Intérprete, importación y preparación antes de llamar a main
+    before_main = time.time() - launch_time
+    with mock.patch("modules.save_results.redis_client", FakeRedis()), contextlib.redirect_stdout(io.StringIO()):
+        stats = detector_controller.main(
+            source=option["source"],
+            camera_id=option["camera_id"],
+            classes=None,
+            weights=option["weights"],
+            size=option["size"],
+            confidence=0.25,
+            clip=0,
+            region=option["region"],
+            max_frames=1,
+            backend=option["backend"] )
+
+    results.put({
+        "import": import_time,
+        **stats["startup"],
+        "process": before_main + stats["startup"]["first_inference"],
+    })
+
+
+def import_costs(top: int) -> list:
+    """Módulos de los dos primeros niveles con mayor tiempo acumulado de importación, en segundos."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import detector_controller, modules.model_loader; modules.model_loader.preload()"],
+        cwd=DETECTOR_DIR, capture_output=True, text=True )
+
+    costs = []
+    for line in completed.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line)
+        if match and len(match.group(2)) <= 2:
+            costs.append((match.group(3), int(match.group(1)) / 1e6))
+    return sorted(costs, key=lambda cost: cost[1], reverse=True)[:top]
+
+
+def main(option: dict) -> dict:
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for run in range(option["runs"]):
+        results = context.Queue()
+        process = context.Process(target=_run_startup, args=(option, time.time(), results))
+        process.start()
+        runs.append(results.get())
+        process.join()
+
+    stages = ("import", "probe", "imports", "source", "model", "warmup", "first_inference", "process")
+    report = {"stages": {stage: statistics.median(run[stage] for run in runs) for stage in stages}, "runs": runs}
+    for stage, seconds in report["stages"].items():
+        print(f"  {stage:<16} {seconds:7.2f} s")
+
+    report["imports"] = import_costs(option["top"])
+    print("\nImportaciones más costosas:")
+    for module, seconds in report["imports"]:
+        print(f"  {module:<32} {seconds:7.2f} s")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--source', type=str, required=True, help='URL de la cámara o video local')
+    parser.add_argument('--camera-id', type=str, default='1', help='ID de la cámara en las etiquetas y mensajes')
+    parser.add_argument('--weights', type=str, default='weights/tunel_yolo11n.pt', help='pesos .pt del modelo')
+    parser.add_argument('--size', type=int, default=640, help='tamaño de inferencia en píxeles')
+    parser.add_argument('--backend', type=str, default='pt', help='backend de ModelLoader')
+    parser.add_argument('--region', type=str, default=None, help='región de interés en formato JSON')
+    parser.add_argument('--runs', type=int, default=3, help='arranques a medir; se reporta la mediana')
+    parser.add_argument('--top', type=int, default=10, help='módulos a listar en el costo de importación')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = main(vars(option))
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
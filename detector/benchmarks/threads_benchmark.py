@@ -0,0 +1,113 @@
+"""Compara la latencia de inferencia con y sin el ajuste de hilos y el calentamiento inicial.
+
+Uso (desde la carpeta detector/, idealmente dentro del contenedor con su límite de CPU):
+    python -m benchmarks.threads_benchmark --weights weights/tunel_yolo11n.pt --video muestra.mp4 --size 640
+
+Cada variante corre en un proceso nuevo, porque los hilos de torch y OpenCV
+son globales al proceso:
+
+- sin ajuste: hilos por defecto (núcleos del host) y sin calentamiento.
+- con ajuste: `configure_threads` según la cuota del cgroup y `ModelLoader.warmup`.
+
+Se reporta la latencia del primer cuadro y la latencia estable (p50/p95)
+después de `--settle` cuadros. Fuera del contenedor, `--cores` limita el
+proceso a esos núcleos para aproximar la cuota.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _read_frames(video: str, frames: int) -> list:
+    import cv2
+    import numpy as np
+
+    if video is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(frames)]
+
+    capture = cv2.VideoCapture(video)
+    images = []
+    while len(images) < frames:
+        success, image = capture.read()
+        if not success:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            continue
+        images.append(image)
+    capture.release()
+    return images
+
+
+def _run_variant(tuned: bool, option: dict, results: multiprocessing.Queue) -> None:
+    if option["cores"]:
+        os.sched_setaffinity(0, range(option["cores"]))
+
+    # El ajuste se aplica antes de cargar el modelo, como en detector_controller
+    settings = {}
+    if tuned:
+        from tools.cpu_quota import configure_threads
+        settings = configure_threads()
+
+    import torch
+    from modules.model_loader import ModelLoader
+
+    images = _read_frames(option["video"], option["frames"])
+    model = ModelLoader(weights_path=option["weights"], image_size=option["size"], confidence=0.25, backend=option["backend"])
+    warmup_time = model.warmup() if tuned else 0.0
+
+    latencies = []
+    for image in images:
+        time_start = time.perf_counter()
+        model.track(image)
+        latencies.append(time.perf_counter() - time_start)
+
+    steady = sorted(latencies[option["settle"]:])
+    results.put({
+        "threads": torch.get_num_threads(),
+        **settings,
+        "warmup_s": warmup_time,
+        "first_frame_ms": 1000 * latencies[0],
+        "steady_ms_p50": 1000 * statistics.median(steady),
+        "steady_ms_p95": 1000 * steady[int(0.95 * (len(steady) - 1))],
+    })
+
+
+def main(option: dict) -> dict:
+    context = multiprocessing.get_context("spawn")
+    report = {}
+    for name, tuned in (("sin ajuste", False), ("con ajuste", True)):
+        results = context.Queue()
+        process = context.Process(target=_run_variant, args=(tuned, option, results))
+        process.start()
+        report[name] = results.get()
+        process.join()
+
+        result = report[name]
+        print(f"{name:<11} hilos {result['threads']:>3}   calentamiento {result['warmup_s']:5.2f} s   primer cuadro {result['first_frame_ms']:8.1f} ms   estable p50 {result['steady_ms_p50']:7.1f} ms   p95 {result['steady_ms_p95']:7.1f} ms")
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--weights', type=str, default='weights/tunel_yolo11n.pt', help='pesos .pt del modelo')
+    parser.add_argument('--video', type=str, default=None, help='video local; por defecto cuadros aleatorios')
+    parser.add_argument('--size', type=int, default=640, help='tamaño de inferencia en píxeles')
+    parser.add_argument('--backend', type=str, default='pt', help='backend de ModelLoader')
+    parser.add_argument('--frames', type=int, default=120, help='cuadros a procesar por variante')
+    parser.add_argument('--settle', type=int, default=20, help='cuadros iniciales excluidos de la latencia estable')
+    parser.add_argument('--cores', type=int, default=None, help='limitar el proceso a estos núcleos')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = main(vars(option))
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -1,27 +1,247 @@
-
 import json
 import os
+from pathlib import Path
+from typing import Dict, List
 
 
-def load_camera_config(camera_id: str) -> dict:
-    """Carga la configuración de la cámara desde camera_config.json.
-    
+CONFIG_FILE = "camera_config.json"
+
+# Llaves que se aplican en vivo a una cámara en ejecución; las demás requieren reiniciar
+LIVE_KEYS = ("region", "clases", "confidence")
+
+# Formatos de inferencia de ModelLoader, sin importar el módulo del modelo
+MODEL_BACKENDS = ("pt", "onnx", "openvino", "openvino_int8")
+
+
+def validate_camera_config(camera_id: str, camera_config: dict) -> List[str]:
+    """Valida la configuración de una cámara.
+
     args:
-        camera_id (str): El ID de la cámara para la que se desea cargar la configuración.
+        camera_id (str): ID de la cámara, para los mensajes de error.
+        camera_config (dict): Configuración de la cámara.
     returns:
-        dict: La configuración de la cámara.
+        List[str]: Errores encontrados; vacía si la configuración es válida.
     """
+    if not isinstance(camera_config, dict):
+        return [f"{camera_id}: la configuración debe ser un objeto"]
+
+    errors = []
+    for key in ("nombre", "url", "clases"):
+        if key not in camera_config:
+            errors.append(f"{camera_id}: falta '{key}'")
+
+    classes = camera_config.get("clases")
+    if classes is not None and not (isinstance(classes, list) and all(isinstance(class_id, int) and class_id >= 0 for class_id in classes)):
+        errors.append(f"{camera_id}: 'clases' debe ser una lista de IDs de clase enteros")
+
+    region = camera_config.get("region")
+    if region is not None and not (
+        isinstance(region, list) and len(region) >= 3
+        and all(isinstance(vertex, list) and len(vertex) == 2 and all(isinstance(value, (int, float)) for value in vertex) for vertex in region) ):
+        errors.append(f"{camera_id}: 'region' debe ser una lista de al menos 3 vértices [x, y]")
+
+    confidence = camera_config.get("confidence")
+    if confidence is not None and not (isinstance(confidence, (int, float)) and 0 < confidence <= 1):
+        errors.append(f"{camera_id}: 'confidence' debe estar entre 0 y 1")
+
+    image = camera_config.get("image")
+    if image is not None:
+        if not isinstance(image, dict) or set(image) - {"max_size", "quality", "crop", "thumbnail", "padding"}:
+            errors.append(f"{camera_id}: 'image' admite max_size, quality, crop, thumbnail y padding")
+        else:
+            if not isinstance(image.get("quality", 95), int) or not 1 <= image.get("quality", 95) <= 100:
+                errors.append(f"{camera_id}: 'image.quality' debe estar entre 1 y 100")
+            if image.get("crop", "full") not in ("full", "region"):
+                errors.append(f"{camera_id}: 'image.crop' debe ser 'full' o 'region'")
+
+    capture = camera_config.get("capture")
+    if capture is not None:
+        if not isinstance(capture, dict) or set(capture) - {"backend", "max_size", "substream", "source_wh", "hwaccel", "threads"}:
+            errors.append(f"{camera_id}: 'capture' admite backend, max_size, substream, source_wh, hwaccel y threads")
+        else:
+            if capture.get("backend", "opencv") not in ("opencv", "ffmpeg"):
+                errors.append(f"{camera_id}: 'capture.backend' debe ser 'opencv' o 'ffmpeg'")
+            if capture.get("max_size") is not None and not (isinstance(capture["max_size"], int) and capture["max_size"] > 0):
+                errors.append(f"{camera_id}: 'capture.max_size' debe ser un entero positivo")
+            # La región está en coordenadas del stream principal: con un substream hay que indicar su resolución
+            source_wh = capture.get("source_wh")
+            if source_wh is not None and not (isinstance(source_wh, list) and len(source_wh) == 2 and all(isinstance(value, int) and value > 0 for value in source_wh)):
+                errors.append(f"{camera_id}: 'capture.source_wh' debe ser [ancho, alto] del stream principal")
+            elif capture.get("substream") and source_wh is None:
+                errors.append(f"{camera_id}: 'capture.substream' requiere 'capture.source_wh', la resolución del stream principal en la que está la región")
+
+    size = camera_config.get("size")
+    if size is not None and not (isinstance(size, int) and size > 0):
+        errors.append(f"{camera_id}: 'size' debe ser un entero positivo")
+
+    if camera_config.get("backend", "pt") not in MODEL_BACKENDS:
+        errors.append(f"{camera_id}: 'backend' debe ser uno de {', '.join(MODEL_BACKENDS)}")
+
+    return errors
+
+
+class CameraConfigRegistry:
+    """Registro de la configuración de las cámaras, cargado y validado una sola vez.
+
+    Las consultas se sirven desde memoria. `reload` vuelve a leer el archivo
+    solo si cambió su fecha de modificación y devuelve las cámaras cuya
+    configuración cambió, para aplicar los cambios en vivo. Si el archivo
+    nuevo es inválido se conserva la configuración anterior.
+
+    attributes:
+        path (Path): Archivo de configuración.
+        cameras (Dict[str, dict]): Configuración validada de cada cámara.
+        mtime (int): Fecha de modificación del archivo cargado, en nanosegundos.
+    """
+    def __init__(self, path: str = CONFIG_FILE) -> None:
+        self.path = Path(path)
+        self.cameras = {}
+        self.mtime = None
+
+        self.load()
+
+
+    def _modified(self) -> int:
+        return self.path.stat().st_mtime_ns
+
+
+    def load(self) -> Dict[str, dict]:
+        """Lee y valida el archivo completo.
+
+        returns:
+            Dict[str, dict]: Configuración de cada cámara.
+        """
+        # Verificar si el archivo de configuración existe
+        if not self.path.exists():
+            raise FileNotFoundError(f"El archivo de configuración {self.path.name} no se encuentra.")
+
+        mtime = self._modified()
+        with open(self.path, "r") as f:
+            config = json.load(f)
+
+        errors = [f"{self.path.name}: debe ser un objeto indexado por ID de cámara"] if not isinstance(config, dict) else [
+            error for camera_id, camera_config in config.items() for error in validate_camera_config(camera_id, camera_config) ]
+        if errors:
+            raise ValueError("Configuración de cámaras inválida:\n  " + "\n  ".join(errors))
+
+        self.cameras = config
+        self.mtime = mtime
+        return config
+
+
+    def get(self, camera_id: str) -> dict:
+        """Configuración de una cámara, sin leer el archivo.
 
-    # Verificar si el archivo de configuración existe
-    if not os.path.exists("camera_config.json"):
-        raise FileNotFoundError("El archivo de configuración camera_config.json no se encuentra.")
-    
-    # Cargar la configuración desde el archivo JSON
-    with open("camera_config.json", "r") as f:
+        args:
+            camera_id (str): ID de la cámara.
+        returns:
+            dict: La configuración de la cámara.
+        """
+        # Verificar si la cámara está en la configuración
+        if camera_id not in self.cameras:
+            raise ValueError(f"Configuración no encontrada para {camera_id}")
+
+        return self.cameras[camera_id]
+
+
+    def reload(self) -> Dict[str, List[str]]:
+        """Vuelve a cargar el archivo si cambió desde la última lectura.
+
+        Un archivo inválido lanza ValueError una sola vez; se conserva la
+        configuración anterior hasta que el archivo se corrija.
+
+        returns:
+            Dict[str, List[str]]: Llaves cambiadas de cada cámara modificada.
+        """
+        try:
+            mtime = self._modified()
+        except OSError:
+            return {}
+        if mtime == self.mtime:
+            return {}
+
+        previous = self.cameras
+        try:
+            self.load()
+        except ValueError:
+            # No volver a intentar hasta que el archivo cambie otra vez
+            self.mtime = mtime
+            raise
+
+        changes = {}
+        for camera_id, camera_config in self.cameras.items():
+            previous_config = previous.get(camera_id, {})
+            changed = sorted(key for key in set(camera_config) | set(previous_config) if camera_config.get(key) != previous_config.get(key))
+            if changed:
+                changes[camera_id] = changed
+        return changes
+
+
+def update_camera_config(camera_id: str, changes: dict, path: str = CONFIG_FILE) -> dict:
+    """Actualiza llaves de una cámara en el archivo de configuración.
+
+    El archivo completo se valida con los cambios antes de escribirse y se
+    reemplaza de forma atómica, de modo que un detector que lo recargue en
+    vivo nunca lee un archivo a medio escribir.
+
+    args:
+        camera_id (str): ID de la cámara.
+        changes (dict): Llaves nuevas o modificadas de la cámara.
+        path (str, optional): Archivo de configuración. Por defecto camera_config.json en la carpeta actual.
+    returns:
+        dict: La configuración actualizada de la cámara.
+    """
+    path = Path(path)
+    with open(path, "r") as f:
         config = json.load(f)
-    
+
     # Verificar si la cámara está en la configuración
     if camera_id not in config:
         raise ValueError(f"Configuración no encontrada para {camera_id}")
 
-    return config[camera_id]
+    camera_config = {**config[camera_id], **changes}
+    errors = validate_camera_config(camera_id, camera_config)
+    if errors:
+        raise ValueError("Configuración de cámaras inválida:\n  " + "\n  ".join(errors))
+    config[camera_id] = camera_config
+
+    # Una llave por línea con su valor completo, como en el archivo escrito a mano
+    cameras = ",\n".join(
+        f"  {json.dumps(config_id)}: {{\n" + ",\n".join(
+            f"    {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}" for key, value in entry.items()) + "\n  }"
+        for config_id, entry in config.items() )
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(f"{{\n{cameras}\n}}\n")
+    os.replace(tmp_path, path)
+    return camera_config
+
+
+_registries = {}
+
+
+def get_registry(path: str = CONFIG_FILE) -> CameraConfigRegistry:
+    """Registro compartido del archivo de configuración, creado en la primera consulta.
+
+    args:
+        path (str, optional): Archivo de configuración. Por defecto camera_config.json en la carpeta actual.
+    returns:
+        CameraConfigRegistry: Registro del archivo.
+    """
+    key = os.path.abspath(path)
+    if key not in _registries:
+        _registries[key] = CameraConfigRegistry(path)
+    return _registries[key]
+
+
+def load_camera_config(camera_id: str) -> dict:
+    """Carga la configuración de la cámara desde camera_config.json.
+
+    El archivo se lee y valida una sola vez; las siguientes llamadas usan el registro en memoria.
+
+    args:
+        camera_id (str): El ID de la cámara para la que se desea cargar la configuración.
+    returns:
+        dict: La configuración de la cámara.
+    """
+    return get_registry().get(camera_id)
@@ -9,7 +9,26 @@ REDIS_SERVER= os.getenv("REDIS_SERVER", "redis-server")
 DETECTIONS_QUEUE = os.getenv("DETECTIONS_QUEUE", "detections_queue")
 BASE_DIR = Path(__file__).parent
 
-redis_client = redis.Redis(host=REDIS_SERVER, port=6379, db=0)
+# Spool local de los mensajes que no llegan a Redis, con una carpeta por proceso; vacío lo desactiva
+SPOOL_DIR = os.getenv("SPOOL_DIR", str(BASE_DIR.joinpath("spool")))
+SPOOL_MAX_MB = float(os.getenv("SPOOL_MAX_MB", 256))
+SPOOL_MAX_AGE = float(os.getenv("SPOOL_MAX_AGE", 24 * 3600))
+SPOOL_DRAIN_RATE = float(os.getenv("SPOOL_DRAIN_RATE", 50))
+
+# Carpeta de los clips de video alrededor de cada evento, con una subcarpeta por cámara; vacío los desactiva
+CLIPS_DIR = os.getenv("CLIPS_DIR", str(BASE_DIR.joinpath("clips")))
+CLIP_FPS = float(os.getenv("CLIP_FPS", 10))
+CLIP_MAX_SIZE = int(os.getenv("CLIP_MAX_SIZE", 960))
+
+# Cuadros de calibración y validación de la cuantización INT8, con una subcarpeta por cámara
+CALIBRATION_DIR = os.getenv("CALIBRATION_DIR", str(BASE_DIR.joinpath("calibration")))
+
+# Carpeta para exportar los tiempos por etapa en formato Prometheus; sin valor no se exportan
+METRICS_DIR = os.getenv("METRICS_DIR", None)
+
+# Pool de conexiones compartido: las conexiones se reutilizan entre envíos en lugar de abrirse por mensaje
+redis_pool = redis.ConnectionPool(host=REDIS_SERVER, port=6379, db=0, socket_connect_timeout=5, socket_timeout=5, health_check_interval=30)
+redis_client = redis.Redis(connection_pool=redis_pool)
 
 def get_current_timestamp():
     """Retorna el timestamp con la zona horaria configurada."""
@@ -1,20 +1,36 @@
 import supervision as sv
 import cv2
-import torch
 import argparse
+import functools
 import gc
+import json
 import itertools
-import numpy as np
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from imutils.video import FileVideoStream, WebcamVideoStream
-from modules.model_loader import ModelLoader
+from modules.model_loader import ModelLoader, BACKENDS, preload
 from modules.annotation import Annotation
+from modules.region import RegionOfInterest
+from modules.frame_pool import FramePool
+from modules.video_stream import LatestFrameStream
+from modules.pipeline import BoundedQueue, Stage
+from modules.track_registry import TrackRegistry, EVENT_NEW, EVENT_ENDED
+from modules.motion_gate import MotionGate
+from modules.rate_controller import RateController
 from modules.save_results import SaveResults
+from modules.publisher import RedisPublisher
+from modules.spool import DiskSpool
+from modules.image_profile import ImageProfile
+from modules.clip_recorder import ClipRecorder
+from camera_controller import get_registry, LIVE_KEYS
 import tools.messages as messages
+from tools.timing import StageTimer
+from tools.cpu_quota import configure_capture_threads, configure_torch_threads
 from tools.video_info import VideoInfo
 from typing import List
-from config import get_current_timestamp
+from config import get_current_timestamp, METRICS_DIR, SPOOL_DIR, SPOOL_MAX_MB, SPOOL_MAX_AGE, SPOOL_DRAIN_RATE, CLIPS_DIR, CLIP_FPS, CLIP_MAX_SIZE
 
 
 def main(
@@ -26,8 +42,22 @@ def main(
     confidence: float,
     clip: int,
     region: str,
+    max_frames: int = None,
+    queue_size: int = 8,
+    overflow: str = "block",
+    backend: str = "pt",
+    track_ttl: float = 2.0,
+    confidence_margin: float = 0.1,
+    motion: dict = None,
+    rate: dict = None,
+    image: dict = None,
+    metrics_interval: float = 5.0,
+    show_times: bool = False,
+    threads: int = None,
+    capture: dict = None,
+    config_reload: float = 2.0,
     show: bool = False
-) -> None:
+) -> dict:
     """Función principal para iniciar el procesamiento.
     
     args:
@@ -37,117 +67,431 @@ def main(
         classes (List[int]): Lista de clases a filtrar.
         size (int): Tamaño de entrada de la imagen para el modelo de detección.
         confidence (float): Umbral de confianza para la detección.
-        clip (int, optional): Duración del clip de salida en segundos. Por defecto es 0.
-        region (str, optional): Región de interés en formato JSON. Por defecto es None.
+        clip (int, optional): Segundos de video antes y después de cada objeto nuevo que se guardan
+            como clip en CLIPS_DIR. Por defecto es 0, sin clips.
+        region (str, optional): Región de interés como lista de vértices o en formato JSON. Por defecto es None.
+        max_frames (int, optional): Número máximo de cuadros a procesar. Por defecto es None.
+        queue_size (int, optional): Capacidad de las colas de anotación y de publicación. Por defecto es 8.
+        overflow (str, optional): Política de las colas llenas, "block" o "drop-oldest". Por defecto es "block".
+        backend (str, optional): Backend de inferencia: "pt", "onnx" u "openvino". Por defecto es "pt".
+        track_ttl (float, optional): Segundos sin ver un objeto para dar por terminado su seguimiento. Por defecto es 2.0.
+        confidence_margin (float, optional): Mejora de confianza que genera un nuevo evento del objeto. Por defecto es 0.1.
+        motion (dict, optional): Parámetros de MotionGate (threshold, pixel_threshold, max_skip). Por defecto es None, sin compuerta.
+        rate (dict, optional): Parámetros de RateController (target_fps, min_size, max_lag, max_stride). Por defecto es None, sin control de tasa.
+        image (dict, optional): Perfil de la imagen de evidencia (max_size, quality, crop, thumbnail). Por defecto es None, la mitad del cuadro completo.
+        metrics_interval (float, optional): Segundos entre exportaciones de los tiempos a METRICS_DIR. Por defecto es 5.0.
+        show_times (bool, optional): Mostrar los tiempos de captura, inferencia y cuadro en lugar del progreso. Por defecto es False.
+        threads (int, optional): Hilos de torch y OpenCV. Por defecto según la cuota de CPU del contenedor.
+        capture (dict, optional): Backend de captura ("opencv" o "ffmpeg"), con max_size, substream y
+            source_wh (resolución del stream principal, requerida con substream), hwaccel y threads
+            para FFmpeg. Por defecto es None, OpenCV a la resolución de la cámara.
+        config_reload (float, optional): Segundos entre revisiones de camera_config.json para aplicar en vivo
+            los cambios de región, clases y umbral. Por defecto es 2.0; None desactiva la recarga.
+    returns:
+        dict: Estadísticas de la ejecución: cuadros, tiempo, FPS, tiempos por
+            etapa, captura, colas, mensajes publicados, clips y tiempos de arranque.
     """
     # Inicializar contador de etapas del proceso de detección y seguimientos
     step_count = itertools.count(1)
-    
+
+    # Tiempos de arranque hasta la primera inferencia, en segundos
+    startup_start = time.perf_counter()
+    startup_times = {}
+
+    # Ajustar los hilos de OpenCV y FFmpeg a la cuota de CPU antes de abrir la cámara
+    thread_settings = configure_capture_threads(threads)
+
+    # Con FFmpeg el decodificador también se limita a los hilos de la cuota
+    capture_options = dict(capture or {})
+    if capture_options.get("backend") == "ffmpeg":
+        capture_options.setdefault("threads", thread_settings["threads"])
+
+    def probe_source() -> VideoInfo:
+        """Lee la información de la fuente y deja la captura abierta para la transmisión."""
+        time_probe = time.perf_counter()
+        probed_info = VideoInfo(source=source, keep_open=True, capture_options=capture_options)
+        startup_times["probe"] = time.perf_counter() - time_probe
+        return probed_info
+
+    # Abrir la fuente en otro hilo: la negociación RTSP se solapa con la importación de torch y ultralytics
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sonda-{camera_id}") as executor:
+        source_probe = executor.submit(probe_source)
+        time_imports = time.perf_counter()
+        configure_torch_threads(thread_settings["threads"])
+        preload()
+        startup_times["imports"] = time.perf_counter() - time_imports
+        source_info = source_probe.result()
+    startup_times["source"] = time.perf_counter() - startup_start
+
     # Inicializar captura de video
-    source_info = VideoInfo(source=source)
     messages.step_message(next(step_count), 'Origen del Video Inicializado ✅')
     messages.source_message(source_info)
+    if source_info.scale != 1.0:
+        messages.step_message(next(step_count), f"Captura {capture_options.get('backend', 'opencv')}: {'x'.join(map(str, source_info.source_wh))} decodificado a {'x'.join(map(str, source_info.resolution_wh))} ✅")
+
+    # Región de interés: máscara y recorte calculados una sola vez
+    if isinstance(region, str):
+        region = json.loads(region) or None
+    region_of_interest = RegionOfInterest(polygon=source_info.scale_polygon(region), resolution_wh=source_info.resolution_wh) if region else None
+    if region_of_interest is not None:
+        messages.step_message(next(step_count), f"Región de Interés {region_of_interest.width} x {region_of_interest.height} (inferencia {region_of_interest.inference_size(size)}) ✅")
+
+    # Tiempos por etapa, exportados periódicamente si METRICS_DIR está configurado
+    stage_timer = StageTimer(labels={"camera": camera_id})
 
-    # Inicializar guardado de resultados
+    # Inicializar guardado de resultados con el perfil de la imagen de evidencia; un
+    # publicador en segundo plano envía los mensajes a Redis en lotes
+    publisher = RedisPublisher(
+        maxsize=queue_size,
+        overflow=overflow,
+        timer=stage_timer,
+        spool=DiskSpool(Path(SPOOL_DIR).joinpath(camera_id), max_bytes=SPOOL_MAX_MB * 1024 * 1024, max_age=SPOOL_MAX_AGE) if SPOOL_DIR else None,
+        drain_rate=SPOOL_DRAIN_RATE )
+    image_profile = ImageProfile.from_config(image, resolution_wh=source_info.resolution_wh, region=region_of_interest)
     saving_results = SaveResults(
-        camera_id=camera_id )
-    messages.step_message(next(step_count), 'Guardado Configurado ✅')
-    
-    # Revisar disponibilidad de GPU
-    messages.step_message(next(step_count), f"Procesador: {'GPU ✅' if torch.cuda.is_available() else 'CPU ⚠️'}")
+        camera_id=camera_id,
+        image_profile=image_profile,
+        publisher=publisher )
+    messages.step_message(next(step_count), f"Guardado Configurado: imagen {'x'.join(map(str, image_profile.output_wh))} calidad {image_profile.quality}{f' · miniaturas {image_profile.thumbnail} px' if image_profile.thumbnail else ''} ✅")
 
-    # Inicializar modelo YOLO
+    # Inicializar modelo YOLO; los backends exportados usan el tamaño de inferencia de la región
+    inference_size = region_of_interest.inference_size(size) if region_of_interest is not None else size
+    time_model = time.perf_counter()
     yolo_tracker = ModelLoader(
         weights_path=weights,
-        image_size=size,
+        image_size=inference_size,
         confidence=confidence,
-        class_filter=classes )
+        class_filter=classes,
+        backend=backend )
+    startup_times["model"] = time.perf_counter() - time_model
+    warmup_time = yolo_tracker.warmup()
+    startup_times["warmup"] = warmup_time
 
+    messages.step_message(next(step_count), f"Procesador: {'GPU ✅' if yolo_tracker.device == 'cuda' else 'CPU ⚠️'} ({backend})")
+    messages.step_message(next(step_count), f"Hilos: {thread_settings['threads']} (cuota {thread_settings['quota'] or 'sin límite'}, {thread_settings['cpus']:g} CPU) · Calentamiento {inference_size} px: {warmup_time:.2f} s")
     messages.step_message(next(step_count), f"Modelo {Path(weights).stem.upper()} Inicializado ✅")
 
-    # Anotadores
+    # Grabador opcional de clips: buffer de cuadros comprimidos y escritura en segundo plano
+    clip_recorder = ClipRecorder(
+        path=Path(CLIPS_DIR).joinpath(camera_id),
+        seconds=clip,
+        fps=min(CLIP_FPS, source_info.fps or CLIP_FPS),
+        max_size=CLIP_MAX_SIZE ) if clip and CLIPS_DIR else None
+    if clip_recorder is not None:
+        messages.step_message(next(step_count), f"Clips de {clip} s antes y después de cada objeto nuevo ({clip_recorder.fps:g} FPS) ✅")
+
+    # Compuerta de movimiento opcional para omitir la inferencia en cuadros estáticos
+    motion_gate = MotionGate(**motion) if motion else None
+
+    # Controlador opcional de la tasa de inferencia; el tamaño solo se adapta con PyTorch
+    rate_controller = RateController.from_config(rate, image_size=inference_size, adapt_size=not yolo_tracker.fixed_shape) if rate else None
+
+    # Registro de objetos seguidos: solo se publican los eventos de su ciclo de vida
+    track_registry = TrackRegistry(ttl=track_ttl, confidence_margin=confidence_margin)
+
+    # Anotadores: se dibuja sobre el recorte reducido que se publica
     annotator = Annotation(
         source_info=source_info,
         fps=False,
-        trace=True )
+        trace=True,
+        scale=image_profile.scale,
+        crop=image_profile.box )
+
+    # Buffers reutilizables para la captura y el recorte de la región de interés
+    frame_pool = FramePool.from_resolution(source_info.resolution_wh, size=queue_size + 3)
+    roi_pool = FramePool.from_resolution(region_of_interest.crop_wh, size=2) if region_of_interest is not None else None
+
+    # Recarga en vivo de la configuración de la cámara, aplicada entre cuadros
+    config_registry = get_registry()
+    next_config_check = time.monotonic() + config_reload if config_reload else None
+
+    def configure_image(region: RegionOfInterest) -> None:
+        """Recorta la imagen de evidencia y las anotaciones a la región; se ejecuta en el hilo de anotación."""
+        image_profile.configure(source_info.resolution_wh, region)
+        annotator.crop, annotator.scale = image_profile.box, image_profile.scale
+
+    def reload_camera_config() -> None:
+        """Aplica los cambios de región, clases y umbral de camera_config.json sin recargar el modelo ni reconectar la cámara."""
+        nonlocal region_of_interest, roi_pool, inference_size, rate_controller
+        try:
+            changed = config_registry.reload().get(camera_id, [])
+            camera_config = config_registry.get(camera_id) if changed else None
+            if "region" in changed:
+                region = camera_config.get("region")
+                new_region = RegionOfInterest(polygon=source_info.scale_polygon(region), resolution_wh=source_info.resolution_wh) if region else None
+        except ValueError as e:
+            messages.step_message("Error", f"Configuración no aplicada, se conserva la anterior: {e}")
+            return
+
+        if "clases" in changed:
+            yolo_tracker.class_filter = camera_config["clases"]
+        if "confidence" in changed:
+            yolo_tracker.confidence = float(camera_config.get("confidence", 0.5))
+        if "region" in changed:
+            region_of_interest = new_region
+            roi_pool = FramePool.from_resolution(region_of_interest.crop_wh, size=2) if region_of_interest is not None else None
+            # Los backends exportados mantienen su tamaño fijo; con PyTorch se recalcula para la nueva región
+            if not yolo_tracker.fixed_shape:
+                inference_size = region_of_interest.inference_size(size) if region_of_interest is not None else size
+                if rate_controller is not None:
+                    rate_controller = RateController.from_config(rate, image_size=inference_size)
+            if motion_gate is not None:
+                motion_gate.reset()
+            # La imagen de evidencia recortada a la región sigue a la región nueva; la
+            # usa el hilo de anotación, que la cambia entre dos cuadros en orden de llegada
+            if image_profile.crop == "region":
+                annotate_worker.submit(functools.partial(configure_image, region_of_interest))
+
+        applied = [key for key in changed if key in LIVE_KEYS]
+        pending = [key for key in changed if key not in LIVE_KEYS]
+        if applied:
+            messages.step_message(next(step_count), f"Configuración aplicada en vivo: {', '.join(applied)} ✅")
+        if pending:
+            messages.step_message(next(step_count), f"Cambios que requieren reiniciar: {', '.join(pending)} ⚠️")
+
+    # Inicio del thread de proceso de captura de frames de video: en vivo se
+    # entrega siempre el cuadro más reciente; los archivos se leen completos.
+    # Se reutiliza la captura abierta al leer la información de la fuente.
+    video_stream = LatestFrameStream(
+        source=source,
+        frame_pool=frame_pool,
+        drop_frames=source_info.source_type == 'stream',
+        skip_duplicates=source_info.source_type == 'stream',
+        capture=source_info.capture,
+        capture_options=capture_options )
+
+    # Exportación periódica de los tiempos por etapa si METRICS_DIR está configurado
+    metrics_path = Path(METRICS_DIR).joinpath(f"detector_{camera_id}.prom") if METRICS_DIR else None
+    next_snapshot = time.monotonic()
+
+    def capture_metrics() -> List[str]:
+        """Contadores de la captura que acompañan la exportación de tiempos."""
+        capture_stats = video_stream.stats()
+        return [
+            f'detector_frames_dropped_total{{camera="{camera_id}"}} {capture_stats["dropped"]}',
+            f'detector_frames_duplicated_total{{camera="{camera_id}"}} {capture_stats["duplicates"]}' ]
+
+    # Etapas posteriores a la inferencia, cada una en su propio hilo con cola acotada:
+    # anotación/codificación -> publicador. Un cuadro descartado devuelve su buffer al pool;
+    # los cuadros con eventos nunca se descartan, para no perder alertas ni clips
+    annotate_queue = BoundedQueue(
+        maxsize=queue_size,
+        overflow=overflow,
+        on_drop=lambda item: video_stream.release(item["image"]),
+        keep=lambda item: bool(item["events"]) )
+    stop_requested = threading.Event()
+
+    def annotate_stage(item: dict) -> None:
+        """Dibuja anotaciones, codifica el mensaje de las detecciones del cuadro y lo entrega al publicador."""
+        try:
+            # Abrir un clip por cada objeto nuevo, con el ID de su detección, y guardar el cuadro sin anotar
+            if clip_recorder is not None:
+                with stage_timer.measure("clip"):
+                    for event in item["events"]:
+                        if event["evento"] == EVENT_NEW:
+                            clip_recorder.trigger(saving_results.ids.track(event["tracker_id"], event.get("inicio")), item["timestamp"])
+                    clip_recorder.add(item["image"], item["timestamp"])
+
+            # Actualizar los rastros en cada cuadro, pero dibujar solo si la imagen se publica o se muestra
+            with stage_timer.measure("annotation"):
+                annotator.forget([event["tracker_id"] for event in item["events"] if event["evento"] == EVENT_ENDED])
+                annotator.update(item["detections"])
+                if show or saving_results.needs_image(item["detections"], item["events"]):
+                    annotated_image = annotator.render(detections=item["detections"], scene=item["image"])
+                else:
+                    annotated_image = None
+
+            # Codificar los eventos del cuadro en un solo mensaje con una sola imagen, ya reducida
+            with stage_timer.measure("encoding"):
+                detection_message = saving_results.build_message(detections=item["detections"], image=annotated_image, events=item["events"], image_scale=1.0, frame=item["image"])
+            if detection_message is not None:
+                saving_results.publish(detection_message)
+
+            # Mostrar resultados en vivo
+            if show:
+                cv2.namedWindow('Resultado', cv2.WINDOW_NORMAL)
+                cv2.resizeWindow('Resultado', 1280, 720)
+                cv2.imshow("Resultado", annotated_image)
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    print("Saliendo...")
+                    stop_requested.set()
+        finally:
+            # Devolver el buffer del cuadro al pool de captura
+            video_stream.release(item["image"])
 
-    # Inicio del thread de proceso de captura de frames de video
-    if source_info.source_type == 'stream':
-        video_stream = WebcamVideoStream(src=eval(source) if source.isnumeric() else source)
-    elif source_info.source_type == 'file':
-        video_stream = FileVideoStream(source)
+    annotate_worker = Stage("anotacion", annotate_stage, annotate_queue).start()
+    publisher.start()
+    if clip_recorder is not None:
+        clip_recorder.start()
 
     # Inicializar variables
     frame_number = 0
-    video_stream.stream.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+    last_detections = sv.Detections.empty()
+    tracker_state = False
     fps_monitor = sv.FPSMonitor()
 
+    # Congelar los objetos creados durante la inicialización (modelo, librerías)
+    # para que el recolector de basura no los recorra en cada ciclo
+    gc.freeze()
+
     # Iniciar procesamiento de video
     messages.step_message(next(step_count), 'Procesamiento de Video Iniciado ✅')
     time_start = get_current_timestamp()
+    reconnects = 0
     video_stream.start()
 
     try:
-        while video_stream.more() if source_info.source_type == 'file' else True:
-            fps_monitor.tick()
-            fps_value = fps_monitor.fps
-            
-            image = video_stream.read()
+        while video_stream.more() and not stop_requested.is_set():
+            if max_frames is not None and frame_number >= max_frames:
+                break
+
+            # Esperar el cuadro más reciente; la captura se reconecta sola si la fuente falla
+            image = video_stream.read(timeout=1.0)
             if image is None:
-                # gc.collect()
-                print("Reconexión fallida tras varios intentos. Finalizando...")
+                if not video_stream.connected and reconnects != video_stream.reconnects:
+                    reconnects = video_stream.reconnects
+                    messages.step_message("Error", f"Cámara sin cuadros, reintento de conexión {reconnects}")
                 continue
-            annotated_image = image.copy()
 
-            if region:
-                # Extraer región de interés 
-                mask = np.zeros_like(annotated_image[:, :, 0])
-                mask = cv2.fillPoly(mask, [np.array(region)], 255)
-                masked_frame = cv2.bitwise_and(annotated_image, annotated_image, mask=mask)
+            # Revisar camera_config.json entre cuadros
+            if next_config_check is not None and time.monotonic() >= next_config_check:
+                next_config_check = time.monotonic() + config_reload
+                reload_camera_config()
+
+            # Procesar solo uno de cada `stride` cuadros según el controlador de tasa
+            if rate_controller is not None and not rate_controller.should_process():
+                video_stream.release(image)
+                continue
 
-                # Inferencia sobre la región de interés
-                results = yolo_tracker.track(image=masked_frame)
-                del masked_frame
+            fps_monitor.tick()
+            fps_value = fps_monitor.fps
+            time_frame = time.perf_counter()
+            stage_timer.record("capture", video_stream.capture_time)
+
+            if region_of_interest is not None:
+                # Recorte de la región de interés, escrito en un buffer reutilizable
+                with stage_timer.measure("masking"):
+                    roi_buffer = roi_pool.acquire()
+                    inference_image = region_of_interest.crop(image, out=roi_buffer)
             else:
-                # Inferencia sobre toda la imagen
-                results = yolo_tracker.track(image=image)
+                roi_buffer = None
+                inference_image = image
 
-            # Conversión deresultados a formato Supervision
-            detections = sv.Detections.from_ultralytics(ultralytics_results=results)
-    
-            # Dibujar anotaciones
-            annotated_image = annotator.on_detections(detections=detections, scene=image)
-            if detections:
-                # Enviar detecciones
-                saving_results.send_detection(detections=detections, image=annotated_image)
+            # Omitir la inferencia si no hubo movimiento; se conservan las últimas detecciones
+            if motion_gate is None or motion_gate.update(inference_image):
+                time_inference = time.perf_counter()
+                results = yolo_tracker.track(
+                    image=inference_image,
+                    image_size=rate_controller.size if rate_controller is not None else inference_size )
+                inference_time = time.perf_counter() - time_inference
+                stage_timer.record("inference", inference_time)
+                if "first_inference" not in startup_times:
+                    startup_times["first_inference"] = time.perf_counter() - startup_start
+                if rate_controller is not None:
+                    rate_controller.update(
+                        latency=inference_time,
+                        lag=time.time() - video_stream.timestamp )
 
-            # Presentar progreso en la terminal
-            messages.progress_message(frame_number, source_info.total_frames, fps_value)
-            
-            frame_number += 1
+                # Conversión de resultados a formato Supervision en coordenadas del cuadro completo
+                with stage_timer.measure("conversion"):
+                    detections = sv.Detections.from_ultralytics(ultralytics_results=results)
+                    if region_of_interest is not None:
+                        detections = region_of_interest.to_frame(detections)
+            else:
+                detections = last_detections
+            last_detections = detections
 
-            # Mostrar resultados en vivo
-            if show:
-                cv2.namedWindow('Resultado', cv2.WINDOW_NORMAL)
-                cv2.resizeWindow('Resultado', 1280, 720)
-                cv2.imshow("Resultado", annotated_image)
-                if cv2.waitKey(1) & 0xFF == ord("q"):
-                    print("Saliendo...")
-                    break
+            if roi_buffer is not None:
+                roi_pool.release(roi_buffer)
+
+            # Eventos del ciclo de vida de los objetos seguidos
+            events = track_registry.update(detections, video_stream.timestamp)
+
+            # Sin objetos activos desde hace más de `track_ttl`, el estado de ByteTrack ya no sirve
+            if len(detections):
+                tracker_state = True
+            elif tracker_state and not track_registry.tracks:
+                yolo_tracker.clear_tracks()
+                tracker_state = False
+
+            # Pasar el cuadro a la etapa de anotación sin esperar la codificación ni el envío
+            annotate_queue.put({
+                "frame_number": frame_number,
+                "timestamp": video_stream.timestamp,
+                "image": image,
+                "detections": detections,
+                "events": events })
+            stage_timer.record("frame", time.perf_counter() - time_frame)
 
-            # Liberar variables
-            del image, annotated_image, results
-            gc.collect()
+            # Exportar la instantánea de tiempos para el recolector local
+            if metrics_path is not None and time.monotonic() >= next_snapshot:
+                next_snapshot = time.monotonic() + metrics_interval
+                stage_timer.write_snapshot(metrics_path, extra=capture_metrics())
+
+            # Presentar progreso en la terminal
+            if show_times:
+                messages.times_message(frame_number, source_info.total_frames, fps_value, stage_timer.series())
+            else:
+                capture_stats = video_stream.stats()
+                messages.progress_message(frame_number, source_info.total_frames, fps_value, {
+                    "Descartados": capture_stats["dropped"],
+                    "Duplicados": capture_stats["duplicates"],
+                    "Retraso": f"{1000 * (time.time() - video_stream.timestamp):.0f} ms",
+                    "Objetos": len(track_registry.tracks),
+                    **({"Movimiento": f"{motion_gate.score:.3f}",
+                        "Omitidos": motion_gate.skipped,
+                        "Inferencia": f"{motion_gate.inference_rate:.0%}"} if motion_gate is not None else {}),
+                    **({"Control": f"x{rate_controller.stride} {rate_controller.size}px {rate_controller.decision}"} if rate_controller is not None else {}),
+                    "Cola anot.": f"{annotate_queue.qsize()}/{annotate_queue.dropped}",
+                    "Cola pub.": f"{publisher.queue.qsize()}/{publisher.queue.dropped}",
+                    **({"Spool": publisher.spool.pending} if publisher.spool is not None and publisher.spool.pending else {}) })
+
+            frame_number += 1
 
     except KeyboardInterrupt:
         messages.step_message(next(step_count), 'Fin del video ✅')
 
-    # Finalizar y mostrar tiempo total
-    messages.step_message(next(step_count), f"Tiempo Total: {(get_current_timestamp() - time_start).total_seconds():.2f} s")
+    # Terminar las etapas pendientes en orden antes de cerrar la captura
+    annotate_worker.stop()
+
+    # Cerrar los seguimientos activos con su resumen
+    final_message = saving_results.build_message(detections=sv.Detections.empty(), image=None, events=track_registry.flush())
+    if final_message is not None:
+        saving_results.publish(final_message)
+    publisher.stop()
+    if clip_recorder is not None:
+        clip_recorder.stop()
+        clip_stats = clip_recorder.stats()
+        messages.step_message(next(step_count), f"Clips escritos: {clip_stats['written']} de {clip_stats['started']} (omitidos {clip_stats['skipped'] + clip_stats['dropped']}, errores {clip_stats['errors']})")
+
+    # Finalizar y mostrar los tiempos por etapa y el tiempo total
+    messages.timing_message(stage_timer.summary())
+    if metrics_path is not None:
+        stage_timer.write_snapshot(metrics_path, extra=capture_metrics())
+    if motion_gate is not None:
+        messages.step_message(next(step_count), f"Cuadros sin movimiento omitidos: {motion_gate.skipped} de {motion_gate.frames} (inferencia {motion_gate.inference_rate:.0%})")
+    if "first_inference" in startup_times:
+        messages.step_message(next(step_count), f"Primera inferencia: {startup_times['first_inference']:.2f} s desde el arranque (fuente {startup_times['source']:.2f} s, modelo {startup_times['model']:.2f} s, calentamiento {startup_times['warmup']:.2f} s)")
+    messages.publisher_message(next(step_count), publisher.stats())
+    elapsed_time = (get_current_timestamp() - time_start).total_seconds()
+    messages.step_message(next(step_count), f"Tiempo Total: {elapsed_time:.2f} s")
     video_stream.stop()
     if show:
         cv2.destroyAllWindows()
 
+    return {
+        "frames": frame_number,
+        "elapsed_s": elapsed_time,
+        "fps": frame_number / elapsed_time if elapsed_time > 0 else 0.0,
+        "stages": stage_timer.summary(),
+        "capture": video_stream.stats(),
+        "queues": {worker.name: worker.stats() for worker in (annotate_worker, publisher)},
+        "messages": publisher.published,
+        "message_bytes": publisher.published_bytes,
+        "clips": clip_recorder.stats() if clip_recorder is not None else None,
+        "startup": startup_times,
+    }
+
 
 if __name__ == "__main__":
     # Inicializar argumentos de entrada
@@ -160,6 +504,7 @@ if __name__ == "__main__":
     parser.add_argument('--confidence', type=float, default=0.5, help='inference confidence threshold')
     parser.add_argument('--clip', type=int, default=0, help='duration of output video clips in seconds')
     parser.add_argument('--region', type=str, default="0", help='region of interest')
+    parser.add_argument('--backend', type=str, default="pt", choices=BACKENDS, help='inference backend')
 
     option = parser.parse_args()
 
@@ -174,5 +519,6 @@ if __name__ == "__main__":
         size=option.size,
         confidence=option.confidence,
         clip=option.clip,
-        region=option.region
+        region=option.region,
+        backend=option.backend
     )
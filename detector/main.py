@@ -1,19 +1,40 @@
 import argparse
 from camera_controller import load_camera_config
-import detector_controller
 from config import BASE_DIR
+from typing import List
 
 
-def main(camara_id: str) -> None:
-    """Función principal para iniciar el 
-    
+def main(camara_ids: List[str]) -> None:
+    """Función principal para iniciar el
+
     args:
-        camara_id (str): ID de la cámara.
+        camara_ids (List[str]): IDs de las cámaras. Con más de una cámara se
+            usa un solo proceso con inferencia en lote.
     """
+    if len(camara_ids) > 1:
+        # Cargar la configuración de todas las cámaras
+        cameras = {camara_id: load_camera_config(camara_id) for camara_id in camara_ids}
+        weights = {camera_config.get("weights", 'weights/tunel_yolo11n.pt') for camera_config in cameras.values()}
+        backends = {camera_config.get("backend", "pt") for camera_config in cameras.values()}
+        if len(weights) > 1 or len(backends) > 1:
+            raise ValueError(f"Las cámaras {', '.join(camara_ids)} deben compartir los mismos pesos y backend para procesarse en lote")
+
+        # Inicializar el controlador de detección en lote
+        import multi_detector_controller
+        multi_detector_controller.main(
+        cameras=cameras,
+        weights=BASE_DIR.joinpath(weights.pop()).resolve(),
+        size=max(int(camera_config.get("size", 1280)) for camera_config in cameras.values()),
+        backend=backends.pop(),)
+        return
+
+    camara_id = camara_ids[0]
+
     # Cargar la configuración de la cámara
     camera_config = load_camera_config(camara_id)
 
     # Inicializar el controlador de detección
+    import detector_controller
     detector_controller.main(
     source=camera_config["url"],
     camera_id=camara_id,
@@ -22,12 +43,22 @@ def main(camara_id: str) -> None:
     size=int(camera_config.get("size", 1280)),
     confidence=float(camera_config.get("confidence", 0.5)),
     clip=int(camera_config.get("clip", 0)),
-    region=camera_config.get("region", None),)
+    region=camera_config.get("region", None),
+    queue_size=int(camera_config.get("pipeline", {}).get("queue_size", 8)),
+    overflow=camera_config.get("pipeline", {}).get("overflow", "block"),
+    backend=camera_config.get("backend", "pt"),
+    track_ttl=float(camera_config.get("events", {}).get("ttl", 2.0)),
+    confidence_margin=float(camera_config.get("events", {}).get("confidence_margin", 0.1)),
+    motion=camera_config.get("motion", None),
+    rate=camera_config.get("rate", None),
+    image=camera_config.get("image", None),
+    threads=camera_config.get("threads", None),
+    capture=camera_config.get("capture", None),)
 
 
 if __name__ == "__main__":
     # Inicializar argumentos de entrada
     parser = argparse.ArgumentParser()
-    parser.add_argument('--camara-id', type=str, required=True, help='id de la cámara')
+    parser.add_argument('--camara-id', nargs='+', type=str, required=True, help='id de la cámara: --camara-id 1, o --camara-id 1 2 3 para inferencia en lote')
     option = parser.parse_args()
-    main(camara_id=option.camara_id)
+    main(camara_ids=option.camara_id)
@@ -1,6 +1,11 @@
 import supervision as sv
 import numpy as np
+import copy
+import cv2
 
+from typing import Tuple
+
+from modules.image_profile import interpolation
 from tools.video_info import VideoInfo
 
 
@@ -20,6 +25,11 @@ class Annotation:
         vertex_label (bool): Mostrar etiquetas de los vértices de los puntos clave de posiciones.
         track_length (int): Longitud de los rastros de seguimiento.
         color_opacity (float): Opacidad de las cajas de colores.
+        scale (float): Escala de la imagen anotada respecto al recorte.
+            La escena se reduce antes de dibujar y las cajas se escalan, de
+            modo que el dibujo cuesta lo mismo que la imagen publicada.
+        crop (Tuple[int, int, int, int]): Recorte (x, y, ancho, alto) del cuadro que
+            se anota, por ejemplo el de la región de interés; None para el cuadro completo.
     """
     def __init__(
         self,
@@ -36,6 +46,8 @@ class Annotation:
         vertex_label: bool = False,
         track_length: int = 50,
         color_opacity: float = 0.5,
+        scale: float = 1.0,
+        crop: Tuple[int, int, int, int] = None,
     ) -> None:
         self.fps = fps
         self.label = label
@@ -47,10 +59,14 @@ class Annotation:
         self.vertex = vertex
         self.edge = edge
         self.vertex_label = vertex_label
+        self.scale = scale
+        self.crop = crop if crop is not None else (0, 0, source_info.width, source_info.height)
         
-        # Annotators
-        line_thickness = int(sv.calculate_optimal_line_thickness(resolution_wh=source_info.resolution_wh) * 0.5)
-        text_scale = sv.calculate_optimal_text_scale(resolution_wh=source_info.resolution_wh) * 0.5
+        # Annotators, con grosores calculados para la resolución de la imagen anotada
+        resolution_wh = (int(self.crop[2] * scale), int(self.crop[3] * scale))
+        line_thickness = max(1, int(sv.calculate_optimal_line_thickness(resolution_wh=resolution_wh) * 0.5))
+        text_scale = sv.calculate_optimal_text_scale(resolution_wh=resolution_wh) * 0.5
+        self.line_thickness = line_thickness
 
         COLOR_LIST = sv.ColorPalette.from_hex([
             '#ff2d55', # Rojo
@@ -62,6 +78,7 @@ class Annotation:
             '#46f0f0', # cian
             '#d2f53c', # verde limon
         ])
+        self.color_list = COLOR_LIST
         
         if self.fps: self.fps_monitor = sv.FPSMonitor()
         
@@ -78,13 +95,108 @@ class Annotation:
         if self.vertex_label: self.vertex_label_annotator = sv.VertexLabelAnnotator(border_radius=line_thickness, color=sv.Color.YELLOW, text_color=sv.Color.BLACK)
 
 
+    def update(self, detections: sv.Detections) -> None:
+        """Actualiza el historial de rastros sin dibujar; debe llamarse en cada cuadro.
+
+        Args:
+            detections (sv.Detections): Detecciones del cuadro en coordenadas del cuadro original.
+        """
+        if not self.trace:
+            return
+        trace = self.trace_annotator.trace
+        if detections.tracker_id is not None:
+            trace.put(detections)
+        else:
+            trace.current_frame_id += 1
+
+        # Los cuadros sin objetos también cuentan para la longitud de los rastros: se descartan
+        # los puntos más antiguos que `track_length` cuadros aunque no haya llegado ninguno nuevo
+        self._keep_points(trace.frame_id >= trace.current_frame_id - trace.max_size)
+
+
+    def forget(self, tracker_ids: list) -> None:
+        """Descarta los rastros de objetos terminados.
+
+        Args:
+            tracker_ids (list): IDs de seguimiento de los objetos terminados.
+        """
+        if not self.trace or not len(tracker_ids):
+            return
+        self._keep_points(~np.isin(self.trace_annotator.trace.tracker_id, list(tracker_ids)))
+
+
+    def _keep_points(self, keep: np.array) -> None:
+        trace = self.trace_annotator.trace
+        if not keep.all():
+            trace.frame_id, trace.xy, trace.tracker_id = trace.frame_id[keep], trace.xy[keep], trace.tracker_id[keep]
+
+
+    def render(self, detections: sv.Detections, scene: np.array) -> np.array:
+        """Dibuja las detecciones sobre una copia recortada y reducida de la escena.
+
+        Solo se debe llamar cuando la imagen se va a publicar o mostrar; el
+        historial de rastros se actualiza aparte con `update`. La escena
+        original nunca se modifica.
+
+        Args:
+            detections (sv.Detections): Detecciones en coordenadas del cuadro original.
+            scene (np.array): Cuadro original.
+
+        Returns:
+            np.array: Imagen anotada del recorte, del tamaño `scale` del recorte.
+        """
+        x, y, width, height = self.crop
+        offset = np.array([x, y, x, y], dtype=np.float32)
+        if (x, y, width, height) != (0, 0, scene.shape[1], scene.shape[0]):
+            scene = scene[y:y + height, x:x + width]
+        if self.scale != 1.0:
+            scene = cv2.resize(scene, (int(width * self.scale), int(height * self.scale)), interpolation=interpolation(self.scale))
+        else:
+            # Sin escala: copiar para no dibujar sobre el cuadro capturado, que
+            # también se usa sin anotar para las miniaturas y los clips
+            scene = scene.copy()
+
+        scaled_detections = copy.copy(detections)
+        scaled_detections.xyxy = (detections.xyxy - offset) * self.scale
+
+        scene = self.draw(scaled_detections, scene)
+
+        # Dibujar los rastros guardados, escalados a la imagen anotada
+        if self.trace and detections.tracker_id is not None:
+            for class_id, tracker_id in zip(detections.class_id, detections.tracker_id):
+                points = self.trace_annotator.trace.get(tracker_id=int(tracker_id))
+                if len(points) > 1:
+                    scene = cv2.polylines(
+                        scene,
+                        [((points - offset[:2]) * self.scale).astype(np.int32)],
+                        False,
+                        color=self.color_list.by_idx(int(class_id)).as_bgr(),
+                        thickness=self.line_thickness )
+
+        return scene
+
+
     def on_detections(self, detections: sv.Detections, scene: np.array) -> np.array:
-        """Dibuja cajas de detecciones en la escena.
+        """Actualiza los rastros y dibuja las detecciones en la escena.
 
         Args:
             detections (sv.Detections): Detecciones a anotar.
             scene (np.array): Imagen de la escena.
 
+        Returns:
+            np.array: Imagen de la escena con anotaciones, del tamaño `scale` del cuadro.
+        """
+        self.update(detections)
+        return self.render(detections, scene)
+
+
+    def draw(self, detections: sv.Detections, scene: np.array) -> np.array:
+        """Dibuja FPS, etiquetas, cajas y mapas en la escena, sin los rastros.
+
+        Args:
+            detections (sv.Detections): Detecciones en coordenadas de la escena.
+            scene (np.array): Imagen de la escena.
+
         Returns:
             np.array: Imagen de la escena con anotaciones.
         """
@@ -124,12 +236,6 @@ class Annotation:
                 scene=scene,
                 detections=detections )
             
-        # Draw tracks
-        if self.trace and detections.tracker_id is not None:
-            scene = self.trace_annotator.annotate(
-                scene=scene,
-                detections=detections )
-            
         # Draw color boxes
         if self.colorbox:
             scene = self.color_annotator.annotate(
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ultralytics.engine.results import Results
+
+
+class CameraTracker:
+    """Clase para mantener el estado de seguimiento ByteTrack de una cámara.
+
+    Replica el comportamiento de `model.track(persist=True)` de ultralytics,
+    pero desacoplado de la inferencia, de modo que varias cámaras puedan
+    compartir un mismo lote de inferencia sin mezclar sus seguimientos.
+
+    attributes:
+        tracker (BYTETracker): Seguidor ByteTrack de la cámara.
+    """
+    def __init__(
+        self,
+        tracker_config: str = "bytetrack.yaml",
+        frame_rate: int = 30
+    ) -> None:
+        # ultralytics se importa al crear el seguidor, como en ModelLoader
+        from ultralytics.trackers.byte_tracker import BYTETracker
+        from ultralytics.utils import IterableSimpleNamespace, yaml_load
+        from ultralytics.utils.checks import check_yaml
+
+        config = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_config)))
+        self.tracker = BYTETracker(args=config, frame_rate=frame_rate)
+
+
+    def update(self, results: Results) -> Results:
+        """Actualiza el seguimiento con los resultados de detección de un cuadro.
+
+        args:
+            results (Results): Resultados de detección de la cámara.
+        returns:
+            Results: Resultados con los IDs de seguimiento asignados.
+        """
+        detections = results.boxes.cpu().numpy()
+        if len(detections) == 0:
+            return results
+
+        tracks = self.tracker.update(detections, results.orig_img)
+        if len(tracks) == 0:
+            return results
+
+        import torch
+
+        tracked_results = results[tracks[:, -1].astype(int)]
+        tracked_results.update(boxes=torch.as_tensor(tracks[:, :-1]))
+
+        return tracked_results
+
+
+    def clear(self) -> int:
+        """Descarta el estado de todos los seguimientos; ver `clear_tracks`."""
+        return clear_tracks(self.tracker)
+
+
+def clear_tracks(tracker) -> int:
+    """Descarta los seguimientos activos, perdidos y eliminados de un BYTETracker.
+
+    ByteTrack solo envejece sus seguimientos perdidos cuando recibe
+    detecciones, de modo que tras un periodo sin objetos conserva el estado de
+    objetos que ya se fueron. A diferencia de `BYTETracker.reset`, no reinicia
+    el contador de IDs, para que un objeto nuevo no reciba el ID de uno anterior.
+
+    args:
+        tracker (BYTETracker): Seguidor a limpiar.
+    returns:
+        int: Seguimientos descartados.
+    """
+    cleared = len(tracker.tracked_stracks) + len(tracker.lost_stracks) + len(tracker.removed_stracks)
+    tracker.tracked_stracks, tracker.lost_stracks, tracker.removed_stracks = [], [], []
+    return cleared
@@ -0,0 +1,219 @@
+import os
+import threading
+import traceback
+from collections import deque
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from modules.image_profile import encode_jpeg, interpolation
+from modules.pipeline import BoundedQueue
+
+
+class ClipRecorder:
+    """Grabador de clips alrededor de los eventos de una cámara.
+
+    Guarda los últimos `seconds` segundos de video en un buffer circular de
+    cuadros ya comprimidos en JPEG y reducidos, de modo que la memoria depende
+    del tamaño comprimido y no de la resolución de la cámara. Con `trigger` se
+    abre un clip con los cuadros anteriores al evento, que sigue recibiendo
+    cuadros hasta `seconds` segundos después; al completarse pasa a un hilo
+    propio que escribe el archivo. La cola del escritor descarta el clip más
+    antiguo si se llena, por lo que la escritura nunca detiene a quien agrega
+    los cuadros.
+
+    Lo usa un solo hilo (la etapa de anotación); las estadísticas se pueden
+    consultar desde cualquier hilo.
+
+    attributes:
+        path (Path): Carpeta de los clips; se crea con el primer clip.
+        seconds (float): Segundos antes y después del evento.
+        fps (float): Cuadros por segundo máximos guardados en el buffer.
+        max_size (int): Lado mayor de los cuadros guardados, en pixeles.
+        quality (int): Calidad JPEG de los cuadros guardados.
+        max_bytes (int): Tamaño máximo del buffer circular.
+        max_active (int): Clips abiertos a la vez; los eventos que excedan el límite no se graban.
+        queue (BoundedQueue): Clips completos pendientes de escribir.
+        started (int): Clips abiertos.
+        skipped (int): Eventos no grabados por exceder `max_active`.
+        written (int): Clips escritos.
+        errors (int): Clips que no se pudieron escribir.
+    """
+    def __init__(
+        self,
+        path: str,
+        seconds: float,
+        fps: float = 10.0,
+        max_size: int = 960,
+        quality: int = 80,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_active: int = 8,
+        max_pending: int = 4
+    ) -> None:
+        self.path = Path(path)
+        self.seconds = float(seconds)
+        self.fps = float(fps)
+        self.max_size = max_size
+        self.quality = quality
+        self.max_bytes = int(max_bytes)
+        self.max_active = max_active
+        self.queue = BoundedQueue(maxsize=max_pending, overflow="drop-oldest")
+
+        self.started = 0
+        self.skipped = 0
+        self.written = 0
+        self.errors = 0
+
+        # Buffer circular de (hora, JPEG) y clips abiertos; los clips comparten los bytes del buffer
+        self._frames = deque()
+        self._buffer_bytes = 0
+        self._active = []
+        self._last_time = None
+
+        self._thread = threading.Thread(target=self._run, name="grabador-clips", daemon=True)
+
+
+    def start(self) -> "ClipRecorder":
+        self._thread.start()
+        return self
+
+
+    def add(self, frame: np.array, timestamp: float) -> None:
+        """Agrega un cuadro al buffer y a los clips abiertos.
+
+        Los cuadros que llegan antes del intervalo de `fps` se omiten sin codificar.
+
+        args:
+            frame (np.array): Cuadro original, sin anotaciones.
+            timestamp (float): Hora de captura del cuadro, en segundos.
+        """
+        if self._last_time is not None and self._last_time <= timestamp < self._last_time + 1.0 / self.fps:
+            self._finish(timestamp)
+            return
+        self._last_time = timestamp
+
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.max_size / max(width, height))
+        if scale < 1.0:
+            frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=interpolation(scale))
+        entry = (timestamp, encode_jpeg(frame, self.quality))
+
+        self._frames.append(entry)
+        self._buffer_bytes += len(entry[1])
+        # Conservar solo los cuadros que puede necesitar un clip nuevo, dentro del tamaño máximo
+        while self._frames and (self._frames[0][0] < timestamp - self.seconds or self._buffer_bytes > self.max_bytes):
+            self._buffer_bytes -= len(self._frames.popleft()[1])
+
+        for clip in self._active:
+            clip["frames"].append(entry)
+        self._finish(timestamp)
+
+
+    def trigger(self, name: str, timestamp: float) -> bool:
+        """Abre un clip con los cuadros del buffer desde `seconds` antes del evento.
+
+        args:
+            name (str): Nombre del archivo sin extensión, por ejemplo el ID de la detección.
+            timestamp (float): Hora del evento, en segundos.
+        returns:
+            bool: False si ya hay `max_active` clips abiertos.
+        """
+        if len(self._active) >= self.max_active:
+            self.skipped += 1
+            return False
+
+        self._active.append({
+            "name": name,
+            "end": timestamp + self.seconds,
+            "frames": [entry for entry in self._frames if entry[0] >= timestamp - self.seconds] })
+        self.started += 1
+        return True
+
+
+    def _finish(self, timestamp: float) -> None:
+        """Entrega al escritor los clips que ya cubren `seconds` después del evento."""
+        finished = [clip for clip in self._active if timestamp >= clip["end"]]
+        if finished:
+            self._active = [clip for clip in self._active if timestamp < clip["end"]]
+            for clip in finished:
+                self.queue.put(clip)
+
+
+    def _run(self) -> None:
+        while not self.queue.closed:
+            clip = self.queue.get(timeout=0.5)
+            if clip is not None:
+                self._write_counted(clip)
+
+
+    def _write_counted(self, clip: dict) -> None:
+        try:
+            self.write(clip)
+            self.written += 1
+        except Exception:
+            self.errors += 1
+            print(f"\nError al escribir el clip {clip['name']}:\n{traceback.format_exc()}")
+
+
+    def write(self, clip: dict) -> Path:
+        """Escribe un clip en un archivo AVI Motion JPEG.
+
+        Los FPS del archivo son los medidos entre el primer y el último cuadro,
+        para que la duración del clip corresponda a la real. El archivo se
+        escribe con otro nombre y se renombra al terminar, de modo que nunca
+        se ve un clip incompleto.
+
+        args:
+            clip (dict): Clip con su nombre y lista de cuadros (hora, JPEG).
+        returns:
+            Path: Ruta del clip, o None si no tiene cuadros.
+        """
+        frames = clip["frames"]
+        if not frames:
+            return None
+
+        span = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / span if len(frames) > 1 and span > 0 else self.fps
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        clip_path = self.path.joinpath(f"{clip['name']}.avi")
+        temporary_path = self.path.joinpath(f"{clip['name']}.tmp.avi")
+
+        writer = None
+        try:
+            for _, jpeg in frames:
+                image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if writer is None:
+                    height, width = image.shape[:2]
+                    writer = cv2.VideoWriter(str(temporary_path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+                writer.write(image)
+        finally:
+            if writer is not None:
+                writer.release()
+        os.replace(temporary_path, clip_path)
+        return clip_path
+
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Espera a que se escriban los clips pendientes y escribe los abiertos con los cuadros que tengan."""
+        self.queue.close()
+        self._thread.join(timeout)
+
+        # Al terminar ya no hay cuadros que detener: los clips abiertos se escriben en este hilo
+        active, self._active = self._active, []
+        for clip in active:
+            self._write_counted(clip)
+
+
+    def stats(self) -> dict:
+        return {
+            "buffer_frames": len(self._frames),
+            "buffer_bytes": self._buffer_bytes,
+            "active": len(self._active),
+            "started": self.started,
+            "skipped": self.skipped,
+            "written": self.written,
+            "dropped": self.queue.dropped,
+            "errors": self.errors,
+        }
@@ -0,0 +1,94 @@
+import numpy as np
+import threading
+from collections import deque
+
+from typing import Tuple
+
+
+class FramePool:
+    """Clase para reutilizar buffers de imágenes preasignados.
+
+    Evita crear un arreglo nuevo por cada cuadro: los buffers se toman con
+    `acquire` y se devuelven con `release` cuando ya no se necesitan. Si el
+    pool se agota se asigna un buffer adicional, que queda en el pool.
+
+    attributes:
+        shape (Tuple[int, ...]): Forma de los buffers.
+        dtype (np.dtype): Tipo de dato de los buffers.
+        allocated (int): Total de buffers asignados.
+        misses (int): Veces que fue necesario asignar o copiar fuera del pool.
+    """
+    def __init__(
+        self,
+        shape: Tuple[int, ...],
+        size: int = 4,
+        dtype: np.dtype = np.uint8
+    ) -> None:
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.allocated = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._free = deque()
+        self._owned = set()
+        for _ in range(size):
+            self._free.append(self._allocate())
+
+
+    @classmethod
+    def from_resolution(cls, resolution_wh: Tuple[int, int], size: int = 4, channels: int = 3) -> "FramePool":
+        """Crea un pool de cuadros BGR a partir de la resolución del video."""
+        width, height = resolution_wh
+        return cls(shape=(height, width, channels), size=size)
+
+
+    def _allocate(self) -> np.array:
+        # Los buffers inician en ceros: las salidas enmascaradas solo escriben
+        # dentro de la máscara y dependen de que el exterior permanezca en negro
+        buffer = np.zeros(self.shape, dtype=self.dtype)
+        self._owned.add(id(buffer))
+        self.allocated += 1
+        return buffer
+
+
+    def acquire(self) -> np.array:
+        """Toma el último buffer liberado, que probablemente sigue en caché."""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            self.misses += 1
+            return self._allocate()
+
+
+    def release(self, buffer: np.array) -> None:
+        """Devuelve un buffer al pool. Los arreglos ajenos al pool se ignoran."""
+        if buffer is None:
+            return
+        with self._lock:
+            if id(buffer) in self._owned and not any(buffer is free for free in self._free):
+                self._free.append(buffer)
+
+
+    def copy(self, image: np.array) -> np.array:
+        """Copia una imagen en un buffer del pool.
+
+        args:
+            image (np.array): Imagen a copiar.
+        returns:
+            np.array: Buffer del pool con la copia, o una copia nueva si la
+                forma de la imagen no coincide con la del pool.
+        """
+        if image.shape != self.shape or image.dtype != self.dtype:
+            with self._lock:
+                self.misses += 1
+            return image.copy()
+
+        buffer = self.acquire()
+        np.copyto(buffer, image)
+        return buffer
+
+
+    @property
+    def available(self) -> int:
+        return len(self._free)
@@ -0,0 +1,152 @@
+import base64
+import cv2
+import numpy as np
+
+from typing import Tuple
+
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+
+# Recortes de la imagen de contexto: cuadro completo o rectángulo de la región de interés
+CROPS = ("full", "region")
+
+# Escala de la imagen de contexto cuando el perfil no fija un tamaño máximo
+DEFAULT_SCALE = 0.5
+
+
+def interpolation(scale: float) -> int:
+    """Interpolación para reducir una imagen a la escala indicada.
+
+    INTER_AREA evita el aliasing en reducciones fuertes, pero con escalas no
+    enteras cuesta varias veces más que INTER_LINEAR, que basta hasta la mitad.
+    """
+    return cv2.INTER_AREA if scale <= 0.5 else cv2.INTER_LINEAR
+
+
+def encode_jpeg(image: np.array, quality: int = 95) -> bytes:
+    """Codifica una imagen BGR en JPEG con el codificador más rápido disponible.
+
+    Usa simplejpeg (libjpeg-turbo sin copias intermedias) si está instalado y
+    OpenCV en caso contrario. Ambos usan submuestreo 4:2:0.
+
+    args:
+        image (np.array): Imagen BGR.
+        quality (int, optional): Calidad JPEG de 1 a 100. Por defecto es 95, la de OpenCV.
+    returns:
+        bytes: Imagen codificada.
+    """
+    if simplejpeg is not None:
+        return simplejpeg.encode_jpeg(np.ascontiguousarray(image), quality=quality, colorspace="BGR", colorsubsampling="420", fastdct=True)
+
+    success, encoded_image = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not success:
+        raise ValueError("Error al codificar la imagen.")
+    return encoded_image.tobytes()
+
+
+class ImageProfile:
+    """Perfil de codificación de la imagen de evidencia de una cámara.
+
+    Define el recorte y el tamaño de la imagen de contexto que acompaña a cada
+    mensaje, su calidad JPEG, y opcionalmente una miniatura ajustada a cada
+    objeto. El recorte y la escala se calculan una sola vez con la resolución
+    de la cámara, de modo que la anotación dibuja directamente sobre la imagen
+    de salida.
+
+    attributes:
+        max_size (int): Lado mayor de la imagen de contexto, en pixeles; None para la mitad del cuadro.
+        quality (int): Calidad JPEG de la imagen de contexto y de las miniaturas.
+        crop (str): "full" para el cuadro completo o "region" para el rectángulo de la región de interés.
+        thumbnail (int): Lado mayor de las miniaturas de objeto; 0 las desactiva.
+        padding (float): Margen de la miniatura alrededor de la caja, relativo a su tamaño.
+        box (Tuple[int, int, int, int]): Recorte (x, y, ancho, alto) de la imagen de contexto en el cuadro.
+        scale (float): Escala de la imagen de contexto respecto al recorte.
+    """
+    def __init__(
+        self,
+        max_size: int = None,
+        quality: int = 95,
+        crop: str = "full",
+        thumbnail: int = 0,
+        padding: float = 0.15
+    ) -> None:
+        if crop not in CROPS:
+            raise ValueError(f"Recorte no válido: {crop}. Opciones: {', '.join(CROPS)}")
+
+        self.max_size = max_size
+        self.quality = quality
+        self.crop = crop
+        self.thumbnail = thumbnail
+        self.padding = padding
+
+        self.box = None
+        self.scale = DEFAULT_SCALE
+
+
+    @classmethod
+    def from_config(cls, image_config: dict, resolution_wh: Tuple[int, int], region=None) -> "ImageProfile":
+        """Crea el perfil a partir de la llave "image" de camera_config.json.
+
+        args:
+            image_config (dict): Parámetros max_size, quality, crop y thumbnail; None para el perfil por defecto.
+            resolution_wh (Tuple[int, int]): Resolución de la cámara.
+            region (RegionOfInterest, optional): Región de interés, para el recorte "region".
+        returns:
+            ImageProfile: Perfil listo para usar.
+        """
+        image_profile = cls(**(image_config or {}))
+        image_profile.configure(resolution_wh, region)
+        return image_profile
+
+
+    def configure(self, resolution_wh: Tuple[int, int], region=None) -> None:
+        """Calcula el recorte y la escala de la imagen de contexto.
+
+        args:
+            resolution_wh (Tuple[int, int]): Resolución de la cámara.
+            region (RegionOfInterest, optional): Región de interés; sin región el recorte es el cuadro completo.
+        """
+        if self.crop == "region" and region is not None:
+            self.box = (region.x, region.y, region.width, region.height)
+        else:
+            self.box = (0, 0, *resolution_wh)
+
+        width, height = self.box[2:]
+        self.scale = DEFAULT_SCALE if self.max_size is None else min(1.0, self.max_size / max(width, height))
+
+
+    @property
+    def output_wh(self) -> Tuple[int, int]:
+        return int(self.box[2] * self.scale), int(self.box[3] * self.scale)
+
+
+    def encode(self, image: np.array) -> str:
+        """Codifica la imagen de contexto ya recortada y escalada en base64."""
+        return base64.b64encode(encode_jpeg(image, self.quality)).decode('ascii')
+
+
+    def encode_thumbnail(self, frame: np.array, xyxy: np.array) -> str:
+        """Recorta y codifica en base64 la miniatura de un objeto.
+
+        args:
+            frame (np.array): Cuadro original, sin anotaciones.
+            xyxy (np.array): Caja del objeto en coordenadas del cuadro.
+        returns:
+            str: Miniatura en base64, o None si la caja queda fuera del cuadro.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        x1, y1, x2, y2 = xyxy
+        margin_x, margin_y = self.padding * (x2 - x1), self.padding * (y2 - y1)
+        x1, y1 = max(0, int(x1 - margin_x)), max(0, int(y1 - margin_y))
+        x2, y2 = min(frame_width, int(x2 + margin_x)), min(frame_height, int(y2 + margin_y))
+        if x2 <= x1 or y2 <= y1:
+            return None
+
+        thumbnail = frame[y1:y2, x1:x2]
+        scale = self.thumbnail / max(x2 - x1, y2 - y1)
+        if scale < 1.0:
+            thumbnail = cv2.resize(thumbnail, (max(1, int((x2 - x1) * scale)), max(1, int((y2 - y1) * scale))), interpolation=interpolation(scale))
+        return self.encode(thumbnail)
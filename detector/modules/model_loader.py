@@ -1,75 +1,251 @@
-from ultralytics import YOLO
-from ultralytics.engine.results import Results
+from __future__ import annotations
 
-import torch
+import shutil
+import time
 import numpy as np
-from typing import List
+from pathlib import Path
+from typing import TYPE_CHECKING, List
+
+from modules.camera_tracker import clear_tracks
+
+if TYPE_CHECKING:
+    from ultralytics.engine.results import Results
+
+
+# Formatos de inferencia: "pt" usa PyTorch; los demás se exportan con tamaño fijo.
+# "openvino_int8" es el modelo OpenVINO cuantizado por quantize.py con cuadros de las cámaras
+BACKENDS = ("pt", "onnx", "openvino", "openvino_int8")
+EXPORT_SUFFIXES = {"onnx": ".onnx", "openvino": "_openvino_model", "openvino_int8": "_int8_openvino_model"}
+
+
+def export_path(weights_path: str, backend: str, image_size: int, batch: int = 1) -> Path:
+    """Ruta del modelo exportado de unos pesos, junto a ellos.
+
+    Los modelos OpenVINO con lote mayor a 1 se exportan con lote dinámico, así
+    que comparten una sola ruta sin el tamaño de lote.
+
+    args:
+        weights_path (str): Ruta a los pesos `.pt`.
+        backend (str): Backend exportado: "onnx", "openvino" u "openvino_int8".
+        image_size (int): Tamaño fijo de entrada.
+        batch (int, optional): Tamaño de lote. Por defecto es 1.
+    returns:
+        Path: Archivo o carpeta del modelo exportado.
+    """
+    weights_path = Path(weights_path)
+    batch_tag = "dynamic" if backend in ("openvino", "openvino_int8") and batch > 1 else f"b{batch}"
+    return weights_path.with_name(f"{weights_path.stem}_{image_size}_{batch_tag}{EXPORT_SUFFIXES[backend]}")
+
+
+def preload() -> None:
+    """Importa torch y ultralytics por adelantado.
+
+    El módulo no los importa al cargarse, de modo que el controlador puede
+    abrir la cámara en otro hilo y llamar a esta función mientras espera.
+    """
+    import torch  # noqa: F401
+    import ultralytics  # noqa: F401
 
 
 class ModelLoader:
     """Clase para cargar y manejar el modelo de detección YOLO.
-    
+
+    Con los backends "onnx" y "openvino" los pesos `.pt` se exportan una sola
+    vez con tamaño de entrada y lote fijos, y se guardan junto a los pesos
+    para reutilizarlos en los siguientes inicios. El backend "openvino_int8"
+    no se exporta al iniciar: requiere el modelo cuantizado previamente con
+    quantize.py. Los resultados son los mismos objetos `Results` de
+    ultralytics, por lo que el seguimiento y la anotación no cambian.
+
     attributes:
         model (YOLO): Modelo YOLOv8.
-        image_size (int): Tamaño de la imagen de entrada.
+        image_size (int): Tamaño de la imagen de entrada. En los backends
+            exportados es el tamaño fijo del modelo.
         confidence (float): Umbral de confianza para detección.
         class_filter (List[int]): Lista de IDs de clases a filtrar.
         class_names (List[str]): Nombres de las clases del modelo.
+        backend (str): Formato de inferencia: "pt", "onnx", "openvino" u "openvino_int8".
+        batch (int): Tamaño de lote fijo de los backends exportados. Con
+            OpenVINO y lote mayor a 1 el modelo se exporta con forma dinámica,
+            porque ultralytics envía cada imagen del lote como una solicitud
+            asíncrona independiente. También elige el modo de OpenVINO: de
+            latencia con lote 1 y de rendimiento acumulado con lotes mayores.
+        device (str): Dispositivo de inferencia, calculado una sola vez.
     """
     def __init__(
         self,
         weights_path: str,
         image_size: int = 640,
         confidence: float = 0.5,
-        class_filter: List[int] = None
+        class_filter: List[int] = None,
+        backend: str = "pt",
+        batch: int = 1
     ) -> None:
-        self.model = YOLO(weights_path)
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend no válido: {backend}. Opciones: {', '.join(BACKENDS)}")
+
+        import torch
+        from ultralytics import YOLO
+
         self.image_size = image_size
         self.confidence = confidence
         self.class_filter = class_filter
+        self.backend = backend
+        self.batch = batch
+        self.device = 'cuda' if backend == "pt" and torch.cuda.is_available() else 'cpu'
+
+        if backend == "pt":
+            self.model = YOLO(weights_path)
+        else:
+            self.model = YOLO(self.export(weights_path), task="detect")
+        # Consultar los nombres crea el predictor de los modelos exportados: con el
+        # lote por defecto de ultralytics (16) OpenVINO elegiría el modo de rendimiento
+        self.model.overrides["batch"] = batch
         self.class_names = self.model.names
 
 
-    def detect(self, image: np.array) -> Results:
+    @property
+    def fixed_shape(self) -> bool:
+        return self.backend != "pt"
+
+
+    @property
+    def fixed_batch(self) -> bool:
+        return self.backend == "onnx" or (self.backend in ("openvino", "openvino_int8") and self.batch == 1)
+
+
+    def export(self, weights_path: str) -> str:
+        """Exporta los pesos al backend con tamaño fijo, o reutiliza la exportación previa.
+
+        args:
+            weights_path (str): Ruta a los pesos `.pt`.
+        returns:
+            str: Ruta al modelo exportado.
+        """
+        from ultralytics import YOLO
+
+        weights_path = Path(weights_path)
+        suffix = EXPORT_SUFFIXES[self.backend]
+        cached_path = export_path(weights_path, self.backend, self.image_size, self.batch)
+
+        if self.backend == "openvino_int8":
+            # La cuantización necesita cuadros de calibración de las cámaras
+            if not cached_path.exists():
+                batched = " --batched" if self.batch > 1 else ""
+                raise FileNotFoundError(f"No existe el modelo INT8 {cached_path.name}; genérelo con quantize.py{batched}")
+        elif not cached_path.exists():
+            # Exportar desde una copia con el nombre final, para que los archivos
+            # auxiliares del formato (datos externos, metadatos) queden con ese nombre
+            export_weights = cached_path.with_name(f"{cached_path.name[:-len(suffix)]}.pt")
+            shutil.copyfile(weights_path, export_weights)
+            try:
+                YOLO(export_weights).export(
+                    format=self.backend,
+                    imgsz=self.image_size,
+                    batch=self.batch,
+                    dynamic=not self.fixed_batch,
+                    simplify=True,
+                    verbose=False )
+            finally:
+                export_weights.unlink()
+
+        return str(cached_path)
+
+
+    def warmup(self, runs: int = 2) -> float:
+        """Ejecuta inferencias sobre imágenes vacías del tamaño configurado para
+        reservar memoria e inicializar los kernels antes del primer cuadro.
+
+        args:
+            runs (int, optional): Número de inferencias. Por defecto es 2.
+        returns:
+            float: Segundos que tomó el calentamiento.
+        """
+        time_start = time.perf_counter()
+        image = np.zeros((self.image_size, self.image_size, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.detect_batch(images=[image] * self.batch)
+        if self.device == 'cuda':
+            import torch
+            torch.cuda.synchronize()
+        return time.perf_counter() - time_start
+
+
+    def _image_size(self, image_size: int = None) -> int:
+        # Los modelos exportados solo aceptan su tamaño fijo
+        if self.fixed_shape:
+            return self.image_size
+        return image_size or self.image_size
+
+
+    def detect(self, image: np.array, image_size: int = None) -> Results:
         """Realiza la detección de objetos en una imagen.
         args:
             image (np.array): Imagen de entrada.
+            image_size (int, optional): Tamaño de inferencia; por defecto el del modelo.
         returns:
             Results: Resultados de la detección.
         """
+        return self.detect_batch(images=[image], image_size=image_size)[0]
+
+
+    def detect_batch(self, images: List[np.array], image_size: int = None) -> List[Results]:
+        """Realiza la detección de objetos en un lote de imágenes con una sola inferencia.
+        args:
+            images (List[np.array]): Imágenes de entrada, una por cámara.
+            image_size (int, optional): Tamaño de inferencia; por defecto el del modelo.
+        returns:
+            List[Results]: Resultados de la detección, en el mismo orden de las imágenes.
+        """
+        # Completar el lote fijo de los modelos exportados repitiendo la última imagen
+        total_images = len(images)
+        if self.fixed_batch and total_images < self.batch:
+            images = list(images) + [images[-1]] * (self.batch - total_images)
 
         ultralytics_results = self.model(
-            source=image,
-            imgsz=self.image_size,
+            source=images,
+            imgsz=self._image_size(image_size),
             conf=self.confidence,
             classes=self.class_filter,
-            device='cuda' if torch.cuda.is_available() else 'cpu',
+            device=self.device,
             agnostic_nms=True,
             verbose=False
-        )[0]
-        
-        return ultralytics_results
-    
+        )
 
-    def track(self, image: np.array) -> Results:
+        return ultralytics_results[:total_images]
+
+
+    def track(self, image: np.array, image_size: int = None) -> Results:
         """Realiza el seguimiento de objetos en una imagen.
         args:
             image (np.array): Imagen de entrada.
+            image_size (int, optional): Tamaño de inferencia; por defecto el del modelo.
         returns:
             Results: Resultados del seguimiento.
         """
-        
+        # Los modelos exportados con lote fijo se completan como en detect_batch
+        source = [image] * self.batch if self.fixed_batch else image
+
         ultralytics_results = self.model.track(
-            source=image,
+            source=source,
             persist=True,
-            imgsz=self.image_size,
+            imgsz=self._image_size(image_size),
             conf=self.confidence,
             classes=self.class_filter,
-            device='cuda' if torch.cuda.is_available() else 'cpu',
+            device=self.device,
             agnostic_nms=True,
             verbose=False,
             tracker="bytetrack.yaml"
         )[0]
-        
+
         return ultralytics_results
-    
\ No newline at end of file
+
+
+    def clear_tracks(self) -> int:
+        """Descarta el estado de ByteTrack de `track`, por ejemplo tras un periodo sin objetos.
+
+        returns:
+            int: Seguimientos descartados; 0 si aún no se ha llamado a `track`.
+        """
+        predictor = getattr(self.model, "predictor", None)
+        return sum(clear_tracks(tracker) for tracker in getattr(predictor, "trackers", None) or [])
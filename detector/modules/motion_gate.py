@@ -0,0 +1,99 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Compuerta de movimiento para omitir la inferencia en cuadros estáticos.
+
+    Compara una versión reducida y en grises del cuadro (o del recorte de la
+    región de interés, ya enmascarado) con el último cuadro inferido. Si la
+    fracción de píxeles que cambió no supera `threshold`, el cuadro se omite.
+    Tras `max_skip` cuadros omitidos se infiere de todos modos, para que el
+    seguimiento conserve su estado aunque el tráfico esté detenido.
+
+    attributes:
+        threshold (float): Fracción mínima de píxeles cambiados para inferir.
+        pixel_threshold (int): Diferencia mínima de intensidad de un píxel cambiado.
+        max_skip (int): Máximo de cuadros seguidos sin inferencia.
+        width (int): Ancho de la imagen reducida usada para comparar.
+        score (float): Fracción de píxeles cambiados en el último cuadro.
+        frames (int): Cuadros evaluados.
+        skipped (int): Cuadros omitidos.
+    """
+    def __init__(
+        self,
+        threshold: float = 0.002,
+        pixel_threshold: int = 25,
+        max_skip: int = 15,
+        width: int = 160
+    ) -> None:
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.max_skip = max_skip
+        self.width = width
+
+        self.score = 0.0
+        self.frames = 0
+        self.skipped = 0
+
+        self._reference = None
+        self._consecutive_skips = 0
+        self._size = None
+
+
+    def reset(self) -> None:
+        """Olvida el cuadro de referencia para que el siguiente cuadro se infiera, por ejemplo al cambiar la región."""
+        self._reference = None
+        self._size = None
+        self._consecutive_skips = 0
+
+
+    def _reduce(self, image: np.array) -> np.array:
+        if self._size is None:
+            height, width = image.shape[:2]
+            scale = min(1.0, self.width / width)
+            self._size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        small = cv2.resize(image, self._size, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+
+    def update(self, image: np.array) -> bool:
+        """Evalúa un cuadro y decide si se debe inferir.
+
+        args:
+            image (np.array): Cuadro o recorte de la región de interés.
+        returns:
+            bool: True si hubo movimiento o se alcanzó `max_skip`.
+        """
+        self.frames += 1
+        reduced = self._reduce(image)
+
+        if self._reference is None:
+            self.score = 1.0
+        else:
+            difference = cv2.absdiff(reduced, self._reference)
+            self.score = np.count_nonzero(difference > self.pixel_threshold) / difference.size
+
+        if self.score <= self.threshold and self._consecutive_skips < self.max_skip:
+            self._consecutive_skips += 1
+            self.skipped += 1
+            return False
+
+        self._reference = reduced
+        self._consecutive_skips = 0
+        return True
+
+
+    @property
+    def inference_rate(self) -> float:
+        """Fracción de cuadros evaluados que se infirieron."""
+        return (self.frames - self.skipped) / self.frames if self.frames else 1.0
+
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "score": self.score,
+            "inference_rate": self.inference_rate,
+        }
@@ -0,0 +1,244 @@
+import threading
+import traceback
+import time
+from collections import deque
+
+from typing import Any, Callable
+
+
+OVERFLOW_POLICIES = ("drop-oldest", "block")
+
+
+class _Call:
+    """Función encolada con `Stage.submit` para ejecutarse en el hilo de la etapa."""
+    def __init__(self, function: Callable[[], None]) -> None:
+        self.function = function
+
+
+class BoundedQueue:
+    """Cola acotada entre etapas del procesamiento.
+
+    attributes:
+        maxsize (int): Capacidad máxima de la cola.
+        overflow (str): Política cuando la cola está llena: "drop-oldest"
+            descarta el elemento más antiguo, "block" espera a que haya espacio.
+        on_drop (Callable): Función llamada con cada elemento descartado, por
+            ejemplo para devolver su buffer al pool.
+        keep (Callable): Indica los elementos que nunca se descartan, por ejemplo
+            los cuadros con eventos; las funciones de `Stage.submit` tampoco. Con "drop-oldest" se descarta el más antiguo
+            de los demás; si todos se deben conservar, la cola admite el nuevo
+            elemento por encima de su capacidad, o lo descarta si no se debe conservar.
+        dropped (int): Elementos descartados por desbordamiento.
+        max_depth (int): Profundidad máxima alcanzada.
+    """
+    def __init__(
+        self,
+        maxsize: int = 8,
+        overflow: str = "block",
+        on_drop: Callable[[Any], None] = None,
+        keep: Callable[[Any], bool] = None
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de desbordamiento no válida: {overflow}. Opciones: {', '.join(OVERFLOW_POLICIES)}")
+
+        self.maxsize = max(1, int(maxsize))
+        self.overflow = overflow
+        self.on_drop = on_drop
+        self.keep = keep
+        self.dropped = 0
+        self.max_depth = 0
+
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+
+    def put(self, item: Any) -> bool:
+        """Agrega un elemento según la política de desbordamiento.
+
+        returns:
+            bool: False si la cola ya estaba cerrada.
+        """
+        dropped_item = None
+        with self._condition:
+            if self.overflow == "block":
+                while len(self._items) >= self.maxsize and not self._closed:
+                    self._condition.wait()
+
+            if self._closed:
+                return False
+
+            if self.overflow == "drop-oldest" and len(self._items) >= self.maxsize:
+                dropped_item = self._pop_droppable()
+                if dropped_item is None and not self._must_keep(item):
+                    dropped_item = item
+                if dropped_item is not None:
+                    self.dropped += 1
+
+            if dropped_item is not item:
+                self._items.append(item)
+                self.max_depth = max(self.max_depth, len(self._items))
+                self._condition.notify_all()
+
+        if dropped_item is not None and self.on_drop is not None:
+            self.on_drop(dropped_item)
+        return True
+
+
+    def _must_keep(self, item: Any) -> bool:
+        return isinstance(item, _Call) or (self.keep is not None and self.keep(item))
+
+
+    def _pop_droppable(self) -> Any:
+        """Quita el elemento más antiguo que se puede descartar; None si todos se deben conservar."""
+        for index, queued_item in enumerate(self._items):
+            if not self._must_keep(queued_item):
+                del self._items[index]
+                return queued_item
+        return None
+
+
+    def get(self, timeout: float = None) -> Any:
+        """Toma el elemento más antiguo.
+
+        returns:
+            Any: Elemento, o None si no llegó ninguno a tiempo o la cola se cerró vacía.
+        """
+        with self._condition:
+            if not self._items and not self._closed:
+                self._condition.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+
+    def get_many(self, max_items: int, timeout: float = None) -> list:
+        """Espera el primer elemento y toma, sin esperar, hasta `max_items` en total.
+
+        returns:
+            list: Elementos en orden de llegada; vacía si no llegó ninguno a tiempo.
+        """
+        with self._condition:
+            if not self._items and not self._closed:
+                self._condition.wait(timeout)
+            items = [self._items.popleft() for _ in range(min(max_items, len(self._items)))]
+            if items:
+                self._condition.notify_all()
+            return items
+
+
+    def close(self) -> None:
+        """Cierra la cola: no admite nuevos elementos, pero los pendientes se pueden leer."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+    @property
+    def closed(self) -> bool:
+        with self._condition:
+            return self._closed and not self._items
+
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+
+class Stage:
+    """Clase para ejecutar una etapa del procesamiento en su propio hilo.
+
+    Toma elementos de la cola de entrada, los procesa con `function` y pone el
+    resultado (si no es None) en la cola de salida.
+
+    attributes:
+        name (str): Nombre de la etapa.
+        function (Callable): Función que procesa cada elemento.
+        input_queue (BoundedQueue): Cola de entrada.
+        output_queue (BoundedQueue): Cola de salida opcional.
+        processed (int): Elementos procesados.
+        errors (int): Elementos cuyo procesamiento lanzó una excepción.
+        busy_time (float): Segundos acumulados dentro de `function`.
+    """
+    def __init__(
+        self,
+        name: str,
+        function: Callable[[Any], Any],
+        input_queue: BoundedQueue,
+        output_queue: BoundedQueue = None
+    ) -> None:
+        self.name = name
+        self.function = function
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=f"etapa-{name}", daemon=True)
+
+
+    def start(self) -> "Stage":
+        self._thread.start()
+        return self
+
+
+    def submit(self, function: Callable[[], None]) -> bool:
+        """Ejecuta `function` en el hilo de la etapa, después de los elementos ya
+        encolados. Permite cambiar el estado que usa la etapa sin carreras con
+        el elemento en proceso; nunca se descarta por desbordamiento.
+
+        args:
+            function (Callable): Función sin argumentos.
+        returns:
+            bool: False si la etapa ya se detuvo.
+        """
+        return self.input_queue.put(_Call(function))
+
+
+    def _run(self) -> None:
+        while not self.input_queue.closed:
+            item = self.input_queue.get(timeout=0.5)
+            if item is None:
+                continue
+
+            if isinstance(item, _Call):
+                try:
+                    item.function()
+                except Exception:
+                    self.errors += 1
+                    print(f"\nError en la etapa {self.name}:\n{traceback.format_exc()}")
+                continue
+
+            time_start = time.perf_counter()
+            try:
+                result = self.function(item)
+            except Exception:
+                self.errors += 1
+                print(f"\nError en la etapa {self.name}:\n{traceback.format_exc()}")
+                continue
+            finally:
+                self.busy_time += time.perf_counter() - time_start
+                self.processed += 1
+
+            if result is not None and self.output_queue is not None:
+                self.output_queue.put(result)
+
+
+    def stop(self, timeout: float = None) -> None:
+        """Cierra la cola de entrada y espera a que se procesen los pendientes."""
+        self.input_queue.close()
+        self._thread.join(timeout)
+
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "depth": self.input_queue.qsize(),
+            "max_depth": self.input_queue.max_depth,
+            "dropped": self.input_queue.dropped,
+            "processed": self.processed,
+            "errors": self.errors,
+            "busy_time": self.busy_time,
+        }
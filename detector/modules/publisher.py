@@ -0,0 +1,193 @@
+import itertools
+import threading
+import time
+
+import redis
+
+from config import DETECTIONS_QUEUE, redis_client
+from modules.pipeline import BoundedQueue
+from modules.spool import DiskSpool
+from tools.timing import StageTimer
+
+
+class RedisPublisher:
+    """Publicador de mensajes en Redis desde un hilo propio.
+
+    `publish` solo encola el mensaje, de modo que la latencia de Redis no
+    detiene el ciclo de inferencia. El hilo toma los mensajes pendientes en
+    lotes de hasta `batch_size` y los envía en un solo viaje con un pipeline,
+    reutilizando las conexiones del pool compartido en lugar de abrir una
+    conexión por mensaje.
+
+    Con `spool`, los lotes que no se pueden enviar se guardan en disco en
+    lugar de perderse. Mientras el spool tenga mensajes pendientes, los nuevos
+    también pasan por él para conservar el orden, y el hilo lo vacía a un
+    máximo de `drain_rate` mensajes por segundo, reintentando con espera
+    creciente mientras Redis no responda. Si la cola se llena, los mensajes
+    más antiguos también pasan al spool en lugar de descartarse; sin spool
+    se descartan según `overflow`.
+
+    attributes:
+        name (str): Nombre del publicador en las estadísticas.
+        client (redis.Redis): Cliente de Redis; por defecto el de config, con su pool de conexiones.
+        queue (BoundedQueue): Mensajes pendientes como (cola de Redis, mensaje).
+        batch_size (int): Mensajes máximos por envío.
+        timer (StageTimer): Recolector donde se registra la duración de cada envío como "publish".
+        published (int): Mensajes publicados en Redis.
+        published_bytes (int): Bytes publicados en Redis.
+        batches (int): Envíos realizados.
+        failed (int): Mensajes perdidos por errores de Redis, sin spool.
+        spilled (int): Mensajes de la cola llena enviados al spool.
+        spool (DiskSpool): Spool local para los mensajes no enviados; None los descarta.
+        drain_rate (float): Mensajes por segundo máximos al vaciar el spool.
+    """
+    def __init__(
+        self,
+        client: redis.Redis = None,
+        maxsize: int = 256,
+        overflow: str = "drop-oldest",
+        batch_size: int = 32,
+        timer: StageTimer = None,
+        spool: DiskSpool = None,
+        drain_rate: float = 50.0
+    ) -> None:
+        self.name = "publicacion"
+        self.client = client if client is not None else redis_client
+        self.queue = BoundedQueue(maxsize=maxsize, overflow=overflow, on_drop=self._spill if spool is not None else None)
+        self.batch_size = max(1, int(batch_size))
+        self.timer = timer if timer is not None else StageTimer()
+
+        self.published = 0
+        self.published_bytes = 0
+        self.batches = 0
+        self.failed = 0
+        self.spilled = 0
+
+        self.spool = spool
+        self.drain_rate = float(drain_rate)
+        self._tokens = 0.0
+        self._tokens_time = time.monotonic()
+        self._retry_at = 0.0
+        self._retry_delay = 1.0
+
+        self._thread = threading.Thread(target=self._run, name="publicador-redis", daemon=True)
+
+
+    def start(self) -> "RedisPublisher":
+        self._thread.start()
+        return self
+
+
+    def publish(self, message: str, queue: str = DETECTIONS_QUEUE) -> bool:
+        """Encola un mensaje sin esperar a Redis.
+
+        args:
+            message (str): Mensaje JSON.
+            queue (str, optional): Cola de Redis de destino. Por defecto es DETECTIONS_QUEUE.
+        returns:
+            bool: False si el publicador ya se detuvo.
+        """
+        return self.queue.put((queue, message))
+
+
+    def _spill(self, item: tuple) -> None:
+        """Guarda en el spool el mensaje que la cola llena iba a descartar; se envía al vaciarlo."""
+        self.spool.append([item])
+        self.spilled += 1
+
+
+    def _run(self) -> None:
+        while not self.queue.closed:
+            draining = self.spool is not None and self.spool.pending > 0
+            batch = self.queue.get_many(self.batch_size, timeout=0.05 if draining else 0.5)
+
+            if draining:
+                # Con mensajes atrasados en el spool, los nuevos se anexan detrás para conservar el orden
+                self.spool.append(batch)
+                self.drain()
+            elif batch and not self.send(batch):
+                if self.spool is not None:
+                    self.spool.append(batch)
+                    self._retry_at = time.monotonic() + self._retry_delay
+                else:
+                    self.failed += len(batch)
+
+        if self.spool is not None:
+            self.spool.close()
+
+
+    def drain(self) -> None:
+        """Envía el siguiente lote del spool si lo permiten la tasa máxima y la espera de reintento."""
+        now = time.monotonic()
+        if now < self._retry_at:
+            return
+
+        # Cubeta de fichas: se acumulan a `drain_rate` por segundo, hasta un lote
+        self._tokens = min(float(self.batch_size), self._tokens + (now - self._tokens_time) * self.drain_rate)
+        self._tokens_time = now
+        if self._tokens < 1:
+            return
+
+        records = self.spool.peek(int(self._tokens))
+        if records and not self.send(records):
+            self._retry_at = now + self._retry_delay
+            self._retry_delay = min(2 * self._retry_delay, 30.0)
+            return
+
+        self.spool.commit()
+        self._tokens -= len(records)
+        self._retry_delay = 1.0
+
+
+    def send(self, batch: list) -> bool:
+        """Envía un lote en un solo pipeline: un LPUSH por cada cola de destino consecutiva.
+
+        args:
+            batch (list): Mensajes como (cola de Redis, mensaje), en orden de llegada.
+        returns:
+            bool: False si Redis no recibió el lote.
+        """
+        time_start = time.perf_counter()
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for queue, messages in itertools.groupby(batch, key=lambda item: item[0]):
+                pipe.lpush(queue, *(message for _, message in messages))
+            pipe.execute()
+        except redis.RedisError as e:
+            # Conexión caída, tiempo de espera agotado o error del servidor
+            print(f"Error al publicar en Redis: {e}")
+            return False
+        finally:
+            self.timer.record("publish", time.perf_counter() - time_start)
+
+        self.batches += 1
+        self.published += len(batch)
+        self.published_bytes += sum(len(message) for _, message in batch)
+        return True
+
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Deja de aceptar mensajes y espera a que se envíen los pendientes.
+
+        Los mensajes que queden en el spool se envían en la siguiente ejecución.
+        """
+        self.queue.close()
+        self._thread.join(timeout)
+
+
+    def stats(self) -> dict:
+        latency = self.timer.summary().get("publish", {})
+        return {
+            "name": self.name,
+            "depth": self.queue.qsize(),
+            "max_depth": self.queue.max_depth,
+            "dropped": self.queue.dropped - self.spilled,
+            "spilled": self.spilled,
+            "published": self.published,
+            "published_bytes": self.published_bytes,
+            "batches": self.batches,
+            "failed": self.failed,
+            "latency_ms_p50": 1000 * latency.get("p50", 0.0),
+            "latency_ms_p95": 1000 * latency.get("p95", 0.0),
+            **({"spool": self.spool.stats()} if self.spool is not None else {}),
+        }
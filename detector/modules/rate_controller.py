@@ -0,0 +1,137 @@
+import time
+from typing import List
+
+
+class RateController:
+    """Controlador adaptativo de la tasa de inferencia de una cámara.
+
+    Mide la latencia de inferencia y el retraso respecto a la transmisión, y
+    cada `window` cuadros procesados ajusta dos parámetros para acercarse a
+    `target_fps`:
+
+    - Tamaño de inferencia: baja un escalón de `sizes` si una inferencia tarda
+      más que el presupuesto (1 / target_fps) y vuelve a subir cuando hay
+      holgura para el tamaño mayor.
+    - Paso entre cuadros: procesa uno de cada `stride` cuadros leídos. Sube si
+      la cámara procesa más rápido que el objetivo o se atrasa respecto a la
+      transmisión, y baja cuando ya no alcanza el objetivo.
+
+    attributes:
+        target_fps (float): Cuadros procesados por segundo deseados.
+        sizes (List[int]): Tamaños de inferencia permitidos, de mayor a menor.
+        max_lag (float): Retraso máximo aceptado respecto a la captura, en segundos.
+        max_stride (int): Paso máximo entre cuadros procesados.
+        window (int): Cuadros procesados entre cada ajuste.
+        headroom (float): Fracción del presupuesto que debe quedar libre para subir el tamaño.
+        stride (int): Paso actual entre cuadros procesados.
+        decision (str): Última decisión tomada, para mostrar en el progreso.
+        fps (float): Cuadros procesados por segundo en la última ventana.
+        latency (float): Latencia media de inferencia en la última ventana, en segundos.
+        lag (float): Retraso máximo respecto a la captura en la última ventana, en segundos.
+    """
+    def __init__(
+        self,
+        target_fps: float,
+        sizes: List[int],
+        max_lag: float = 0.5,
+        max_stride: int = 10,
+        window: int = 30,
+        headroom: float = 0.7
+    ) -> None:
+        self.target_fps = float(target_fps)
+        self.sizes = sorted(set(sizes), reverse=True)
+        self.max_lag = max_lag
+        self.max_stride = max_stride
+        self.window = window
+        self.headroom = headroom
+
+        self.stride = 1
+        self.decision = "inicio"
+        self.fps = 0.0
+        self.latency = 0.0
+        self.lag = 0.0
+
+        self._size_index = 0
+        self._frame_count = 0
+        self._latencies = []
+        self._max_lag = 0.0
+        self._window_start = None
+
+
+    @classmethod
+    def from_config(cls, rate_config: dict, image_size: int, adapt_size: bool = True) -> "RateController":
+        """Crea el controlador desde la configuración `rate` de la cámara.
+
+        args:
+            rate_config (dict): target_fps y opcionalmente min_size, max_lag, max_stride, window.
+            image_size (int): Tamaño de inferencia máximo.
+            adapt_size (bool, optional): Si es False solo se ajusta el paso, por
+                ejemplo con modelos exportados de tamaño fijo. Por defecto es True.
+        """
+        min_size = int(rate_config.get("min_size", image_size)) if adapt_size else image_size
+        return cls(
+            target_fps=rate_config["target_fps"],
+            sizes=list(range(image_size, min(min_size, image_size) - 1, -32)),
+            max_lag=float(rate_config.get("max_lag", 0.5)),
+            max_stride=int(rate_config.get("max_stride", 10)),
+            window=int(rate_config.get("window", 30)) )
+
+
+    @property
+    def size(self) -> int:
+        """Tamaño de inferencia actual."""
+        return self.sizes[self._size_index]
+
+
+    def should_process(self) -> bool:
+        """Indica si el cuadro leído se debe procesar según el paso actual."""
+        self._frame_count += 1
+        return self._frame_count % self.stride == 0
+
+
+    def update(self, latency: float, lag: float) -> None:
+        """Registra un cuadro procesado y ajusta al completar la ventana.
+
+        args:
+            latency (float): Duración de la inferencia del cuadro, en segundos.
+            lag (float): Tiempo desde la captura del cuadro, en segundos.
+        """
+        now = time.perf_counter()
+        if self._window_start is None:
+            self._window_start = now
+            return
+
+        self._latencies.append(latency)
+        self._max_lag = max(self._max_lag, lag)
+        if len(self._latencies) >= self.window:
+            self.fps = len(self._latencies) / (now - self._window_start)
+            self.latency = sum(self._latencies) / len(self._latencies)
+            self.lag = self._max_lag
+            self._adjust()
+
+            self._latencies = []
+            self._max_lag = 0.0
+            self._window_start = now
+
+
+    def _adjust(self) -> None:
+        budget = 1 / self.target_fps
+
+        if self.latency > budget and self._size_index < len(self.sizes) - 1:
+            # No alcanza el objetivo ni procesando todos los cuadros: reducir el tamaño
+            self._size_index += 1
+            self.decision = f"tamaño ↓ {self.size}"
+        elif self.stride < self.max_stride and (
+            self.lag > self.max_lag or self.fps * self.stride / (self.stride + 1) >= self.target_fps ):
+            # Atrasado respecto a la transmisión, o sobra tasa aun con un paso mayor
+            self.stride += 1
+            self.decision = f"paso ↑ {self.stride}"
+        elif self.stride > 1 and self.fps < 0.9 * self.target_fps:
+            self.stride -= 1
+            self.decision = f"paso ↓ {self.stride}"
+        elif self._size_index > 0 and self.latency * (self.sizes[self._size_index - 1] / self.size) ** 2 < self.headroom * budget:
+            # Hay holgura para el tamaño mayor, estimando la latencia según el área
+            self._size_index -= 1
+            self.decision = f"tamaño ↑ {self.size}"
+        else:
+            self.decision = "estable"
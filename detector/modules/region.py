@@ -0,0 +1,93 @@
+import supervision as sv
+import numpy as np
+import math
+import cv2
+
+from typing import List, Tuple
+
+
+class RegionOfInterest:
+    """Clase para extraer la región de interés de una cámara.
+
+    La máscara del polígono y su rectángulo delimitador se calculan una sola vez
+    por cámara, de modo que cada cuadro solo requiere recortar y enmascarar.
+
+    attributes:
+        polygon (np.array): Vértices del polígono en coordenadas del cuadro completo.
+        x (int): Coordenada horizontal del recorte en el cuadro completo.
+        y (int): Coordenada vertical del recorte en el cuadro completo.
+        width (int): Ancho del recorte.
+        height (int): Alto del recorte.
+        mask (np.array): Máscara del polígono en coordenadas del recorte.
+    """
+    def __init__(
+        self,
+        polygon: List[List[int]],
+        resolution_wh: Tuple[int, int]
+    ) -> None:
+        frame_width, frame_height = resolution_wh
+        self.polygon = np.array(polygon, dtype=np.int32)
+        self.resolution_wh = resolution_wh
+
+        # Rectángulo delimitador del polígono, limitado al tamaño del cuadro
+        x, y, width, height = cv2.boundingRect(self.polygon)
+        self.x, self.y = max(x, 0), max(y, 0)
+        self.width = min(x + width, frame_width) - self.x
+        self.height = min(y + height, frame_height) - self.y
+        if self.width <= 0 or self.height <= 0:
+            raise ValueError(f"La región {polygon} está fuera del cuadro de {frame_width} x {frame_height}")
+
+        # Máscara del polígono en coordenadas del recorte
+        self.mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        cv2.fillPoly(self.mask, [self.polygon - self.offset], 255)
+
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        return self.x, self.y
+
+
+    @property
+    def crop_wh(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+
+    def crop(self, image: np.array, out: np.array = None) -> np.array:
+        """Recorta la imagen al rectángulo de la región y enmascara el exterior del polígono.
+
+        args:
+            image (np.array): Cuadro completo.
+            out (np.array, optional): Imagen de salida reutilizable del tamaño del recorte.
+                Los pixeles fuera del polígono no se escriben, por lo que debe
+                inicializarse en ceros y usarse siempre con la misma región.
+        returns:
+            np.array: Recorte enmascarado de la región.
+        """
+        view = image[self.y:self.y + self.height, self.x:self.x + self.width]
+        return cv2.bitwise_and(view, view, dst=out, mask=self.mask)
+
+
+    def inference_size(self, image_size: int) -> int:
+        """Calcula el tamaño de inferencia del recorte con la misma escala del cuadro completo.
+
+        args:
+            image_size (int): Tamaño de inferencia configurado para el cuadro completo.
+        returns:
+            int: Tamaño de inferencia para el recorte, múltiplo de 32.
+        """
+        scale = min(1.0, image_size / max(self.resolution_wh))
+        return min(image_size, 32 * math.ceil(scale * max(self.crop_wh) / 32))
+
+
+    def to_frame(self, detections: sv.Detections) -> sv.Detections:
+        """Traslada las detecciones del recorte a coordenadas del cuadro completo.
+
+        args:
+            detections (sv.Detections): Detecciones en coordenadas del recorte.
+        returns:
+            sv.Detections: Detecciones en coordenadas del cuadro completo.
+        """
+        if len(detections) > 0:
+            detections.xyxy = detections.xyxy + np.array([self.x, self.y, self.x, self.y], dtype=detections.xyxy.dtype)
+
+        return detections
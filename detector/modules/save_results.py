@@ -3,14 +3,16 @@ import redis
 
 import json
 import cv2
-import base64
 import numpy as np
-import pandas as pd
 
 from config import DETECTIONS_QUEUE, redis_client, get_current_timestamp
 from camera_controller import load_camera_config
+from modules.track_registry import EVENT_ENDED
+from modules.image_profile import ImageProfile, DEFAULT_SCALE, interpolation
+from modules.publisher import RedisPublisher
 
 from tools.video_info import VideoInfo
+from tools.ids import IdGenerator
 
 
 class SaveResults:
@@ -18,8 +20,12 @@ class SaveResults:
 
     attributes:
         camera_id (str): ID de la cámara.
-        timestamp (str): Timestamp de la detección.
+        ids (IdGenerator): Generador de los IDs de objetos e imágenes de la cámara.
         camera_config (dict): Información de la cámara.
+        published (int): Mensajes publicados en Redis, o entregados al publicador.
+        published_bytes (int): Bytes publicados en Redis, o entregados al publicador.
+        image_profile (ImageProfile): Perfil de codificación de la imagen y de las miniaturas.
+        publisher (RedisPublisher): Publicador en segundo plano; sin publicador se envía directamente.
     
     callback:
         send_detection (function): Función para enviar resultados.
@@ -27,78 +33,200 @@ class SaveResults:
     def __init__(
         self,
         camera_id: str,
-        timestamp: str = get_current_timestamp().strftime("%Y%m%d%H%M%S"),
+        image_profile: ImageProfile = None,
+        publisher: RedisPublisher = None,
     ) -> None:
         self.camera_id = camera_id
-        self.timestamp = timestamp
+        self.ids = IdGenerator(camera_id)
+        self.image_profile = image_profile or ImageProfile()
+        self.publisher = publisher
 
         self.camera_config = load_camera_config(camera_id)
+        self.published = 0
+        self.published_bytes = 0
 
 
-    def codificar_imagen(self, image: np.array) -> str:
+    def codificar_imagen(self, image: np.array, scale: float = DEFAULT_SCALE) -> str:
         """Codifica la imagen en formato base64.
 
         args:
             image (np.array): Imagen original.
+            scale (float, optional): Escala a aplicar antes de codificar; 1.0 si la
+                imagen ya se anotó reducida. Por defecto es DEFAULT_SCALE.
         """
         # Reducir tamaño de la imagen
-        h, w = image.shape[:2]
-        image_rgb = cv2.resize(image, (w//2, h//2), interpolation=cv2.INTER_AREA)
-
-        # Codificar imagen en base64
-        success, encoded_image = cv2.imencode(".jpg", image_rgb)
-        if not success:
+        if scale != 1.0:
+            h, w = image.shape[:2]
+            image_rgb = cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=interpolation(scale))
+        else:
+            image_rgb = image
+
+        # Codificar imagen en base64 con la calidad del perfil
+        try:
+            return self.image_profile.encode(image_rgb)
+        except ValueError:
             return "Error al codificar la imagen."
 
-        image_bytes = encoded_image.tobytes()
-        img_base64 = base64.b64encode(image_bytes).decode('ascii')
-
-        return img_base64
-
 
-    def convertir_json(self, detection, img_base64: str):
-        """Convierte los resultados de detección a formato JSON.
+    def convertir_deteccion(self, detection, seconds: float = None) -> dict:
+        """Convierte una detección a un registro que referencia la imagen compartida del cuadro.
 
         args:
-            detection (sv.Detections): Resultados de detección.
-            img_base64 (str): Imagen codificada en base64.
+            detection (tuple): Detección individual de sv.Detections.
+            seconds (float, optional): Hora del cuadro, para el ID de un objeto nuevo. Por defecto es la hora actual.
+        returns:
+            dict: Registro de la detección, o None si no tiene ID de seguimiento.
         """
         if len(detection) > 5 and detection[4] is not None and isinstance(detection[5], dict) and 'class_name' in detection[5]:
-            self.new_id = f"{self.timestamp}{detection[4]}"
-
-            detections_json = {
-                "nombre_camara": self.camera_config['nombre'],
-                "id": self.new_id,
+            return {
+                "id": self.ids.track(detection[4], seconds),
                 "confianza": float(detection[2]),
                 "clase": detection[5]['class_name'],
-                "tiempo": get_current_timestamp().strftime("%Y_%m_%d_%H_%M_%S.%f"),
-                "imagen": img_base64
             }
+        else:
+            return None
+
+
+    def convertir_evento(self, event: dict) -> dict:
+        """Convierte un evento del registro de seguimiento a un registro del mensaje.
+
+        El ID es el mismo en todos los eventos de un objeto, con la hora en que
+        apareció, para que el procesador actualice el registro guardado en
+        lugar de crear uno nuevo.
+
+        args:
+            event (dict): Evento de TrackRegistry.
+        returns:
+            dict: Registro del evento.
+        """
+        record = {
+            "id": self.ids.track(event["tracker_id"], event.get("inicio")),
+            "evento": event["evento"],
+            "confianza": event["confianza"],
+            "clase": event["clase"],
+        }
+        if event["evento"] == EVENT_ENDED:
+            record["duracion"] = event["duracion"]
+            record["cuadros"] = event["cuadros"]
+            self.ids.end(event["tracker_id"])
+        if event.get("miniatura") is not None:
+            record["miniatura"] = event["miniatura"]
+        return record
+
+
+    def convertir_json(self, detections, img_base64: str, events: list = None):
+        """Convierte las detecciones de un cuadro a un único mensaje JSON con una sola imagen.
 
-            return json.dumps(detections_json)
-        else:                                                                                                             
+        args:
+            detections (sv.Detections): Resultados de detección del cuadro.
+            img_base64 (str): Imagen codificada en base64, compartida por todas las detecciones.
+            events (list, optional): Eventos del registro de seguimiento. Si se
+                indican, se envían los eventos en lugar de todas las detecciones.
+        returns:
+            str: Mensaje JSON, o None si ninguna detección tiene ID de seguimiento.
+        """
+        detection_time = get_current_timestamp()
+        if events is not None:
+            detection_records = [self.convertir_evento(event) for event in events]
+        else:
+            detection_records = [record for record in (self.convertir_deteccion(detection, detection_time.timestamp()) for detection in detections) if record is not None]
+        if not detection_records:
             return None
 
+        detections_json = {
+            "nombre_camara": self.camera_config['nombre'],
+            "id_imagen": self.ids.image(detection_time.timestamp()),
+            "tiempo": detection_time.strftime("%Y_%m_%d_%H_%M_%S.%f"),
+            "imagen": img_base64,
+            "detecciones": detection_records
+        }
+
+        return json.dumps(detections_json)
+
 
-    def send_detection(self, detections: sv.Detections, image: np.array) -> None:
-        """Envía los resultados de detección a Redis.
+    def needs_image(self, detections: sv.Detections, events: list = None) -> bool:
+        """Indica si el mensaje del cuadro llevará imagen, para anotarla solo en ese caso.
 
         args:
             detections (sv.Detections): Resultados de detección.
-            image (np.array): Imagen original.
+            events (list, optional): Eventos del registro de seguimiento. Por defecto es None.
+        returns:
+            bool: True si hay eventos visibles o, sin eventos, detecciones con ID de seguimiento.
         """
+        if events is not None:
+            return any(event["evento"] != EVENT_ENDED for event in events)
+        return detections.tracker_id is not None and len(detections) > 0
+
 
-        for detection in detections:
-            img_base64 = self.codificar_imagen(image)
-            detection_json_str = self.convertir_json(detection, img_base64)
+    def build_message(self, detections: sv.Detections, image: np.array, events: list = None, image_scale: float = DEFAULT_SCALE, frame: np.array = None) -> str:
+        """Construye el mensaje JSON del cuadro, listo para publicar.
 
-            print(detection_json_str)
-            quit()
+        La imagen se codifica una sola vez por cuadro y solo si hay detecciones
+        con ID de seguimiento. Con `events` solo se envían los eventos del
+        ciclo de vida; si todos son de fin de seguimiento no se envía imagen.
 
+        args:
+            detections (sv.Detections): Resultados de detección.
+            image (np.array): Imagen anotada; puede ser None si `needs_image` es False.
+            events (list, optional): Eventos del registro de seguimiento. Por defecto es None.
+            image_scale (float, optional): Escala a aplicar a la imagen; 1.0 si ya
+                se anotó reducida. Por defecto es DEFAULT_SCALE.
+            frame (np.array, optional): Cuadro original sin anotar, para las miniaturas
+                de los eventos si el perfil las incluye. Por defecto es None.
+        returns:
+            str: Mensaje del cuadro, o None si no hay detecciones para enviar.
+        """
+        if events is not None and not events:
+            return None
+        if events is None and not self.needs_image(detections):
+            return None
+
+        img_base64 = self.codificar_imagen(image, scale=image_scale) if self.needs_image(detections, events) else None
+
+        # Miniatura ajustada a cada objeto visible, recortada del cuadro sin anotaciones
+        if events is not None and frame is not None and self.image_profile.thumbnail:
+            events = [
+                {**event, "miniatura": self.image_profile.encode_thumbnail(frame, detections.xyxy[event["indice"]])}
+                if "indice" in event else event
+                for event in events ]
+
+        return self.convertir_json(detections, img_base64, events=events)
+
+
+    def publish(self, message: str) -> None:
+        """Publica un mensaje en la cola de Redis.
+
+        Con publicador el mensaje solo se encola y se envía en segundo plano;
+        sin publicador se envía en este hilo con una conexión del pool.
+
+        args:
+            message (str): Mensaje JSON del cuadro.
+        """
+        if self.publisher is not None:
+            if not self.publisher.publish(message):
+                return
+        else:
             try:
-                redis_client.lpush(DETECTIONS_QUEUE, detection_json_str)
-                print(f"[{self.camera_id} - {self.camera_config['nombre']}] Detección enviada: {self.timestamp}{detection[4]}")
+                redis_client.lpush(DETECTIONS_QUEUE, message)
             except redis.ConnectionError as e:
                 print(f"Error al conectarse a Redis: {e}")
-            finally:
-                redis_client.close()
+                return
+
+        self.published += 1
+        self.published_bytes += len(message)
+        print(f"[{self.camera_id} - {self.camera_config['nombre']}] Detecciones enviadas: {len(message) // 1024} KB")
+
+
+    def send_detection(self, detections: sv.Detections, image: np.array, events: list = None, image_scale: float = DEFAULT_SCALE, frame: np.array = None) -> None:
+        """Envía los resultados de detección de un cuadro a Redis en un solo mensaje.
+
+        args:
+            detections (sv.Detections): Resultados de detección.
+            image (np.array): Imagen original.
+            events (list, optional): Eventos del registro de seguimiento. Por defecto es None.
+            image_scale (float, optional): Escala a aplicar a la imagen. Por defecto es DEFAULT_SCALE.
+            frame (np.array, optional): Cuadro original sin anotar, para las miniaturas. Por defecto es None.
+        """
+        detection_json_str = self.build_message(detections, image, events, image_scale=image_scale, frame=frame)
+        if detection_json_str is not None:
+            self.publish(detection_json_str)
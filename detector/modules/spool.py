@@ -0,0 +1,255 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from typing import List, Tuple
+
+
+SEGMENT_SUFFIX = ".spool"
+CURSOR_FILE = "cursor"
+
+
+class DiskSpool:
+    """Spool local de solo anexado para los mensajes que no llegaron a Redis.
+
+    Los mensajes se escriben en segmentos consecutivos, una línea por mensaje
+    con su hora, cola de destino y contenido. La lectura avanza un cursor que
+    se guarda en disco, de modo que un reinicio del detector continúa donde
+    quedó. Si el spool supera `max_bytes` se descartan los segmentos más
+    antiguos, y los mensajes con más de `max_age` segundos se omiten al leer.
+
+    Lo lee un solo hilo (el publicador); `append` también se llama desde el
+    hilo que publica cuando la cola del publicador se llena, y las
+    estadísticas se pueden consultar desde cualquier hilo.
+
+    attributes:
+        path (Path): Carpeta del spool; se crea con el primer mensaje.
+        max_bytes (int): Tamaño máximo en disco.
+        max_age (float): Antigüedad máxima de un mensaje, en segundos.
+        segment_bytes (int): Tamaño a partir del cual se empieza un segmento nuevo.
+        appended (int): Mensajes escritos.
+        drained (int): Mensajes leídos y confirmados.
+        dropped (int): Mensajes descartados por tamaño.
+        expired (int): Mensajes omitidos por antigüedad.
+    """
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: float = 24 * 3600.0,
+        segment_bytes: int = None
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.max_age = float(max_age)
+        self.segment_bytes = int(segment_bytes or max(1, self.max_bytes // 16))
+
+        self.appended = 0
+        self.drained = 0
+        self.dropped = 0
+        self.expired = 0
+
+        self._lock = threading.Lock()
+        self._writer = None
+        self._write_index = None
+        self._peeked = None
+
+        # Segmentos existentes de una ejecución anterior: registros pendientes y tamaño de cada uno
+        self._counts = {}
+        self._sizes = {}
+        self._cursor = (None, 0)
+        if self.path.is_dir():
+            self._recover()
+
+
+    def _segment_path(self, index: int) -> Path:
+        return self.path.joinpath(f"{index:010d}{SEGMENT_SUFFIX}")
+
+
+    def _recover(self) -> None:
+        """Reconstruye los segmentos pendientes y el cursor guardados en disco."""
+        indexes = sorted(int(segment.stem) for segment in self.path.glob(f"*{SEGMENT_SUFFIX}") if segment.stem.isdigit())
+        cursor_index, cursor_offset = None, 0
+        cursor_path = self.path.joinpath(CURSOR_FILE)
+        if cursor_path.exists():
+            try:
+                cursor_index, cursor_offset = (int(value) for value in cursor_path.read_text().split())
+            except ValueError:
+                cursor_index, cursor_offset = None, 0
+
+        for index in indexes:
+            # Segmentos ya leídos por completo en la ejecución anterior
+            if cursor_index is not None and index < cursor_index:
+                self._segment_path(index).unlink()
+                continue
+            offset = cursor_offset if index == cursor_index else 0
+            with open(self._segment_path(index), "rb") as f:
+                f.seek(offset)
+                self._counts[index] = sum(1 for line in f if line.endswith(b"\n"))
+            self._sizes[index] = self._segment_path(index).stat().st_size
+
+        if self._counts:
+            first_index = min(self._counts)
+            self._cursor = (first_index, cursor_offset if first_index == cursor_index else 0)
+
+
+    def append(self, records: List[Tuple[str, str]]) -> None:
+        """Escribe mensajes al final del spool.
+
+        args:
+            records (List[Tuple[str, str]]): Mensajes como (cola de Redis, mensaje JSON).
+        """
+        if not records:
+            return
+
+        timestamp = f"{time.time():.3f}".encode()
+        data = b"".join(
+            b"\t".join((timestamp, queue.encode(), message.replace("\n", " ").encode())) + b"\n"
+            for queue, message in records )
+
+        with self._lock:
+            # Un segmento nuevo al iniciar o cuando el actual llega a su tamaño
+            if self._writer is None or self._sizes[self._write_index] >= self.segment_bytes:
+                self._rotate()
+
+            self._writer.write(data)
+            self._writer.flush()
+            self._sizes[self._write_index] += len(data)
+            self._counts[self._write_index] += len(records)
+            self.appended += len(records)
+            if self._cursor[0] is None:
+                self._cursor = (self._write_index, 0)
+
+            self._evict()
+
+
+    def _rotate(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # Nunca se anexa a un segmento de otra ejecución: su última línea podría estar incompleta
+        self._write_index = max(self._sizes, default=-1) + 1
+        self._writer = open(self._segment_path(self._write_index), "ab")
+        self._sizes[self._write_index] = 0
+        self._counts[self._write_index] = 0
+
+
+    def _evict(self) -> None:
+        """Descarta los segmentos más antiguos mientras el spool supere su tamaño máximo."""
+        while sum(self._sizes.values()) > self.max_bytes and len(self._sizes) > 1:
+            index = min(self._sizes)
+            self.dropped += self._counts.pop(index)
+            del self._sizes[index]
+            self._segment_path(index).unlink()
+            if self._cursor[0] == index:
+                self._cursor = (min(self._sizes), 0)
+                self._peeked = None
+
+
+    def peek(self, max_items: int) -> List[Tuple[str, str]]:
+        """Lee los mensajes más antiguos sin consumirlos; `commit` los confirma.
+
+        args:
+            max_items (int): Mensajes máximos a leer.
+        returns:
+            List[Tuple[str, str]]: Mensajes como (cola de Redis, mensaje JSON), en orden de escritura.
+        """
+        with self._lock:
+            records = []
+            index, offset = self._cursor
+            consumed = {}
+            now = time.time()
+
+            while index is not None and len(records) < max_items:
+                with open(self._segment_path(index), "rb") as f:
+                    f.seek(offset)
+                    while len(records) < max_items:
+                        line = f.readline()
+                        if not line.endswith(b"\n"):
+                            break
+                        offset += len(line)
+                        consumed[index] = consumed.get(index, 0) + 1
+
+                        timestamp, queue, message = line[:-1].split(b"\t", 2)
+                        if now - float(timestamp) > self.max_age:
+                            self.expired += 1
+                            continue
+                        records.append((queue.decode(), message.decode()))
+
+                # Pasar al siguiente segmento solo si este ya no recibe mensajes
+                next_indexes = [next_index for next_index in self._sizes if next_index > index]
+                if len(records) < max_items and next_indexes and index != self._write_index:
+                    index, offset = min(next_indexes), 0
+                else:
+                    break
+
+            self._peeked = (index, offset, consumed)
+            return records
+
+
+    def commit(self) -> None:
+        """Confirma los mensajes de la última lectura y borra los segmentos ya leídos."""
+        with self._lock:
+            if self._peeked is None:
+                return
+            index, offset, consumed = self._peeked
+            self._peeked = None
+
+            for consumed_index, count in consumed.items():
+                if consumed_index in self._counts:
+                    self._counts[consumed_index] -= count
+                    self.drained += count
+
+            for read_index in [read_index for read_index in self._sizes if read_index < index]:
+                self._counts.pop(read_index)
+                del self._sizes[read_index]
+                self._segment_path(read_index).unlink()
+
+            self._cursor = (index, offset)
+            cursor_path = self.path.joinpath(CURSOR_FILE)
+            temporary_path = cursor_path.with_suffix(".tmp")
+            temporary_path.write_text(f"{index} {offset}")
+            os.replace(temporary_path, cursor_path)
+
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values()) - self._cursor[1]
+
+
+    def close(self) -> None:
+        """Cierra el segmento actual y, si ya no hay pendientes, borra los archivos leídos."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+                self._write_index = None
+
+            if not any(self._counts.values()):
+                for index in list(self._sizes):
+                    self._segment_path(index).unlink()
+                self._counts, self._sizes = {}, {}
+                self._cursor = (None, 0)
+                self.path.joinpath(CURSOR_FILE).unlink(missing_ok=True)
+
+
+    def stats(self) -> dict:
+        pending = self.pending
+        return {
+            "pending": pending,
+            "bytes": self.size_bytes,
+            "appended": self.appended,
+            "drained": self.drained,
+            "dropped": self.dropped,
+            "expired": self.expired,
+            "progress": self.drained / (self.drained + pending) if self.drained + pending else 1.0,
+        }
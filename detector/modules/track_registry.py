@@ -0,0 +1,132 @@
+import supervision as sv
+
+from typing import List
+
+
+EVENT_NEW = "nuevo"
+EVENT_CLASS_CHANGE = "cambio_clase"
+EVENT_CONFIDENCE = "mejor_confianza"
+EVENT_ENDED = "finalizado"
+
+
+class TrackRegistry:
+    """Registro de los objetos seguidos de una cámara, indexado por `tracker_id`.
+
+    En lugar de publicar cada objeto en todos los cuadros en que aparece, solo
+    genera eventos del ciclo de vida del seguimiento: objeto nuevo, cambio de
+    clase, mejora de la confianza en al menos `confidence_margin` y fin del
+    seguimiento con su resumen.
+
+    attributes:
+        ttl (float): Segundos sin ver un objeto para darlo por terminado. Debe
+            superar el tiempo que ByteTrack conserva un objeto perdido para que
+            un objeto recuperado no se anuncie dos veces.
+        confidence_margin (float): Mejora mínima de la confianza, respecto a la
+            última informada, para generar un nuevo evento.
+        tracks (dict): Estado de cada objeto activo.
+    """
+    def __init__(
+        self,
+        ttl: float = 2.0,
+        confidence_margin: float = 0.1
+    ) -> None:
+        self.ttl = ttl
+        self.confidence_margin = confidence_margin
+        self.tracks = {}
+
+
+    def update(self, detections: sv.Detections, timestamp: float) -> List[dict]:
+        """Actualiza el registro con las detecciones de un cuadro.
+
+        args:
+            detections (sv.Detections): Detecciones con ID de seguimiento.
+            timestamp (float): Hora de captura del cuadro, en segundos.
+        returns:
+            List[dict]: Eventos generados. Los eventos de objetos visibles
+                incluyen `indice`, su posición en `detections`.
+        """
+        events = []
+        if detections.tracker_id is not None:
+            class_names = detections.data.get("class_name", detections.class_id)
+            for index, tracker_id in enumerate(detections.tracker_id):
+                if tracker_id is None:
+                    continue
+                event = self._update_track(
+                    tracker_id=int(tracker_id),
+                    class_name=str(class_names[index]),
+                    confidence=float(detections.confidence[index]),
+                    timestamp=timestamp )
+                if event is not None:
+                    event["indice"] = index
+                    events.append(event)
+
+        return events + self.expire(timestamp)
+
+
+    def _update_track(self, tracker_id: int, class_name: str, confidence: float, timestamp: float) -> dict:
+        track = self.tracks.get(tracker_id)
+        if track is None:
+            self.tracks[tracker_id] = {
+                "clase": class_name,
+                "confianza": confidence,
+                "confianza_max": confidence,
+                "inicio": timestamp,
+                "fin": timestamp,
+                "cuadros": 1,
+            }
+            return self._event(EVENT_NEW, tracker_id, class_name, confidence, timestamp)
+
+        track["fin"] = timestamp
+        track["cuadros"] += 1
+        track["confianza_max"] = max(track["confianza_max"], confidence)
+
+        if class_name != track["clase"]:
+            track["clase"] = class_name
+            track["confianza"] = confidence
+            return self._event(EVENT_CLASS_CHANGE, tracker_id, class_name, confidence, track["inicio"])
+
+        if confidence >= track["confianza"] + self.confidence_margin:
+            track["confianza"] = confidence
+            return self._event(EVENT_CONFIDENCE, tracker_id, class_name, confidence, track["inicio"])
+
+        return None
+
+
+    def expire(self, timestamp: float) -> List[dict]:
+        """Termina los objetos que no se han visto en más de `ttl` segundos.
+
+        args:
+            timestamp (float): Hora actual, en segundos.
+        returns:
+            List[dict]: Eventos de fin de seguimiento.
+        """
+        expired = [tracker_id for tracker_id, track in self.tracks.items() if timestamp - track["fin"] > self.ttl]
+        return [self._end(tracker_id) for tracker_id in expired]
+
+
+    def flush(self) -> List[dict]:
+        """Termina todos los objetos activos, por ejemplo al cerrar la cámara.
+
+        returns:
+            List[dict]: Eventos de fin de seguimiento.
+        """
+        return [self._end(tracker_id) for tracker_id in list(self.tracks)]
+
+
+    def _end(self, tracker_id: int) -> dict:
+        track = self.tracks.pop(tracker_id)
+        event = self._event(EVENT_ENDED, tracker_id, track["clase"], track["confianza_max"], track["inicio"])
+        event["duracion"] = round(track["fin"] - track["inicio"], 3)
+        event["cuadros"] = track["cuadros"]
+        return event
+
+
+    @staticmethod
+    def _event(event_type: str, tracker_id: int, class_name: str, confidence: float, start: float) -> dict:
+        return {
+            "evento": event_type,
+            "tracker_id": tracker_id,
+            "clase": class_name,
+            "confianza": confidence,
+            "inicio": start,
+        }
@@ -0,0 +1,230 @@
+import numpy as np
+import threading
+import time
+import cv2
+
+from modules.frame_pool import FramePool
+from tools.video_info import open_capture
+
+
+class LatestFrameStream:
+    """Clase para capturar cuadros en un hilo y entregar siempre el más reciente.
+
+    En modo en vivo (`drop_frames=True`) un cuadro que no fue leído antes de
+    que llegue el siguiente se descarta, de modo que la inferencia nunca trabaja
+    sobre cuadros atrasados. En modo ordenado (`drop_frames=False`, para
+    archivos) la captura espera a que se lea cada cuadro.
+
+    Si la fuente falla, se reconecta con espera exponencial en lugar de
+    reintentar en un ciclo continuo. Una captura ya abierta (por ejemplo la
+    de `VideoInfo(keep_open=True)`) se reutiliza en lugar de abrir la fuente
+    otra vez, y pasa a ser responsabilidad de la transmisión. Las
+    reconexiones usan el mismo backend de captura (`capture_options`).
+
+    attributes:
+        source (str): URL de la cámara, índice de webcam o archivo de video.
+        stream (cv2.VideoCapture): Captura activa, de OpenCV o FFmpegCapture.
+        capture_options (dict): Opciones de la captura para reconectar (backend, max_size, substream, hwaccel, threads).
+        timestamp (float): Hora de captura (time.time) del último cuadro leído.
+        capture_time (float): Segundos que tardó la lectura y decodificación del último cuadro leído.
+        frames (int): Cuadros decodificados.
+        dropped (int): Cuadros descartados por llegar uno más reciente.
+        duplicates (int): Cuadros idénticos al anterior (cámara congelada).
+        reconnects (int): Reconexiones realizadas.
+        connected (bool): Indica si la fuente está entregando cuadros.
+    """
+    def __init__(
+        self,
+        source: str,
+        frame_pool: FramePool = None,
+        drop_frames: bool = True,
+        skip_duplicates: bool = True,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30.0,
+        timeout_ms: int = 10000,
+        new_frame_event: threading.Event = None,
+        capture: cv2.VideoCapture = None,
+        capture_options: dict = None
+    ) -> None:
+        self.source = source
+        self.frame_pool = frame_pool
+        self.drop_frames = drop_frames
+        self.skip_duplicates = skip_duplicates
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.timeout_ms = timeout_ms
+        self.new_frame_event = new_frame_event
+        self.capture_options = capture_options
+
+        self.timestamp = None
+        self.capture_time = None
+        self.frames = 0
+        self.dropped = 0
+        self.duplicates = 0
+        self.reconnects = 0
+        self.connected = False
+        self.ended = False
+
+        self._frame = None
+        self._frame_timestamp = None
+        self._frame_capture_time = None
+        self._last_sample = None
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        if capture is not None and capture.isOpened():
+            self.stream = capture
+            self.connected = True
+        else:
+            self.stream = self._open()
+
+
+    @property
+    def is_file(self) -> bool:
+        return not str(self.source).isnumeric() and "://" not in str(self.source)
+
+
+    def _open(self) -> cv2.VideoCapture:
+        """Abre la fuente de video con tiempos de espera acotados."""
+        stream = open_capture(self.source, self.timeout_ms, self.capture_options)
+        self.connected = stream.isOpened()
+        return stream
+
+
+    def start(self) -> "LatestFrameStream":
+        """Inicia el hilo de captura."""
+        self._thread = threading.Thread(target=self._update, name=f"captura-{self.source}", daemon=True)
+        self._thread.start()
+        return self
+
+
+    def _update(self) -> None:
+        """Ciclo del hilo de captura: decodifica, descarta y reconecta."""
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            if not self.stream.isOpened():
+                # Reconexión con espera exponencial, interrumpible por stop()
+                self.connected = False
+                if self._stopped.wait(delay):
+                    break
+                delay = min(2 * delay, self.max_reconnect_delay)
+                self.reconnects += 1
+                self.stream = self._open()
+                continue
+
+            buffer = self.frame_pool.acquire() if self.frame_pool is not None else None
+            time_start = time.perf_counter()
+            success, frame = self.stream.read(buffer)
+            timestamp = time.time()
+            capture_time = time.perf_counter() - time_start
+
+            if not success:
+                self._release(buffer)
+                if self.is_file:
+                    break
+                self.connected = False
+                self.stream.release()
+                continue
+
+            self.connected = True
+            delay = self.reconnect_delay
+            if frame is not buffer:
+                # La resolución cambió respecto al pool: se usa el cuadro asignado por OpenCV
+                self._release(buffer)
+
+            if self.skip_duplicates and self._is_duplicate(frame):
+                self.duplicates += 1
+                self._release(frame)
+                continue
+
+            with self._condition:
+                if not self.drop_frames:
+                    while self._frame is not None and not self._stopped.is_set():
+                        self._condition.wait(0.1)
+                if self._frame is not None:
+                    self.dropped += 1
+                    self._release(self._frame)
+                self._frame = frame
+                self._frame_timestamp = timestamp
+                self._frame_capture_time = capture_time
+                self.frames += 1
+                self._condition.notify_all()
+
+            if self.new_frame_event is not None:
+                self.new_frame_event.set()
+
+        with self._condition:
+            self.ended = True
+            self._condition.notify_all()
+        if self.new_frame_event is not None:
+            self.new_frame_event.set()
+
+
+    def _is_duplicate(self, frame: np.array) -> bool:
+        """Compara una muestra de pixeles con la del cuadro anterior."""
+        sample = frame[::16, ::16]
+        if self._last_sample is None or self._last_sample.shape != sample.shape:
+            self._last_sample = sample.copy()
+            return False
+        if np.array_equal(sample, self._last_sample):
+            return True
+        np.copyto(self._last_sample, sample)
+        return False
+
+
+    def _release(self, frame: np.array) -> None:
+        if self.frame_pool is not None:
+            self.frame_pool.release(frame)
+
+
+    def read(self, timeout: float = 1.0) -> np.array:
+        """Entrega el cuadro más reciente que aún no se ha leído.
+
+        args:
+            timeout (float): Segundos máximos de espera por un cuadro nuevo.
+        returns:
+            np.array: Cuadro capturado, o None si no llegó ninguno a tiempo.
+                Con pool, el cuadro debe devolverse con `release` al terminar.
+        """
+        with self._condition:
+            if self._frame is None and not self.ended:
+                self._condition.wait(timeout)
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                self.timestamp = self._frame_timestamp
+                self.capture_time = self._frame_capture_time
+            self._condition.notify_all()
+        return frame
+
+
+    def release(self, frame: np.array) -> None:
+        """Devuelve al pool un cuadro entregado por `read`."""
+        self._release(frame)
+
+
+    def more(self) -> bool:
+        """Indica si quedan cuadros por leer."""
+        with self._condition:
+            return self._frame is not None or not (self.ended or self._stopped.is_set())
+
+
+    def stats(self) -> dict:
+        """Contadores de captura."""
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "duplicates": self.duplicates,
+            "reconnects": self.reconnects,
+            "connected": self.connected,
+        }
+
+
+    def stop(self) -> None:
+        """Detiene el hilo de captura y libera la fuente."""
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.stream.release()
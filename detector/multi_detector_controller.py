@@ -0,0 +1,341 @@
+import supervision as sv
+import cv2
+import gc
+import itertools
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from modules.model_loader import ModelLoader, preload
+from modules.camera_tracker import CameraTracker
+from modules.track_registry import TrackRegistry, EVENT_ENDED
+from modules.motion_gate import MotionGate
+from modules.rate_controller import RateController
+from modules.region import RegionOfInterest
+from modules.frame_pool import FramePool
+from modules.video_stream import LatestFrameStream
+from modules.annotation import Annotation
+from modules.save_results import SaveResults
+from modules.publisher import RedisPublisher
+from modules.spool import DiskSpool
+from modules.image_profile import ImageProfile
+from camera_controller import get_registry, LIVE_KEYS
+import tools.messages as messages
+from tools.video_info import VideoInfo
+from tools.cpu_quota import configure_capture_threads, configure_torch_threads
+from typing import Dict
+from config import get_current_timestamp, SPOOL_DIR, SPOOL_MAX_MB, SPOOL_MAX_AGE, SPOOL_DRAIN_RATE
+
+
+def main(
+    cameras: Dict[str, dict],
+    weights: str,
+    size: int,
+    max_frames: int = None,
+    backend: str = "pt",
+    threads: int = None,
+    config_reload: float = 2.0,
+    show: bool = False
+) -> None:
+    """Función principal para procesar varias cámaras en un solo proceso.
+
+    Todas las cámaras comparten una única copia del modelo y se infieren en un
+    solo lote por iteración, con el cuadro más reciente de cada una. Cada
+    cámara conserva su propio estado de seguimiento ByteTrack.
+
+    args:
+        cameras (Dict[str, dict]): Configuración de cada cámara, indexada por ID.
+        weights (str): Ruta al modelo de detección.
+        size (int): Tamaño de entrada de la imagen para el modelo de detección.
+        max_frames (int, optional): Número máximo de lotes a procesar. Por defecto es None.
+        backend (str, optional): Backend de inferencia: "pt", "onnx", "openvino" u "openvino_int8" (cuantizado con quantize.py --batched). Por defecto es "pt".
+        threads (int, optional): Hilos de torch y OpenCV. Por defecto según la cuota de CPU del contenedor.
+        config_reload (float, optional): Segundos entre revisiones de camera_config.json para aplicar en vivo
+            los cambios de región, clases y umbral. Por defecto es 2.0; None desactiva la recarga.
+        show (bool, optional): Mostrar los resultados en vivo. Por defecto es False.
+    """
+    # Inicializar contador de etapas del proceso de detección y seguimientos
+    step_count = itertools.count(1)
+
+    # Ajustar los hilos de OpenCV y FFmpeg a la cuota de CPU antes de abrir las cámaras
+    thread_settings = configure_capture_threads(threads)
+
+    # Backend de captura de cada cámara; con FFmpeg el decodificador también se limita a los hilos de la cuota
+    capture_options = {camera_id: dict(camera_config.get("capture") or {}) for camera_id, camera_config in cameras.items()}
+    for options in capture_options.values():
+        if options.get("backend") == "ffmpeg":
+            options.setdefault("threads", thread_settings["threads"])
+
+    # Abrir todas las fuentes en paralelo, dejando cada captura abierta para su
+    # transmisión, mientras se importan torch y ultralytics
+    with ThreadPoolExecutor(max_workers=len(cameras), thread_name_prefix="sonda") as executor:
+        source_probes = {
+            camera_id: executor.submit(VideoInfo, source=str(camera_config["url"]), keep_open=True, capture_options=capture_options[camera_id])
+            for camera_id, camera_config in cameras.items() }
+        configure_torch_threads(thread_settings["threads"])
+        preload()
+        source_infos = {camera_id: source_probe.result() for camera_id, source_probe in source_probes.items()}
+
+    # Publicador compartido por todas las cámaras: envía los mensajes a Redis en lotes desde su propio hilo
+    publisher = RedisPublisher(
+        maxsize=64 * len(cameras),
+        spool=DiskSpool(Path(SPOOL_DIR).joinpath("-".join(cameras)), max_bytes=SPOOL_MAX_MB * 1024 * 1024, max_age=SPOOL_MAX_AGE) if SPOOL_DIR else None,
+        drain_rate=SPOOL_DRAIN_RATE )
+
+    # Inicializar cada cámara
+    camera_states = []
+    new_frame_event = threading.Event()
+    for camera_id, camera_config in cameras.items():
+        source = str(camera_config["url"])
+        source_info = source_infos[camera_id]
+        messages.step_message(next(step_count), f"Origen del Video {camera_id} Inicializado ✅")
+        messages.source_message(source_info)
+
+        # Captura del cuadro más reciente, con aviso compartido de cuadros nuevos
+        frame_pool = FramePool.from_resolution(source_info.resolution_wh, size=4)
+        video_stream = LatestFrameStream(
+            source=source,
+            frame_pool=frame_pool,
+            drop_frames=source_info.source_type == 'stream',
+            skip_duplicates=source_info.source_type == 'stream',
+            new_frame_event=new_frame_event,
+            capture=source_info.capture,
+            capture_options=capture_options[camera_id] )
+
+        region = RegionOfInterest(polygon=source_info.scale_polygon(camera_config["region"]), resolution_wh=source_info.resolution_wh) if camera_config.get("region") else None
+        image_profile = ImageProfile.from_config(camera_config.get("image"), resolution_wh=source_info.resolution_wh, region=region)
+        camera_states.append({
+            "camera_id": camera_id,
+            "source_info": source_info,
+            "video_stream": video_stream,
+            "classes": camera_config["clases"],
+            "confidence": float(camera_config.get("confidence", 0.5)),
+            "region": region,
+            "tracker": CameraTracker(frame_rate=int(source_info.fps) or 30),
+            "track_registry": TrackRegistry(
+                ttl=float(camera_config.get("events", {}).get("ttl", 2.0)),
+                confidence_margin=float(camera_config.get("events", {}).get("confidence_margin", 0.1)) ),
+            "saving_results": SaveResults(camera_id=camera_id, image_profile=image_profile, publisher=publisher),
+            "annotator": Annotation(source_info=source_info, fps=False, trace=True, scale=image_profile.scale, crop=image_profile.box),
+            "motion_gate": MotionGate(**camera_config["motion"]) if camera_config.get("motion") else None,
+            "last_detections": sv.Detections.empty(),
+            "tracker_state": False,
+        })
+        camera_states[-1]["roi_buffer"] = FramePool.from_resolution(region.crop_wh, size=1).acquire() if region is not None else None
+    messages.step_message(next(step_count), 'Guardado Configurado ✅')
+
+    # Tamaño de inferencia del lote: el mayor entre los recortes de las regiones
+    batch_size = max(
+        state["region"].inference_size(size) if state["region"] is not None else size
+        for state in camera_states )
+
+    # Inicializar un único modelo YOLO para todas las cámaras, filtrando por la
+    # unión de clases y el menor umbral; cada cámara aplica luego su propio filtro
+    yolo_detector = ModelLoader(
+        weights_path=weights,
+        image_size=batch_size,
+        confidence=min(state["confidence"] for state in camera_states),
+        class_filter=sorted({class_id for state in camera_states for class_id in state["classes"]}),
+        backend=backend,
+        batch=len(camera_states) )
+    warmup_time = yolo_detector.warmup()
+
+    messages.step_message(next(step_count), f"Procesador: {'GPU ✅' if yolo_detector.device == 'cuda' else 'CPU ⚠️'} ({backend})")
+    messages.step_message(next(step_count), f"Hilos: {thread_settings['threads']} (cuota {thread_settings['quota'] or 'sin límite'}, {thread_settings['cpus']:g} CPU) · Calentamiento {batch_size} px: {warmup_time:.2f} s")
+    messages.step_message(next(step_count), f"Modelo {Path(weights).stem.upper()} Inicializado ✅ ({len(camera_states)} cámaras)")
+
+    # Controladores de tasa por cámara; el tamaño se comparte en el lote, así que solo se ajusta el paso
+    for state in camera_states:
+        rate_config = cameras[state["camera_id"]].get("rate")
+        state["rate_controller"] = RateController.from_config(rate_config, image_size=batch_size, adapt_size=False) if rate_config else None
+
+    # Recarga en vivo de la configuración de las cámaras, aplicada entre lotes
+    config_registry = get_registry()
+    next_config_check = time.monotonic() + config_reload if config_reload else None
+
+    def reload_camera_configs() -> None:
+        """Aplica los cambios de región, clases y umbral de camera_config.json sin recargar el modelo ni reconectar las cámaras."""
+        try:
+            changes = config_registry.reload()
+        except ValueError as e:
+            messages.step_message("Error", f"Configuración no aplicada, se conserva la anterior: {e}")
+            return
+
+        for state in camera_states:
+            changed = changes.get(state["camera_id"], [])
+            if not changed:
+                continue
+            camera_config = config_registry.get(state["camera_id"])
+            if "region" in changed:
+                try:
+                    region = RegionOfInterest(polygon=state["source_info"].scale_polygon(camera_config["region"]), resolution_wh=state["source_info"].resolution_wh) if camera_config.get("region") else None
+                except ValueError as e:
+                    messages.step_message("Error", f"Región de la cámara {state['camera_id']} no aplicada: {e}")
+                    continue
+                # El tamaño del lote no cambia: el recorte nuevo se escala al tamaño compartido
+                state["region"] = region
+                state["roi_buffer"] = FramePool.from_resolution(region.crop_wh, size=1).acquire() if region is not None else None
+                if state["motion_gate"] is not None:
+                    state["motion_gate"].reset()
+                image_profile = state["saving_results"].image_profile
+                if image_profile.crop == "region":
+                    image_profile.configure(state["source_info"].resolution_wh, region)
+                    state["annotator"].crop, state["annotator"].scale = image_profile.box, image_profile.scale
+            if "clases" in changed:
+                state["classes"] = camera_config["clases"]
+            if "confidence" in changed:
+                state["confidence"] = float(camera_config.get("confidence", 0.5))
+
+            applied = [key for key in changed if key in LIVE_KEYS]
+            pending = [key for key in changed if key not in LIVE_KEYS]
+            if applied:
+                messages.step_message(next(step_count), f"Cámara {state['camera_id']}: configuración aplicada en vivo: {', '.join(applied)} ✅")
+            if pending:
+                messages.step_message(next(step_count), f"Cámara {state['camera_id']}: cambios que requieren reiniciar: {', '.join(pending)} ⚠️")
+
+        # El modelo compartido filtra por la unión de clases y el menor umbral de las cámaras
+        yolo_detector.confidence = min(state["confidence"] for state in camera_states)
+        yolo_detector.class_filter = sorted({class_id for state in camera_states for class_id in state["classes"]})
+
+    # Inicializar variables
+    frame_number = 0
+    fps_monitor = sv.FPSMonitor()
+
+    # Congelar los objetos creados durante la inicialización para que el
+    # recolector de basura no los recorra en cada ciclo
+    gc.freeze()
+
+    # Iniciar procesamiento de video
+    messages.step_message(next(step_count), 'Procesamiento de Video Iniciado ✅')
+    time_start = get_current_timestamp()
+    publisher.start()
+    for state in camera_states:
+        state["video_stream"].start()
+
+    try:
+        while max_frames is None or frame_number < max_frames:
+            active_states = [state for state in camera_states if state["video_stream"].more()]
+            if not active_states:
+                break
+
+            # Revisar camera_config.json entre lotes
+            if next_config_check is not None and time.monotonic() >= next_config_check:
+                next_config_check = time.monotonic() + config_reload
+                reload_camera_configs()
+
+            # Tomar el cuadro más reciente de cada cámara que tenga uno nuevo
+            new_frame_event.clear()
+            batch_states = []
+            batch_images = []
+            skipped_states = []
+            for state in active_states:
+                image = state["video_stream"].read(timeout=0)
+                if image is None:
+                    continue
+
+                # Procesar solo uno de cada `stride` cuadros de la cámara
+                if state["rate_controller"] is not None and not state["rate_controller"].should_process():
+                    state["video_stream"].release(image)
+                    continue
+
+                if state["region"] is not None:
+                    # Extraer región de interés en un buffer reutilizable
+                    inference_image = state["region"].crop(image, out=state["roi_buffer"])
+                else:
+                    inference_image = image
+
+                # Las cámaras sin movimiento no entran al lote y conservan sus últimas detecciones
+                if state["motion_gate"] is not None and not state["motion_gate"].update(inference_image):
+                    skipped_states.append((state, image))
+                    continue
+                batch_images.append(inference_image)
+                batch_states.append((state, image))
+
+            if not batch_states and not skipped_states:
+                # Esperar a que cualquier cámara entregue un cuadro nuevo
+                new_frame_event.wait(timeout=1.0)
+                continue
+
+            # Inferencia en lote sobre las cámaras con movimiento
+            time_inference = time.perf_counter()
+            batch_results = yolo_detector.detect_batch(images=batch_images, image_size=batch_size) if batch_images else []
+            for state, _ in batch_states:
+                if state["rate_controller"] is not None:
+                    state["rate_controller"].update(
+                        latency=time.perf_counter() - time_inference,
+                        lag=time.time() - state["video_stream"].timestamp )
+
+            for (state, image), results in zip(batch_states + skipped_states, batch_results + [None] * len(skipped_states)):
+                if results is not None:
+                    # Filtrar por las clases y el umbral de la cámara antes del seguimiento
+                    keep = np.isin(results.boxes.cls.cpu().numpy().astype(int), state["classes"])
+                    keep &= results.boxes.conf.cpu().numpy() >= state["confidence"]
+                    results = state["tracker"].update(results[np.flatnonzero(keep)])
+
+                    # Conversión de resultados a formato Supervision en coordenadas del cuadro completo
+                    detections = sv.Detections.from_ultralytics(ultralytics_results=results)
+                    if state["region"] is not None:
+                        detections = state["region"].to_frame(detections)
+                    state["last_detections"] = detections
+                else:
+                    detections = state["last_detections"]
+
+                # Eventos del ciclo de vida de los objetos seguidos
+                events = state["track_registry"].update(detections, state["video_stream"].timestamp)
+
+                # Sin objetos activos desde hace más del TTL, el estado de ByteTrack de la cámara ya no sirve
+                if len(detections):
+                    state["tracker_state"] = True
+                elif state["tracker_state"] and not state["track_registry"].tracks:
+                    state["tracker"].clear()
+                    state["tracker_state"] = False
+
+                # Actualizar los rastros en cada cuadro, pero dibujar solo si la imagen se publica o se muestra
+                state["annotator"].forget([event["tracker_id"] for event in events if event["evento"] == EVENT_ENDED])
+                state["annotator"].update(detections)
+                if show or state["saving_results"].needs_image(detections, events):
+                    annotated_image = state["annotator"].render(detections=detections, scene=image)
+                else:
+                    annotated_image = None
+
+                # Enviar solo los eventos del ciclo de vida, con la imagen ya reducida
+                state["saving_results"].send_detection(detections=detections, image=annotated_image, events=events, image_scale=1.0, frame=image)
+
+                # Mostrar resultados en vivo
+                if show:
+                    cv2.namedWindow(f"Resultado {state['camera_id']}", cv2.WINDOW_NORMAL)
+                    cv2.imshow(f"Resultado {state['camera_id']}", annotated_image)
+
+                state["video_stream"].release(image)
+
+            fps_monitor.tick()
+
+            # Presentar progreso en la terminal
+            messages.progress_message(frame_number, None, fps_monitor.fps * (len(batch_states) + len(skipped_states)), {
+                **{f"Omitidos {state['camera_id']}": state["motion_gate"].skipped
+                   for state in camera_states if state["motion_gate"] is not None},
+                **{f"Control {state['camera_id']}": f"x{state['rate_controller'].stride} {state['rate_controller'].decision}"
+                   for state in camera_states if state["rate_controller"] is not None},
+                "Cola pub.": f"{publisher.queue.qsize()}/{publisher.queue.dropped}",
+                **({"Spool": publisher.spool.pending} if publisher.spool is not None and publisher.spool.pending else {}) })
+
+            frame_number += 1
+
+            if show and cv2.waitKey(1) & 0xFF == ord("q"):
+                print("Saliendo...")
+                break
+
+    except KeyboardInterrupt:
+        messages.step_message(next(step_count), 'Fin del video ✅')
+
+    # Finalizar y mostrar tiempo total
+    messages.step_message(next(step_count), f"Tiempo Total: {(get_current_timestamp() - time_start).total_seconds():.2f} s")
+    for state in camera_states:
+        state["saving_results"].send_detection(detections=sv.Detections.empty(), image=None, events=state["track_registry"].flush())
+        state["video_stream"].stop()
+    publisher.stop()
+    messages.publisher_message(next(step_count), publisher.stats())
+    if show:
+        cv2.destroyAllWindows()
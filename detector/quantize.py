@@ -0,0 +1,397 @@
+"""Cuantiza a INT8 los pesos de las cámaras con cuadros de su región de interés.
+
+Uso (desde la carpeta detector/):
+    python quantize.py --camara-id 1 2 3
+    python quantize.py --camara-id 1 --frames 300 --every 10 --max-map-drop 0.02 --apply
+    python quantize.py --camara-id 1 2 3 --batched --apply
+
+1. Recolecta `--frames` recortes de la región de interés de cada cámara, uno
+   de cada `--every` cuadros, en CALIBRATION_DIR/<cámara>/. Se reutilizan en
+   las siguientes ejecuciones mientras la región, la captura, el tamaño y la
+   muestra pedida no cambien; `--recollect` los vuelve a leer.
+2. Separa de cada cámara una parte de validación (`--holdout`) que no se usa
+   para calibrar, y cuantiza con NNCF el modelo OpenVINO FP32 de cada par de
+   pesos y tamaño de inferencia con los recortes de calibración de todas las
+   cámaras. Como en la exportación INT8 de ultralytics, las operaciones de
+   decodificación de cajas de la cabeza quedan en punto flotante.
+3. Valida cada cámara sobre su parte de validación contra el modelo FP32:
+   las detecciones FP32 con la confianza de la cámara son la referencia y se
+   calcula el mAP50 y mAP50-95 de las predicciones INT8, con la aceleración
+   de la latencia p50 de ambos modelos.
+
+Con `--apply` se escribe `"backend": "openvino_int8"` solo en las cámaras
+cuya caída de mAP50 no supera `--max-map-drop` y cuya aceleración alcanza
+`--min-speedup`: en CPUs con AMX OpenVINO ya ejecuta el modelo FP32 en
+bfloat16 y el INT8 puede no ser más rápido. El reporte de validación se
+guarda junto al modelo INT8 en quantization.json.
+
+Con `--batched` las cámaras son un grupo que se ejecuta en lote con
+`main.py --camara-id 1 2 3`: se cuantiza el modelo de lote dinámico con el
+tamaño de inferencia del lote (el mayor de los recortes con el mayor tamaño
+configurado), y `--apply` cambia el backend de todas las cámaras o de
+ninguna, porque main.py rechaza los lotes con backends distintos.
+
+Requiere openvino y nncf.
+"""
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from autotune import agreement, box_iou, measure, sample_frames
+from camera_controller import CONFIG_FILE, get_registry, update_camera_config
+from config import BASE_DIR, CALIBRATION_DIR
+from modules.model_loader import ModelLoader, export_path, preload
+from modules.region import RegionOfInterest
+from tools import messages
+from tools.cpu_quota import configure_capture_threads, configure_torch_threads
+from tools.video_info import VideoInfo
+
+
+# Umbrales de IoU del mAP50-95 y confianza mínima de las predicciones validadas, como en `yolo val`
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+VALIDATION_CONFIDENCE = 0.001
+
+
+def average_precision(true_positives: np.array, total: int) -> float:
+    """AP interpolada en 101 puntos de recall, como en COCO.
+
+    args:
+        true_positives (np.array): Acierto de cada predicción, ordenadas de mayor a menor confianza.
+        total (int): Objetos de referencia.
+    returns:
+        float: Precisión promedio entre 0 y 1.
+    """
+    if total == 0 or len(true_positives) == 0:
+        return 0.0
+    hits = np.cumsum(true_positives)
+    recall = hits / total
+    precision = hits / np.arange(1, len(true_positives) + 1)
+
+    # Envolvente decreciente de la precisión, evaluada en cada punto de recall
+    envelope = np.maximum.accumulate(precision[::-1])[::-1]
+    indexes = np.searchsorted(recall, np.linspace(0, 1, 101), side="left")
+    return float(np.where(indexes < len(envelope), envelope[np.minimum(indexes, len(envelope) - 1)], 0.0).mean())
+
+
+def mean_average_precision(ground_truth: list, predictions: list, iou_thresholds: np.array = IOU_THRESHOLDS) -> np.array:
+    """mAP de las predicciones respecto a la referencia, para cada umbral de IoU.
+
+    Cada predicción, de mayor a menor confianza, se empareja con el objeto de
+    referencia libre de su clase con mayor IoU.
+
+    args:
+        ground_truth (list): Cajas y clases (xyxy, cls) de referencia en cada imagen.
+        predictions (list): Cajas, clases y confianzas (xyxy, cls, conf) en las mismas imágenes.
+        iou_thresholds (np.array, optional): Umbrales de IoU. Por defecto de 0.5 a 0.95.
+    returns:
+        np.array: mAP por umbral, promediado sobre las clases de la referencia; nan sin referencia.
+    """
+    classes = sorted({int(class_id) for _, reference_cls in ground_truth for class_id in reference_cls})
+    if not classes:
+        return np.full(len(iou_thresholds), np.nan)
+
+    ap = np.zeros((len(classes), len(iou_thresholds)))
+    for class_index, class_id in enumerate(classes):
+        confidences, true_positives, total = [], [], 0
+        for (reference_xyxy, reference_cls), (predicted_xyxy, predicted_cls, predicted_conf) in zip(ground_truth, predictions):
+            reference = reference_xyxy[reference_cls == class_id]
+            mask = predicted_cls == class_id
+            order = np.argsort(-predicted_conf[mask])
+            predicted, conf = predicted_xyxy[mask][order], predicted_conf[mask][order]
+            total += len(reference)
+
+            iou = box_iou(predicted, reference) if len(predicted) and len(reference) else np.zeros((len(predicted), len(reference)))
+            hits = np.zeros((len(predicted), len(iou_thresholds)), dtype=bool)
+            for threshold_index, threshold in enumerate(iou_thresholds):
+                matched = np.zeros(len(reference), dtype=bool)
+                for row in range(len(predicted)):
+                    if not len(reference):
+                        break
+                    best = int(np.argmax(np.where(matched, -1.0, iou[row])))
+                    if not matched[best] and iou[row, best] >= threshold:
+                        matched[best] = True
+                        hits[row, threshold_index] = True
+            confidences.append(conf)
+            true_positives.append(hits)
+
+        order = np.argsort(-np.concatenate(confidences), kind="stable")
+        hits = np.concatenate(true_positives)[order]
+        ap[class_index] = [average_precision(hits[:, index], total) for index in range(len(iou_thresholds))]
+    return ap.mean(axis=0)
+
+
+def split(images: list, holdout: float) -> Tuple[list, list]:
+    """Separa las imágenes en calibración y validación, intercaladas para cubrir todo el periodo grabado."""
+    step = max(2, round(1 / holdout))
+    return [image for index, image in enumerate(images) if index % step], images[::step]
+
+
+def collect(camera_id: str, camera_config: dict, size: int, frames: int, every: int, video: str, recollect: bool, threads: int) -> dict:
+    """Recortes de la región de interés guardados para una cámara, recolectados si no existen o cambió su configuración.
+
+    args:
+        camera_id (str): ID de la cámara.
+        camera_config (dict): Configuración de la cámara.
+        size (int): Tamaño de inferencia configurado de la cámara.
+        frames (int): Recortes a recolectar.
+        every (int): Paso entre cuadros recolectados.
+        video (str): Video local en lugar de la cámara; None para la cámara.
+        recollect (bool): Volver a recolectar aunque existan recortes.
+        threads (int): Hilos del decodificador de FFmpeg.
+    returns:
+        dict: Recortes leídos (images) y tamaño de inferencia de la cámara (inference_size).
+    """
+    folder = Path(CALIBRATION_DIR).joinpath(camera_id)
+    info_path = folder.joinpath("info.json")
+    key = {"region": camera_config.get("region"), "capture": camera_config.get("capture"), "size": size, "frames": frames, "every": every}
+    info = json.loads(info_path.read_text()) if info_path.exists() else None
+
+    if recollect or info is None or info["key"] != key:
+        capture_options = dict(camera_config.get("capture") or {})
+        if capture_options.get("backend") == "ffmpeg":
+            capture_options.setdefault("threads", threads)
+        source_info = VideoInfo(source=video or camera_config["url"], keep_open=True, capture_options=capture_options)
+        region = camera_config.get("region")
+        region_of_interest = RegionOfInterest(polygon=source_info.scale_polygon(region), resolution_wh=source_info.resolution_wh) if region else None
+
+        shutil.rmtree(folder, ignore_errors=True)
+        folder.mkdir(parents=True)
+        images = sample_frames(source_info, frames, every)
+        for index, image in enumerate(images):
+            crop = region_of_interest.crop(image) if region_of_interest is not None else image
+            cv2.imwrite(str(folder.joinpath(f"{index:05d}.jpg")), crop, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        info = {"key": key, "inference_size": region_of_interest.inference_size(size) if region_of_interest is not None else size}
+        info_path.write_text(json.dumps(info))
+
+    return {
+        "images": [cv2.imread(str(path)) for path in sorted(folder.glob("*.jpg"))],
+        "inference_size": info["inference_size"],
+    }
+
+
+def quantize_model(weights: Path, image_size: int, images: List[np.array], batch: int = 1) -> Path:
+    """Cuantiza a INT8 el modelo OpenVINO FP32 de los pesos, calibrado con las imágenes.
+
+    args:
+        weights (Path): Pesos `.pt`.
+        image_size (int): Tamaño fijo de entrada del modelo.
+        images (List[np.array]): Imágenes BGR de calibración.
+        batch (int, optional): Lote del modelo; mayor a 1 cuantiza el modelo de
+            lote dinámico. Por defecto es 1.
+    returns:
+        Path: Carpeta del modelo INT8, en la ruta que usa ModelLoader con "openvino_int8".
+    """
+    import nncf
+    import openvino as ov
+    from ultralytics import YOLO
+    from ultralytics.data.augment import LetterBox
+
+    # Exportación FP32 con tamaño fijo, reutilizada si ya existe
+    ModelLoader(weights_path=str(weights), image_size=image_size, backend="openvino", batch=batch)
+    fp32_path = export_path(weights, "openvino", image_size, batch)
+    xml_path = next(fp32_path.glob("*.xml"))
+
+    # El mismo preprocesamiento que ultralytics aplica a los modelos de tamaño fijo
+    letterbox = LetterBox(new_shape=(image_size, image_size), auto=False, stride=32)
+
+    def transform(image: np.array) -> np.array:
+        image = letterbox(image=image)[..., ::-1].transpose(2, 0, 1)
+        return np.ascontiguousarray(image[None], dtype=np.float32) / 255.0
+
+    # Operaciones de decodificación de cajas de la cabeza en punto flotante
+    head_name = ".".join(list(YOLO(str(weights)).model.named_modules())[-1][0].split(".")[:2])
+    ignored_scope = nncf.IgnoredScope(
+        patterns=[f".*{head_name}/.*/Add", f".*{head_name}/.*/Sub*", f".*{head_name}/.*/Mul*", f".*{head_name}/.*/Div*", f".*{head_name}\\.dfl.*"],
+        types=["Sigmoid"],
+        validate=False )
+
+    quantized_model = nncf.quantize(
+        model=ov.Core().read_model(xml_path),
+        calibration_dataset=nncf.Dataset(images, transform),
+        subset_size=len(images),
+        preset=nncf.QuantizationPreset.MIXED,
+        ignored_scope=ignored_scope )
+
+    # Escribir en una carpeta temporal y reemplazar la anterior al terminar
+    int8_path = export_path(weights, "openvino_int8", image_size, batch)
+    tmp_path = int8_path.with_name(f".{int8_path.name}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    ov.save_model(quantized_model, str(tmp_path.joinpath(xml_path.name)))
+    shutil.copyfile(fp32_path.joinpath("metadata.yaml"), tmp_path.joinpath("metadata.yaml"))
+    shutil.rmtree(int8_path, ignore_errors=True)
+    tmp_path.rename(int8_path)
+    return int8_path
+
+
+def validate(weights: Path, image_size: int, images: List[np.array], confidence: float, classes: List[int], max_map_drop: float, min_speedup: float, batch: int = 1) -> dict:
+    """Compara las detecciones del modelo INT8 con las del FP32 en las imágenes de validación.
+
+    args:
+        weights (Path): Pesos `.pt`.
+        image_size (int): Tamaño fijo de entrada de los modelos.
+        images (List[np.array]): Imágenes de validación, no usadas en la calibración.
+        confidence (float): Confianza de la cámara para las detecciones de referencia.
+        classes (List[int]): Clases de la cámara.
+        max_map_drop (float): Caída máxima aceptada del mAP50.
+        min_speedup (float): Aceleración mínima de la latencia p50.
+        batch (int, optional): Lote de los modelos comparados. Por defecto es 1.
+    returns:
+        dict: mAP50 y mAP50-95 del INT8 y su caída respecto al FP32, coincidencia
+            con la confianza de la cámara, latencias, aceleración y aceptación.
+    """
+    fp32 = measure(weights, "openvino", image_size, images, VALIDATION_CONFIDENCE, classes, batch=batch)
+    int8 = measure(weights, "openvino_int8", image_size, images, VALIDATION_CONFIDENCE, classes, batch=batch)
+
+    # Referencia: lo que el detector reportaría con el modelo FP32
+    ground_truth = [(xyxy[conf >= confidence], cls[conf >= confidence]) for xyxy, cls, conf in fp32["detections"]]
+    int8_detections = [(xyxy[conf >= confidence], cls[conf >= confidence]) for xyxy, cls, conf in int8["detections"]]
+    map_values = mean_average_precision(ground_truth, int8["detections"])
+    references = sum(len(cls) for _, cls in ground_truth)
+
+    # El FP32 tiene mAP 1 contra sus propias detecciones
+    result = {
+        "images": len(images),
+        "references": references,
+        "map50": float(map_values[0]),
+        "map50_95": float(map_values.mean()),
+        "map50_delta": float(map_values[0] - 1.0),
+        "map50_95_delta": float(map_values.mean() - 1.0),
+        "agreement": agreement(ground_truth, int8_detections),
+        "fp32_latency_ms_p50": fp32["latency_ms_p50"],
+        "int8_latency_ms_p50": int8["latency_ms_p50"],
+        "speedup": fp32["latency_ms_p50"] / int8["latency_ms_p50"],
+    }
+    result["accepted"] = references > 0 and -result["map50_delta"] <= max_map_drop and result["speedup"] >= min_speedup
+    return result
+
+
+def main(
+    camera_ids: List[str],
+    frames: int,
+    every: int,
+    video: str,
+    recollect: bool,
+    holdout: float,
+    max_map_drop: float,
+    min_speedup: float,
+    apply: bool,
+    config_file: str,
+    batched: bool = False
+) -> dict:
+    step_count = iter(range(1, 100))
+    registry = get_registry(config_file)
+    batch = len(camera_ids) if batched else 1
+    if batched:
+        # Las mismas condiciones y el mismo tamaño que main.py con varias cámaras
+        group_weights = {registry.get(camera_id).get("weights", 'weights/tunel_yolo11n.pt') for camera_id in camera_ids}
+        if len(group_weights) > 1:
+            raise ValueError(f"Las cámaras {', '.join(camera_ids)} deben compartir los mismos pesos para procesarse en lote")
+        group_size = max(int(registry.get(camera_id).get("size", 1280)) for camera_id in camera_ids)
+    thread_settings = configure_capture_threads(None)
+    configure_torch_threads(thread_settings["threads"])
+    preload()
+
+    # Recortes de cada cámara, separados en calibración y validación
+    cameras = {}
+    for camera_id in camera_ids:
+        camera_config = registry.get(camera_id)
+        weights = camera_config.get("weights", 'weights/tunel_yolo11n.pt')
+        size = group_size if batched else int(camera_config.get("size", 1280))
+        dataset = collect(camera_id, camera_config, size, frames, every, video, recollect, thread_settings["threads"])
+        if len(dataset["images"]) < 2:
+            raise Exception(f"Cámara {camera_id}: no se pudieron leer cuadros de calibración ❌")
+        calibration, held_out = split(dataset["images"], holdout)
+        cameras[camera_id] = {
+            "weights": BASE_DIR.joinpath(weights).resolve(),
+            "inference_size": dataset["inference_size"],
+            "calibration": calibration,
+            "held_out": held_out,
+        }
+        messages.step_message(next(step_count), f"Cámara {camera_id}: {len(calibration)} recortes de calibración y {len(held_out)} de validación ({dataset['inference_size']} px) ✅")
+
+    # En lote todas las cámaras usan el tamaño de inferencia del lote
+    if batched:
+        batch_size = max(camera["inference_size"] for camera in cameras.values())
+        for camera in cameras.values():
+            camera["inference_size"] = batch_size
+
+    # Un modelo INT8 por pesos y tamaño de inferencia, calibrado con los recortes de todas las cámaras
+    calibration = [image for camera in cameras.values() for image in camera["calibration"]]
+    report = {}
+    for weights, image_size in sorted({(camera["weights"], camera["inference_size"]) for camera in cameras.values()}):
+        int8_path = quantize_model(weights, image_size, calibration, batch=batch)
+        messages.step_message(next(step_count), f"Modelo INT8 {int8_path.name} calibrado con {len(calibration)} recortes ✅")
+
+        results = {}
+        for camera_id, camera in cameras.items():
+            if (camera["weights"], camera["inference_size"]) != (weights, image_size):
+                continue
+            camera_config = registry.get(camera_id)
+            results[camera_id] = result = validate(
+                weights, image_size, camera["held_out"],
+                confidence=float(camera_config.get("confidence", 0.5)),
+                classes=camera_config["clases"],
+                max_map_drop=max_map_drop,
+                min_speedup=min_speedup,
+                batch=batch )
+            report[camera_id] = {"model": str(int8_path), **result}
+            messages.quantization_message(camera_id, result)
+
+        with open(int8_path.joinpath("quantization.json"), "w") as f:
+            json.dump({"max_map_drop": max_map_drop, "min_speedup": min_speedup, "cameras": results}, f, indent=2)
+
+    accepted = [camera_id for camera_id, result in report.items() if result["accepted"]]
+    rejected = [camera_id for camera_id in report if camera_id not in accepted]
+    if rejected:
+        messages.step_message("Aviso", f"Cámaras {', '.join(rejected)}: caída de mAP50 mayor a {max_map_drop}, aceleración menor a x{min_speedup:g} o sin detecciones para validar; se mantiene FP32")
+    if apply and batched and rejected:
+        # Aplicar solo a una parte del lote haría que main.py lo rechace
+        messages.step_message("Aviso", f"Lote {', '.join(camera_ids)}: no todas las cámaras fueron aceptadas; no se aplica openvino_int8 a ninguna")
+        accepted = []
+    if apply:
+        for camera_id in accepted:
+            update_camera_config(camera_id, {"backend": "openvino_int8"}, path=config_file)
+        if accepted:
+            messages.step_message(next(step_count), f"{Path(config_file).name}: backend openvino_int8 en las cámaras {', '.join(accepted)}; reinicie sus detectores para aplicar ✅")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--camara-id', nargs='+', type=str, required=True, help='ids de las cámaras en camera_config.json')
+    parser.add_argument('--frames', type=int, default=300, help='recortes a recolectar por cámara')
+    parser.add_argument('--every', type=int, default=10, help='paso entre cuadros recolectados')
+    parser.add_argument('--video', type=str, default=None, help='video local en lugar de las cámaras')
+    parser.add_argument('--recollect', action='store_true', help='volver a recolectar los recortes guardados')
+    parser.add_argument('--holdout', type=float, default=0.2, help='fracción de recortes de validación')
+    parser.add_argument('--max-map-drop', type=float, default=0.02, help='caída máxima aceptada del mAP50 respecto al FP32')
+    parser.add_argument('--min-speedup', type=float, default=1.0, help='aceleración mínima de la latencia p50 respecto al FP32')
+    parser.add_argument('--apply', action='store_true', help='usar el modelo INT8 en las cámaras aceptadas')
+    parser.add_argument('--batched', action='store_true', help='las cámaras se ejecutan en lote con main.py; cuantiza el modelo de lote dinámico')
+    parser.add_argument('--config', type=str, default=CONFIG_FILE, help='archivo de configuración de las cámaras')
+    parser.add_argument('--output', type=str, default=None, help='archivo JSON con los resultados')
+    option = parser.parse_args()
+
+    report = main(
+        camera_ids=option.camara_id,
+        frames=option.frames,
+        every=option.every,
+        video=option.video,
+        recollect=option.recollect,
+        holdout=option.holdout,
+        max_map_drop=option.max_map_drop,
+        min_speedup=option.min_speedup,
+        apply=option.apply,
+        config_file=option.config,
+        batched=option.batched )
+
+    if option.output:
+        with open(option.output, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if all(result["accepted"] for result in report.values()) else 1)
@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+import supervision as sv
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.annotation import Annotation
+from tools.video_info import VideoInfo
+
+
+def mock_detections(x: float) -> sv.Detections:
+    """Crea una detección seguida en la posición horizontal indicada."""
+    return sv.Detections(
+        xyxy=np.array([[x, 200, x + 100, 300]], dtype=np.float32),
+        confidence=np.array([0.9]),
+        class_id=np.array([2]),
+        tracker_id=np.array([7]),
+        data={"class_name": np.array(["car"])} )
+
+
+class TestAnnotation(unittest.TestCase):
+    """
+    Clase de las pruebas para la anotación diferida y reducida.
+    """
+    def setUp(self):
+        self.source_info = VideoInfo.__new__(VideoInfo)
+        self.source_info.width, self.source_info.height = 1280, 720
+
+
+    def test_dibujar_reducido(self):
+        """Prueba que la imagen anotada tenga la escala configurada y que el cuadro original no cambie."""
+        # Arrange
+        annotator = Annotation(source_info=self.source_info, fps=False, trace=True, scale=0.5)
+        scene = np.zeros((720, 1280, 3), dtype=np.uint8)
+        detections = mock_detections(400)
+
+        # Act
+        annotator.update(detections)
+        annotated_image = annotator.render(detections=detections, scene=scene)
+
+        # Assert: La caja se dibuja en coordenadas escaladas (x = 200 en la imagen reducida)
+        self.assertEqual(annotated_image.shape, (360, 640, 3))
+        self.assertFalse(scene.any())
+        self.assertTrue(annotated_image[100:150, 200].any())
+        self.assertFalse(annotated_image[:, :150].any())
+
+
+    def test_cuadro_completo_sin_escala(self):
+        """Prueba que con escala 1 y sin recorte se dibuje sobre una copia y el cuadro capturado no cambie."""
+        # Arrange
+        annotator = Annotation(source_info=self.source_info, fps=False, trace=True, scale=1.0, crop=(0, 0, 1280, 720))
+        scene = np.zeros((720, 1280, 3), dtype=np.uint8)
+        detections = mock_detections(400)
+
+        # Act
+        annotator.update(detections)
+        annotated_image = annotator.render(detections=detections, scene=scene)
+
+        # Assert
+        self.assertIsNot(annotated_image, scene)
+        self.assertEqual(annotated_image.shape, (720, 1280, 3))
+        self.assertTrue(annotated_image[200:300, 400].any())
+        self.assertFalse(scene.any())
+
+
+    def test_rastros_sin_dibujar(self):
+        """Prueba que los rastros se acumulen en cada cuadro aunque solo se dibuje el último."""
+        # Arrange
+        annotator = Annotation(source_info=self.source_info, fps=False, label=False, box=False, trace=True, scale=0.5)
+        scene = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+        # Act: Diez cuadros sin dibujar y uno dibujado
+        for step in range(10):
+            annotator.update(mock_detections(100 + 50 * step))
+        detections = mock_detections(600)
+        annotator.update(detections)
+        annotated_image = annotator.render(detections=detections, scene=scene)
+
+        # Assert: El rastro va del primer punto (x = 150 -> 75) al último (x = 650 -> 325), a la altura del borde inferior (y = 300 -> 150)
+        self.assertEqual(len(annotator.trace_annotator.trace.get(tracker_id=7)), 11)
+        self.assertTrue(annotated_image[148:153, 80:320].any(axis=(0, 2)).all())
+
+
+
+    def test_olvidar_rastros(self):
+        """Prueba que los rastros de objetos terminados se descarten y que los cuadros vacíos los envejezcan."""
+        # Arrange
+        annotator = Annotation(source_info=self.source_info, fps=False, label=False, box=False, trace=True, track_length=5)
+        for step in range(3):
+            annotator.update(mock_detections(100 + 50 * step))
+
+        # Act: El objeto 7 termina; luego llegan cuadros sin objetos
+        annotator.forget([7])
+        forgotten = len(annotator.trace_annotator.trace.get(tracker_id=7))
+        annotator.update(mock_detections(300))
+        for _ in range(10):
+            annotator.update(sv.Detections.empty())
+        annotator.update(mock_detections(400))
+
+        # Assert: Solo queda el punto más reciente dentro de la longitud del rastro
+        self.assertEqual(forgotten, 0)
+        self.assertEqual(len(annotator.trace_annotator.trace.get(tracker_id=7)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autotune import agreement, choose
+
+
+def frame(*detections) -> tuple:
+    """Cajas y clases de un cuadro a partir de tuplas (x1, y1, x2, y2, clase)."""
+    values = np.array(detections, dtype=float).reshape(-1, 5)
+    return values[:, :4], values[:, 4].astype(int)
+
+
+class TestAutotune(unittest.TestCase):
+    """
+    Clase de las pruebas para la elección de pesos, tamaño y backend.
+    """
+    def test_coincidencia(self):
+        """Prueba la coincidencia F1 por IoU y clase con la referencia."""
+        # Arrange
+        reference = [frame((0, 0, 10, 10, 0), (20, 20, 30, 30, 3)), frame()]
+        same = [frame((20, 20, 30, 31, 3), (0, 0, 10, 10, 0)), frame()]
+        partial = [frame((0, 0, 10, 10, 0), (20, 20, 30, 30, 0)), frame((50, 50, 60, 60, 0))]
+
+        # Act & Assert: La clase distinta y el falso positivo no cuentan
+        self.assertEqual(agreement(reference, same), 1.0)
+        self.assertAlmostEqual(agreement(reference, partial), 2 * 1 / (2 + 3))
+        self.assertEqual(agreement([frame()], [frame()]), 1.0)
+        self.assertEqual(agreement([frame((0, 0, 10, 10, 0))], [frame((5, 5, 15, 15, 0))]), 0.0)
+
+
+    def test_elegir(self):
+        """Prueba que se elija la más exacta que cumple el objetivo y, entre empatadas, la más rápida."""
+        # Arrange
+        candidates = [
+            {"size": 320, "score": 0.80, "fps": 40.0, "latency_ms_p95": 30.0},
+            {"size": 640, "score": 0.95, "fps": 20.0, "latency_ms_p95": 60.0},
+            {"size": 512, "score": 0.945, "fps": 25.0, "latency_ms_p95": 45.0},
+            {"size": 1280, "score": 1.00, "fps": 6.0, "latency_ms_p95": 170.0},
+        ]
+
+        # Act
+        chosen = choose(candidates, target_fps=15, max_latency_ms=100, tolerance=0.01)
+        strict = choose(candidates, target_fps=15, max_latency_ms=50, tolerance=0.0)
+        impossible = choose(candidates, target_fps=60, max_latency_ms=100)
+
+        # Assert
+        self.assertEqual(chosen["size"], 512)
+        self.assertEqual(strict["size"], 512)
+        self.assertIsNone(impossible)
+
+
+if __name__ == "__main__":
+    unittest.main()
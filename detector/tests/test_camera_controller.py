@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera_controller import CameraConfigRegistry, update_camera_config, validate_camera_config
+
+
+CAMERA_CONFIG = {
+    "1": {
+        "nombre": "mock_nombre",
+        "url": "rtsp://mock_source/stream",
+        "region": [[570, 120], [930, 120], [1240, 530], [540, 530]],
+        "clases": [0, 3]
+    }
+}
+
+
+class TestCameraConfigRegistry(unittest.TestCase):
+    """
+    Clase de las pruebas para el registro de configuración de las cámaras.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = Path(self.tmp_dir.name).joinpath("camera_config.json")
+        self.writes = 0
+        self.write(CAMERA_CONFIG)
+
+
+    def write(self, config: dict) -> None:
+        """Escribe el archivo con una fecha de modificación distinta en cada escritura."""
+        self.writes += 1
+        self.path.write_text(json.dumps(config))
+        os.utime(self.path, (self.writes, self.writes))
+
+
+    def test_consultas_desde_memoria(self):
+        """Prueba que la configuración se lea una sola vez y las consultas no dependan del archivo."""
+        # Arrange
+        registry = CameraConfigRegistry(self.path)
+
+        # Act: Borrar el archivo después de cargarlo
+        self.path.unlink()
+        camera_config = registry.get("1")
+
+        # Assert
+        self.assertEqual(camera_config["clases"], [0, 3])
+        self.assertEqual(registry.reload(), {})
+        with self.assertRaises(ValueError):
+            registry.get("9")
+
+
+    def test_recargar_cambios(self):
+        """Prueba que la recarga devuelva solo las llaves cambiadas de cada cámara."""
+        # Arrange
+        registry = CameraConfigRegistry(self.path)
+        self.assertEqual(registry.reload(), {})
+
+        # Act
+        self.write({"1": {**CAMERA_CONFIG["1"], "clases": [0], "confidence": 0.4}})
+        changes = registry.reload()
+
+        # Assert
+        self.assertEqual(changes, {"1": ["clases", "confidence"]})
+        self.assertEqual(registry.get("1")["confidence"], 0.4)
+
+
+    def test_configuracion_invalida(self):
+        """Prueba que un archivo inválido conserve la configuración anterior y se reporte una sola vez."""
+        # Arrange
+        registry = CameraConfigRegistry(self.path)
+
+        # Act
+        self.write({"1": {**CAMERA_CONFIG["1"], "region": [[0, 0], [10, 10]], "confidence": 2}})
+        with self.assertRaises(ValueError) as error:
+            registry.reload()
+
+        # Assert
+        self.assertIn("region", str(error.exception))
+        self.assertIn("confidence", str(error.exception))
+        self.assertEqual(registry.get("1"), CAMERA_CONFIG["1"])
+        self.assertEqual(registry.reload(), {})
+
+
+    def test_validar_camara(self):
+        """Prueba que se reporten las llaves faltantes y los tipos incorrectos."""
+        errors = validate_camera_config("2", {"url": "rtsp://mock", "clases": ["auto"]})
+
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(validate_camera_config("1", CAMERA_CONFIG["1"]), [])
+
+        # Con substream se exige la resolución del stream principal en la que está la región
+        substream = {"substream": "rtsp://mock/substream"}
+        self.assertEqual(len(validate_camera_config("1", {**CAMERA_CONFIG["1"], "capture": substream})), 1)
+        self.assertEqual(validate_camera_config("1", {**CAMERA_CONFIG["1"], "capture": {**substream, "source_wh": [1920, 1080]}}), [])
+
+
+
+    def test_actualizar_camara(self):
+        """Prueba que la actualización valide los cambios y conserve las demás llaves y cámaras."""
+        # Arrange
+        self.write({**CAMERA_CONFIG, "2": {**CAMERA_CONFIG["1"], "nombre": "otra"}})
+        registry = CameraConfigRegistry(self.path)
+
+        # Act
+        camera_config = update_camera_config("1", {"weights": "weights/otro.pt", "size": 640, "backend": "onnx"}, path=self.path)
+        with self.assertRaises(ValueError):
+            update_camera_config("1", {"backend": "tensorrt"}, path=self.path)
+
+        # Assert
+        self.assertEqual(camera_config["region"], CAMERA_CONFIG["1"]["region"])
+        self.assertEqual(registry.reload(), {"1": ["backend", "size", "weights"]})
+        self.assertEqual(registry.get("1")["backend"], "onnx")
+        self.assertEqual(registry.get("2")["nombre"], "otra")
+        self.assertEqual(list(self.path.parent.iterdir()), [self.path])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.camera_tracker import CameraTracker
+
+
+def mock_results(boxes: list) -> Results:
+    """Crea resultados de ultralytics simulados con cajas [x1, y1, x2, y2, conf, cls]."""
+    return Results(
+        orig_img=np.zeros((720, 1280, 3), dtype=np.uint8),
+        path="mock.jpg",
+        names={0: "person", 2: "car"},
+        boxes=torch.tensor(boxes, dtype=torch.float32).reshape(-1, 6) )
+
+
+class TestCameraTracker(unittest.TestCase):
+    """
+    Clase de las pruebas para el seguimiento por cámara.
+    """
+    def test_trackers_independientes(self):
+        """Prueba que cada cámara conserve su propio estado de seguimiento.
+
+        Esta prueba verifica que un objeto mantenga su ID entre cuadros y que
+        una segunda cámara no herede las trayectorias de la primera.
+        """
+        # Arrange: Inicializar un seguidor por cámara
+        tracker_cam1 = CameraTracker()
+        tracker_cam2 = CameraTracker()
+
+        # Act: Seguir el mismo objeto en dos cuadros de la cámara 1
+        first = tracker_cam1.update(mock_results([[100, 100, 200, 200, 0.9, 2]]))
+        second = tracker_cam1.update(mock_results([[104, 102, 204, 202, 0.9, 2]]))
+        other = tracker_cam2.update(mock_results([[600, 300, 700, 400, 0.9, 0]]))
+
+        # Assert: Verificar IDs persistentes por cámara
+        self.assertEqual(int(first.boxes.id[0]), int(second.boxes.id[0]))
+        self.assertEqual(len(tracker_cam2.tracker.tracked_stracks), 1)
+        self.assertEqual(other.names[int(other.boxes.cls[0])], "person")
+
+
+    def test_sin_detecciones(self):
+        """Prueba que un cuadro vacío se devuelva sin modificar."""
+        # Arrange
+        tracker = CameraTracker()
+        results = mock_results([])
+
+        # Act
+        tracked = tracker.update(results)
+
+        # Assert
+        self.assertIs(tracked, results)
+        self.assertIsNone(tracked.boxes.id)
+
+
+
+    def test_limpiar_estado(self):
+        """Prueba que limpiar el seguidor descarte los seguimientos sin reutilizar sus IDs."""
+        # Arrange: Un objeto seguido en dos cuadros
+        tracker = CameraTracker()
+        tracker.update(mock_results([[100, 100, 200, 200, 0.9, 2]]))
+        first = tracker.update(mock_results([[104, 102, 204, 202, 0.9, 2]]))
+
+        # Act
+        cleared = tracker.clear()
+        tracker.update(mock_results([[104, 102, 204, 202, 0.9, 2]]))
+        second = tracker.update(mock_results([[106, 104, 206, 204, 0.9, 2]]))
+
+        # Assert: El mismo lugar recibe un ID nuevo
+        self.assertEqual(cleared, 1)
+        self.assertGreater(int(second.boxes.id[0]), int(first.boxes.id[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
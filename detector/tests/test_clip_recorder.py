@@ -0,0 +1,93 @@
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.clip_recorder import ClipRecorder
+
+
+def make_frame(index: int) -> np.array:
+    """Cuadro de prueba con un valor distinto por índice."""
+    return np.full((360, 640, 3), (index * 10) % 256, dtype=np.uint8)
+
+
+class TestClipRecorder(unittest.TestCase):
+    """
+    Clase de las pruebas para el grabador de clips.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+
+    def test_clip_antes_y_despues(self):
+        """Prueba que el clip incluya los segundos anteriores y posteriores al evento."""
+        # Arrange: 10 FPS, clips de 1 s y un evento a los 3 s
+        recorder = ClipRecorder(self.tmp_dir.name, seconds=1.0, fps=10.0).start()
+
+        # Act
+        for index in range(60):
+            timestamp = 100.0 + index / 10
+            if index == 30:
+                recorder.trigger("evento", timestamp)
+            recorder.add(make_frame(index), timestamp)
+        recorder.stop()
+
+        # Assert: Cuadros de 102.0 a 104.0, escritos a los FPS medidos
+        capture = cv2.VideoCapture(os.path.join(self.tmp_dir.name, "evento.avi"))
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        capture.release()
+        self.assertEqual(frames, 21)
+        self.assertAlmostEqual(fps, 10.0, delta=0.5)
+        self.assertEqual(recorder.stats()["written"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir.name, "evento.tmp.avi")))
+
+
+    def test_buffer_acotado(self):
+        """Prueba que el buffer guarde solo cuadros comprimidos de los últimos segundos y limite los FPS."""
+        # Arrange
+        recorder = ClipRecorder(self.tmp_dir.name, seconds=2.0, fps=5.0)
+
+        # Act: 30 FPS durante 10 s
+        for index in range(300):
+            recorder.add(make_frame(index), 100.0 + index / 30)
+
+        # Assert: Cerca de 2 s a 5 FPS, muy por debajo del tamaño de los cuadros sin comprimir
+        stats = recorder.stats()
+        self.assertLessEqual(stats["buffer_frames"], 11)
+        self.assertLess(stats["buffer_bytes"], stats["buffer_frames"] * make_frame(0).nbytes / 10)
+
+
+    def test_escritura_no_detiene(self):
+        """Prueba que una escritura lenta no detenga la entrada de cuadros ni de eventos."""
+        # Arrange: Un escritor que tarda 1 s por clip y una cola de un clip
+        recorder = ClipRecorder(self.tmp_dir.name, seconds=0.2, fps=10.0, max_pending=1)
+        recorder.write = mock.Mock(side_effect=lambda clip: time.sleep(1.0))
+        recorder.start()
+
+        # Act: Cinco eventos seguidos que se completan mientras el escritor está ocupado
+        time_start = time.perf_counter()
+        for index in range(40):
+            timestamp = 100.0 + index / 10
+            if index % 6 == 3:
+                recorder.trigger(f"evento-{index}", timestamp)
+            recorder.add(make_frame(index), timestamp)
+        add_time = time.perf_counter() - time_start
+        stats = recorder.stats()
+        recorder.stop(timeout=5.0)
+
+        # Assert: Los clips que no caben en la cola se descartan en lugar de esperar
+        self.assertLess(add_time, 0.5)
+        self.assertGreater(stats["dropped"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
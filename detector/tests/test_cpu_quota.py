@@ -0,0 +1,87 @@
+import unittest
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools import cpu_quota
+
+
+class TestCpuQuota(unittest.TestCase):
+    """
+    Clase de las pruebas para la lectura de la cuota de CPU del contenedor.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = Path(self.tmp_dir.name)
+
+
+    def patch_paths(self, cpu_max: Path, cpu_dirs: tuple):
+        patchers = [
+            mock.patch.object(cpu_quota, "CGROUP_V2_CPU_MAX", cpu_max),
+            mock.patch.object(cpu_quota, "CGROUP_V1_CPU_DIRS", cpu_dirs) ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+    def test_cgroup_v2(self):
+        """Prueba la cuota de cgroup v2, con y sin límite."""
+        # Arrange
+        cpu_max = self.root.joinpath("cpu.max")
+        self.patch_paths(cpu_max, ())
+
+        # Act
+        cpu_max.write_text("150000 100000\n")
+        limited = cpu_quota.cpu_quota()
+        cpu_max.write_text("max 100000\n")
+        unlimited = cpu_quota.cpu_quota()
+
+        # Assert
+        self.assertEqual(limited, 1.5)
+        self.assertIsNone(unlimited)
+
+
+    def test_cgroup_v1(self):
+        """Prueba la cuota de cgroup v1 cuando no existe cpu.max."""
+        # Arrange
+        cpu_dir = self.root.joinpath("cpu")
+        cpu_dir.mkdir()
+        cpu_dir.joinpath("cpu.cfs_quota_us").write_text("50000\n")
+        cpu_dir.joinpath("cpu.cfs_period_us").write_text("100000\n")
+        self.patch_paths(self.root.joinpath("no-existe"), (self.root.joinpath("otro"), cpu_dir))
+
+        # Act
+        quota = cpu_quota.cpu_quota()
+
+        # Assert
+        self.assertEqual(quota, 0.5)
+
+
+    def test_hilos_segun_cuota(self):
+        """Prueba que los hilos usen la parte entera de la cuota, con mínimo 1."""
+        # Arrange
+        self.patch_paths(self.root.joinpath("cpu.max"), ())
+        self.root.joinpath("cpu.max").write_text("150000 100000\n")
+
+        # Act
+        with mock.patch("torch.set_num_threads") as set_num_threads, \
+             mock.patch("torch.set_num_interop_threads"), \
+             mock.patch.object(cpu_quota.cv2, "setNumThreads") as set_cv2_threads, \
+             mock.patch.dict(os.environ, {"OPENCV_FFMPEG_CAPTURE_OPTIONS": "rtsp_transport;tcp"}):
+            settings = cpu_quota.configure_threads()
+            capture_options = os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"]
+
+        # Assert
+        self.assertEqual(settings["threads"], 1)
+        set_num_threads.assert_called_once_with(1)
+        set_cv2_threads.assert_called_once_with(1)
+        self.assertEqual(capture_options, "rtsp_transport;tcp|threads;1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import functools
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.frame_pool import FramePool
+from modules.video_stream import LatestFrameStream
+from tools.ffmpeg_capture import FFmpegCapture, output_resolution, parse_header, scale_filter
+from tools.video_info import VideoInfo
+
+
+# Encabezado de FFmpeg 7 para un video de 1920 x 1080 a 25 FPS de 0.48 s, con {width} x {height} de salida
+FFMPEG_HEADER = """Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'camara.mp4':
+  Metadata:
+    major_brand     : isom
+  Duration: 00:00:00.48, start: 0.000000, bitrate: 338 kb/s
+  Stream #0:0[0x1](und): Video: h264 (High) (avc1 / 0x31637661), yuv420p(progressive), 1920x1080 [SAR 1:1 DAR 16:9], 321 kb/s, 25 fps, 25 tbr, 12800 tbn (default)
+Stream mapping:
+  Stream #0:0 -> #0:0 (h264 (native) -> rawvideo (native))
+Output #0, rawvideo, to 'pipe:1':
+  Stream #0:0(und): Video: rawvideo (BGR[24] / 0x18524742), bgr24(pc, gbr/unknown/unknown, progressive), {width}x{height} [SAR 1:1 DAR 16:9], q=2-31, 138240 kb/s, 25 fps, 25 tbn (default)
+"""
+
+# Sustituto de ffmpeg: escribe el encabezado en stderr y entrega 12 cuadros BGR crudos,
+# reducidos como el filtro de -vf, con el índice del cuadro como valor
+FAKE_FFMPEG = """
+import re
+import sys
+arguments = sys.argv[1:]
+width, height = 1920, 1080
+if "-vf" in arguments:
+    max_size = int(re.search(r"lte\\(max\\(iw\\\\,ih\\)\\\\,(\\d+)\\)", arguments[arguments.index("-vf") + 1]).group(1))
+    if max(width, height) > max_size:
+        width, height = (max(2, side * max_size // max(width, height) // 2 * 2) for side in (width, height))
+with open(sys.argv[0] + ".args", "w") as f:
+    f.write(" ".join(arguments))
+sys.stderr.write(HEADER.format(width=width, height=height))
+sys.stderr.flush()
+for index in range(12):
+    sys.stdout.buffer.write(bytes([index]) * (width * height * 3))
+"""
+
+
+def fake_executable(folder: str, name: str, code: str) -> str:
+    """Crea un script ejecutable con el intérprete actual."""
+    path = os.path.join(folder, name)
+    with open(path, "w") as f:
+        f.write(f"#!{sys.executable}\n{code}")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+class TestFFmpegCapture(unittest.TestCase):
+    """
+    Clase de las pruebas para la captura con FFmpeg.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.ffmpeg = fake_executable(cls.tmp_dir.name, "ffmpeg", f"HEADER = {FFMPEG_HEADER!r}\n{FAKE_FFMPEG}")
+
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+
+    def test_resolucion_de_salida(self):
+        """Prueba que la reducción conserve la proporción con lados pares y no amplíe."""
+        self.assertEqual(output_resolution((1920, 1080), 1280), (1280, 720))
+        self.assertEqual(output_resolution((2560, 1440), 1000), (1000, 562))
+        self.assertEqual(output_resolution((640, 480), 1280), (640, 480))
+        self.assertEqual(output_resolution((1920, 1080), None), (1920, 1080))
+
+
+    def test_encabezado(self):
+        """Prueba que la resolución de entrada y de salida, los FPS y la duración se lean del encabezado de FFmpeg."""
+        # Act
+        stream = parse_header(FFMPEG_HEADER.format(width=640, height=360).splitlines(keepends=True))
+        incomplete = parse_header(FFMPEG_HEADER.splitlines(keepends=True)[:5])
+
+        # Assert
+        self.assertEqual(stream, {"source_wh": (1920, 1080), "output_wh": (640, 360), "fps": 25.0, "duration": 0.48})
+        self.assertIsNone(incomplete)
+
+
+    @unittest.skipIf(shutil.which("ffmpeg") is None, "FFmpeg no está instalado")
+    def test_filtro_de_escala(self):
+        """Prueba con FFmpeg que el filtro de escala dé la misma resolución que output_resolution."""
+        for source_wh, max_size in [((1920, 1080), 640), ((2560, 1440), 1000), ((640, 480), 1280), ((333, 199), 200)]:
+            # Act
+            result = subprocess.run(
+                ["ffmpeg", "-hide_banner", "-f", "lavfi", "-i", f"testsrc=size={source_wh[0]}x{source_wh[1]}:rate=1",
+                 "-frames:v", "1", "-vf", scale_filter(max_size), "-pix_fmt", "bgr24", "-f", "rawvideo", "-y", os.devnull],
+                capture_output=True, check=True )
+
+            # Assert
+            stream = parse_header(result.stderr.decode().splitlines(keepends=True))
+            self.assertEqual(stream["output_wh"], output_resolution(source_wh, max_size))
+
+
+    def test_lectura_en_buffer(self):
+        """Prueba que los cuadros se lean reducidos y escritos en el mismo buffer."""
+        # Arrange
+        capture = FFmpegCapture("camara.mp4", max_size=640, ffmpeg=self.ffmpeg)
+        buffer = FramePool.from_resolution((640, 360), size=1).acquire()
+
+        # Act
+        values = []
+        while True:
+            success, frame = capture.read(buffer)
+            if not success:
+                break
+            self.assertIs(frame, buffer)
+            values.append(int(frame[0, 0, 0]))
+
+        # Assert: La escala se pidió a FFmpeg y la captura se cierra al terminar
+        with open(self.ffmpeg + ".args") as f:
+            arguments = f.read()
+        self.assertIn(scale_filter(640), arguments)
+        self.assertIn("-pix_fmt bgr24", arguments)
+        self.assertEqual(values, list(range(12)))
+        self.assertEqual(capture.source_wh, (1920, 1080))
+        self.assertEqual(capture.output_wh, (640, 360))
+        self.assertEqual(capture.frame_count, 12)
+        self.assertFalse(capture.isOpened())
+
+
+    def test_video_info_y_transmision(self):
+        """Prueba VideoInfo y LatestFrameStream con el backend FFmpeg y la región en coordenadas de la cámara."""
+        # Arrange
+        options = {"backend": "ffmpeg", "max_size": 960}
+        fake_capture = functools.partial(FFmpegCapture, ffmpeg=self.ffmpeg)
+
+        # Act
+        with mock.patch("tools.video_info.FFmpegCapture", fake_capture):
+            source_info = VideoInfo("camara.mp4", keep_open=True, capture_options=options)
+            pool = FramePool.from_resolution(source_info.resolution_wh, size=3)
+            video_stream = LatestFrameStream("camara.mp4", frame_pool=pool, drop_frames=False, capture=source_info.capture, capture_options=options).start()
+            frames = 0
+            while video_stream.more():
+                frame = video_stream.read()
+                if frame is None:
+                    continue
+                self.assertEqual(frame.shape, (540, 960, 3))
+                frames += 1
+                video_stream.release(frame)
+            video_stream.stop()
+
+        # Assert
+        self.assertEqual(source_info.resolution_wh, (960, 540))
+        self.assertEqual(source_info.total_frames, 12)
+        self.assertEqual(source_info.scale_polygon([[1920, 1080], [960, 0]]), [[960, 540], [480, 0]])
+        self.assertEqual(frames, 12)
+        self.assertLessEqual(pool.allocated, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.frame_pool import FramePool
+
+
+class TestFramePool(unittest.TestCase):
+    """
+    Clase de las pruebas para el pool de buffers de cuadros.
+    """
+    def test_reutiliza_buffers(self):
+        """Prueba que los buffers liberados se reutilicen sin nuevas asignaciones."""
+        # Arrange
+        pool = FramePool.from_resolution((64, 48), size=2)
+        image = np.full((48, 64, 3), 7, dtype=np.uint8)
+
+        # Act: Copiar y liberar varios cuadros
+        buffers = set()
+        for _ in range(10):
+            buffer = pool.copy(image)
+            buffers.add(id(buffer))
+            pool.release(buffer)
+
+        # Assert
+        np.testing.assert_array_equal(buffer, image)
+        self.assertEqual(len(buffers), 1)
+        self.assertEqual(pool.allocated, 2)
+        self.assertEqual(pool.misses, 0)
+
+
+    def test_pool_agotado(self):
+        """Prueba que el pool crezca cuando se agota y se ignoren arreglos ajenos."""
+        # Arrange
+        pool = FramePool(shape=(4, 4, 3), size=1)
+
+        # Act
+        first = pool.acquire()
+        second = pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        pool.release(np.zeros((4, 4, 3), dtype=np.uint8))
+        mismatched = pool.copy(np.zeros((8, 8, 3), dtype=np.uint8))
+
+        # Assert
+        self.assertEqual(pool.allocated, 2)
+        self.assertEqual(pool.available, 2)
+        self.assertEqual(pool.misses, 2)
+        self.assertEqual(mismatched.shape, (8, 8, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
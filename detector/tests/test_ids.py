@@ -0,0 +1,106 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.ids import IdGenerator, make_id, parse_id, time_range
+from common import detection_ids
+
+
+class TestIds(unittest.TestCase):
+    """
+    Clase de las pruebas para los IDs de detección.
+    """
+    def test_orden_por_tiempo(self):
+        """Prueba que el orden lexicográfico de los IDs sea el orden de su hora."""
+        # Arrange: Horas desordenadas, con cámaras y objetos de distinto largo
+        times = [1747769415.5, 1747769415.001, 1700000000.0, 1747769500.25, 1747769415.002]
+        ids = [make_id(seconds, camera_id, track_id) for seconds, camera_id, track_id in zip(times, ["12", "1", "3", "1", "2"], [1, 40000, 7, 2, 99])]
+
+        # Act
+        ordered = sorted(ids)
+
+        # Assert
+        self.assertEqual([parse_id(detection_id)[0] for detection_id in ordered], sorted(times))
+
+
+    def test_camaras_en_el_mismo_segundo(self):
+        """Prueba que dos cámaras iniciadas en el mismo instante no generen IDs repetidos."""
+        first_camera = IdGenerator("1")
+        second_camera = IdGenerator("2")
+
+        first_ids = {first_camera.track(track_id, start=1747769415.0) for track_id in range(1, 50)}
+        second_ids = {second_camera.track(track_id, start=1747769415.0) for track_id in range(1, 50)}
+
+        self.assertEqual(len(first_ids | second_ids), 98)
+
+
+    def test_id_estable_por_objeto(self):
+        """Prueba que un objeto conserve su ID hasta terminar y que el tiempo no retroceda."""
+        # Arrange
+        generator = IdGenerator("1")
+
+        # Act
+        first = generator.track(5, start=1747769415.0)
+        again = generator.track(5, start=1747769999.0)
+        generator.end(5)
+        reused = generator.track(5, start=1747769000.0)
+
+        # Assert: El ID de seguimiento reutilizado recibe un ID nuevo, sin retroceder en el tiempo
+        self.assertEqual(first, again)
+        self.assertNotEqual(first, reused)
+        self.assertGreaterEqual(reused, first)
+
+
+    def test_imagenes_crecientes(self):
+        """Prueba que los IDs de imagen sean estrictamente crecientes aunque el reloj se repita o retroceda."""
+        generator = IdGenerator("1")
+
+        ids = [generator.image(seconds) for seconds in (100.0, 100.0, 99.0, 100.0005)]
+
+        self.assertEqual(ids, sorted(set(ids)))
+
+
+    def test_rango_de_tiempo(self):
+        """Prueba que los límites del rango incluyan solo los IDs de la hora pedida."""
+        # Arrange
+        ids = sorted(make_id(seconds, "1", 3) for seconds in (99.999, 100.0, 150.0, 199.999, 200.0))
+
+        # Act
+        lower, upper = time_range(100.0, 200.0)
+
+        # Assert
+        self.assertEqual([parse_id(detection_id)[0] for detection_id in ids if lower <= detection_id < upper], [100.0, 150.0, 199.999])
+
+
+
+    def test_formato_compartido_con_el_procesador(self):
+        """Prueba que el procesador encuentre por hora los registros con los IDs que genera el detector."""
+        # Arrange: Módulo de IDs del procesador, cargado desde su carpeta
+        module_path = Path(__file__).resolve().parents[2].joinpath("processor", "validators", "detection_ids.py")
+        spec = importlib.util.spec_from_file_location("processor_detection_ids", module_path)
+        processor_ids = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(processor_ids)
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        generator = IdGenerator("7")
+        for seconds in (99.999, 100.0, 150.0, 199.999, 200.0):
+            Path(tmp_dir.name).joinpath(f"{generator.track(int(seconds * 1000), start=seconds)}.json").write_text("{}")
+        Path(tmp_dir.name).joinpath("1747769415_3.json").write_text("{}")
+
+        # Act
+        records = processor_ids.records_between(100.0, 200.0, tmp_dir.name)
+
+        # Assert: Un solo formato para el detector y el procesador
+        self.assertIs(processor_ids.time_range, detection_ids.time_range)
+        self.assertIs(time_range, detection_ids.time_range)
+        self.assertEqual([parse_id(path.stem)[0] for path in records], [100.0, 150.0, 199.999])
+
+
+if __name__ == "__main__":
+    unittest.main()
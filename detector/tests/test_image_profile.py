@@ -0,0 +1,78 @@
+import base64
+import unittest
+import cv2
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.image_profile import ImageProfile, DEFAULT_SCALE, encode_jpeg
+from modules.region import RegionOfInterest
+
+
+REGION = [[570, 120], [930, 120], [1240, 530], [540, 530]]
+
+
+class TestImageProfile(unittest.TestCase):
+    """
+    Clase de las pruebas para los perfiles de imagen de evidencia.
+    """
+    def test_perfil_por_defecto(self):
+        """Prueba que sin configuración se conserve la imagen completa a la mitad del tamaño."""
+        profile = ImageProfile.from_config(None, (1280, 720))
+
+        self.assertEqual(profile.box, (0, 0, 1280, 720))
+        self.assertEqual(profile.scale, DEFAULT_SCALE)
+        self.assertEqual(profile.output_wh, (640, 360))
+
+
+    def test_recorte_de_region(self):
+        """Prueba que el recorte "region" use el rectángulo de la región y limite el lado mayor."""
+        # Arrange
+        region = RegionOfInterest(polygon=REGION, resolution_wh=(1280, 720))
+
+        # Act
+        profile = ImageProfile.from_config({"crop": "region", "max_size": 350, "quality": 80}, (1280, 720), region)
+
+        # Assert: El recorte de 701 x 411 se reduce a 350 de ancho
+        self.assertEqual(profile.box, (region.x, region.y, region.width, region.height))
+        self.assertEqual(profile.output_wh[0], 350)
+        self.assertEqual(profile.quality, 80)
+
+
+    def test_miniatura(self):
+        """Prueba que la miniatura quede dentro del cuadro y no supere el lado configurado."""
+        # Arrange
+        profile = ImageProfile(thumbnail=64)
+        frame = np.full((720, 1280, 3), 128, dtype=np.uint8)
+
+        # Act: Caja junto al borde, con el margen fuera del cuadro
+        thumbnail = profile.encode_thumbnail(frame, np.array([1180, 600, 1280, 720]))
+        outside = profile.encode_thumbnail(frame, np.array([1300, 800, 1400, 900]))
+
+        # Assert
+        image = cv2.imdecode(np.frombuffer(base64.b64decode(thumbnail), dtype=np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(max(image.shape[:2]), 64)
+        self.assertIsNone(outside)
+
+
+    def test_recorte_no_valido(self):
+        """Prueba que un recorte desconocido se rechace."""
+        with self.assertRaises(ValueError):
+            ImageProfile(crop="objeto")
+
+
+    def test_codificar_jpeg(self):
+        """Prueba que la imagen codificada conserve su tamaño y colores."""
+        image = np.zeros((48, 64, 3), dtype=np.uint8)
+        image[:, :, 2] = 200
+
+        decoded = cv2.imdecode(np.frombuffer(encode_jpeg(image, quality=90), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+        self.assertEqual(decoded.shape, image.shape)
+        self.assertTrue(np.allclose(decoded, image, atol=8))
+
+
+if __name__ == "__main__":
+    unittest.main()
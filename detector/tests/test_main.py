@@ -1,6 +1,7 @@
 import json
 import unittest
 import datetime
+from unittest import mock
 import numpy as np
 import supervision as sv
 
@@ -10,6 +11,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import get_current_timestamp
 from modules.save_results import SaveResults
+from modules.image_profile import ImageProfile
+from tools.ids import IdGenerator, make_id
 
 
 class TestDetectorController(unittest.TestCase):
@@ -17,6 +20,7 @@ class TestDetectorController(unittest.TestCase):
     Clase de las pruebas para el detector controller.
 .
     """
+    @mock.patch("modules.image_profile.simplejpeg", None)
     def test_codificar_imagen(self):
         """Prueba que la función codificar_imagen codifique correctamente una imagen.
             
@@ -41,45 +45,124 @@ class TestDetectorController(unittest.TestCase):
 
     def test_convertir_json(self):
         """
-        Prueba que la función convertir_json envíe un mensaje de detección correctamente.
+        Prueba que la función convertir_json construya un solo mensaje por cuadro.
 
-        Esta prueba simula el envío de un mensaje de detección y verifica que se haya enviado correctamente.
+        Esta prueba simula las detecciones de un cuadro y verifica que todas
+        compartan una sola imagen codificada en el mensaje.
         """
 
         mock_save_results = SaveResults(
             camera_id="1" )
 
-        mock_image = "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAIBAQEBAQIBAQECAgICAgQDAgICAgUEBAMEBgUGBgYFBgYGBwkIBgcJBwYGCAsICQoKCgoKBggLDAsKDAkKCgr/2wBDAQICAgICAgUDAwUKBwYHCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgr/wAARCADwAUADASIAAhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVWV1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJBUQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq8vP09fb3+Pn6/9oADAMBAAIRAxEAPwD8A6KKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooA//Z"
-    
-        # Arrange: Crear detecciones simuladas
-        mock_detections = (
-            np.array([[299.3, 119.32, 352.51, 193.09]], dtype=np.float32),
-            None,
-            0.9647200107574463,
-            2,
-            1,
-            {'class_name': 'car'})
-        
+        mock_image = "IMG"
+
+        # Arrange: Crear detecciones simuladas de un cuadro, una sin ID de seguimiento
+        mock_detections = [
+            (
+                np.array([299.3, 119.32, 352.51, 193.09], dtype=np.float32),
+                None,
+                0.9647200107574463,
+                2,
+                1,
+                {'class_name': 'car'}),
+            (
+                np.array([10.0, 10.0, 50.0, 90.0], dtype=np.float32),
+                None,
+                0.71,
+                0,
+                7,
+                {'class_name': 'person'}),
+            (
+                np.array([60.0, 10.0, 80.0, 40.0], dtype=np.float32),
+                None,
+                0.6,
+                0,
+                None,
+                {'class_name': 'person'}),
+        ]
+        mock_time = datetime.datetime(2025, 5, 20, 14, 30, 15, 123456)
+
         # Act: Ejecutar la función convertir_json
-        json_output = mock_save_results.convertir_json(
-            detection=mock_detections,
-            img_base64=mock_image )
-        
-        # Assert: Verificar que la conversión a JSON sea correcta
+        with mock.patch("modules.save_results.get_current_timestamp", return_value=mock_time):
+            json_output = mock_save_results.convertir_json(
+                detections=mock_detections,
+                img_base64=mock_image )
+
+        # Assert: Verificar que la conversión a JSON sea correcta; los IDs de la
+        # cámara se generan en orden con hora estrictamente creciente
+        expected_ids = IdGenerator("1")
+        car_id = expected_ids.track(1, mock_time.timestamp())
+        person_id = expected_ids.track(7, mock_time.timestamp())
+        image_id = expected_ids.image(mock_time.timestamp())
         expected_output = json.dumps(
             {
                 "nombre_camara": "mock_nombre",
-                "id": f"{mock_save_results.timestamp}1",
-                "confianza": 0.9647200107574463,
-                "clase": "car",
-                "tiempo": get_current_timestamp().strftime("%Y_%m_%d_%H_%M_%S.%f"),
-                "imagen": "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAIBAQEBAQIBAQECAgICAgQDAgICAgUEBAMEBgUGBgYFBgYGBwkIBgcJBwYGCAsICQoKCgoKBggLDAsKDAkKCgr/2wBDAQICAgICAgUDAwUKBwYHCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgoKCgr/wAARCADwAUADASIAAhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3ODk6Q0RFRkdISUpTVFVWV1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJBUQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq8vP09fb3+Pn6/9oADAMBAAIRAxEAPwD8A6KKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooAKKKKACiiigAooooA//Z"
+                "id_imagen": image_id,
+                "tiempo": "2025_05_20_14_30_15.123456",
+                "imagen": "IMG",
+                "detecciones": [
+                    {"id": car_id, "confianza": 0.9647200107574463, "clase": "car"},
+                    {"id": person_id, "confianza": 0.71, "clase": "person"},
+                ]
             }
         )
-        
+
         self.assertEqual(json_output, expected_output)
 
-    
+
+    def test_convertir_json_sin_seguimiento(self):
+        """Prueba que no se construya mensaje si ninguna detección tiene ID de seguimiento."""
+        mock_save_results = SaveResults(
+            camera_id="1" )
+
+        mock_detections = [(np.array([1, 2, 3, 4]), None, 0.9, 2, None, {'class_name': 'car'})]
+
+        self.assertIsNone(mock_save_results.convertir_json(detections=mock_detections, img_base64="IMG"))
+
+
+    def test_mensaje_de_eventos(self):
+        """Prueba que con eventos del registro solo se envíen los eventos y que el fin no lleve imagen."""
+        # Arrange
+        mock_save_results = SaveResults(
+            camera_id="1" )
+        mock_image = np.ones((48, 64, 3), dtype=np.uint8)
+        ended_event = {"evento": "finalizado", "tracker_id": 5, "clase": "car", "confianza": 0.9, "inicio": 1747769415.0, "duracion": 3.2, "cuadros": 80}
+
+        # Act
+        no_events = mock_save_results.build_message(sv.Detections.empty(), mock_image, events=[])
+        ended_message = json.loads(mock_save_results.build_message(sv.Detections.empty(), None, events=[ended_event]))
+
+        # Assert
+        self.assertIsNone(no_events)
+        self.assertIsNone(ended_message["imagen"])
+        self.assertEqual(ended_message["detecciones"], [
+            {"id": make_id(1747769415.0, "1", 5), "evento": "finalizado", "confianza": 0.9, "clase": "car", "duracion": 3.2, "cuadros": 80}
+        ])
+
+
+    def test_mensaje_con_miniaturas(self):
+        """Prueba que el perfil con miniaturas agregue una a cada evento de un objeto visible."""
+        # Arrange
+        mock_save_results = SaveResults(
+            camera_id="1",
+            image_profile=ImageProfile(thumbnail=32) )
+        frame = np.full((240, 320, 3), 128, dtype=np.uint8)
+        detections = sv.Detections(
+            xyxy=np.array([[100, 100, 180, 160]], dtype=np.float32),
+            confidence=np.array([0.9]),
+            class_id=np.array([2]),
+            tracker_id=np.array([5]),
+            data={"class_name": np.array(["car"])} )
+        new_event = {"evento": "nuevo", "tracker_id": 5, "clase": "car", "confianza": 0.9, "indice": 0}
+
+        # Act
+        message = json.loads(mock_save_results.build_message(detections, frame, events=[new_event], frame=frame))
+
+        # Assert
+        self.assertIsNotNone(message["imagen"])
+        self.assertTrue(message["detecciones"][0]["miniatura"])
+
+
 if __name__ == "__main__":
     unittest.main()
     
\ No newline at end of file
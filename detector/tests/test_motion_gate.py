@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import cv2
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.motion_gate import MotionGate
+
+
+def mock_frame(x: int = None) -> np.array:
+    """Crea un cuadro gris con un objeto opcional en la posición x."""
+    frame = np.full((360, 640, 3), 90, dtype=np.uint8)
+    if x is not None:
+        cv2.rectangle(frame, (x, 150), (x + 80, 220), (255, 255, 255), -1)
+    return frame
+
+
+class TestMotionGate(unittest.TestCase):
+    """
+    Clase de las pruebas para la compuerta de movimiento.
+    """
+    def test_omitir_cuadros_estaticos(self):
+        """Prueba que una escena estática se omita hasta el intervalo máximo.
+
+        Esta prueba verifica que el primer cuadro siempre se infiera y que
+        con max_skip=4 se infiera uno de cada cinco cuadros estáticos.
+        """
+        # Arrange
+        motion_gate = MotionGate(max_skip=4)
+
+        # Act
+        decisions = [motion_gate.update(mock_frame()) for _ in range(11)]
+
+        # Assert
+        self.assertEqual(decisions, [True, False, False, False, False, True, False, False, False, False, True])
+        self.assertEqual(motion_gate.skipped, 8)
+        self.assertAlmostEqual(motion_gate.inference_rate, 3 / 11)
+
+
+    def test_inferir_con_movimiento(self):
+        """Prueba que un objeto en movimiento active la inferencia en cada cuadro."""
+        # Arrange
+        motion_gate = MotionGate(max_skip=100)
+        motion_gate.update(mock_frame())
+
+        # Act
+        decisions = [motion_gate.update(mock_frame(x=40 * i)) for i in range(1, 10)]
+
+        # Assert
+        self.assertTrue(all(decisions))
+        self.assertGreater(motion_gate.score, motion_gate.threshold)
+
+
+    def test_movimiento_lento_acumulado(self):
+        """Prueba que un movimiento lento se detecte al compararlo con el último cuadro inferido."""
+        # Arrange: El objeto avanza un píxel por cuadro
+        motion_gate = MotionGate(threshold=0.01, max_skip=100)
+        motion_gate.update(mock_frame(x=100))
+
+        # Act
+        decisions = [motion_gate.update(mock_frame(x=100 + i)) for i in range(1, 40)]
+
+        # Assert: Se omiten algunos cuadros, pero el desplazamiento acumulado dispara la inferencia
+        self.assertIn(False, decisions)
+        self.assertIn(True, decisions)
+
+
+if __name__ == "__main__":
+    unittest.main()
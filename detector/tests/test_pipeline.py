@@ -0,0 +1,133 @@
+import unittest
+import threading
+import time
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.pipeline import BoundedQueue, Stage
+
+
+class TestPipeline(unittest.TestCase):
+    """
+    Clase de las pruebas para las etapas del procesamiento.
+    """
+    def test_descartar_mas_antiguo(self):
+        """Prueba que la política drop-oldest descarte el elemento más antiguo y lo notifique."""
+        # Arrange
+        dropped = []
+        queue = BoundedQueue(maxsize=2, overflow="drop-oldest", on_drop=dropped.append)
+
+        # Act
+        for item in range(5):
+            queue.put(item)
+
+        # Assert
+        self.assertEqual(dropped, [0, 1, 2])
+        self.assertEqual(queue.dropped, 3)
+        self.assertEqual([queue.get(timeout=0), queue.get(timeout=0)], [3, 4])
+
+
+    def test_conservar_eventos(self):
+        """Prueba que drop-oldest nunca descarte los cuadros con eventos, aunque la cola esté llena."""
+        # Arrange
+        dropped = []
+        queue = BoundedQueue(maxsize=2, overflow="drop-oldest", on_drop=dropped.append, keep=lambda item: bool(item["events"]))
+        new_event = {"frame": 0, "events": [{"evento": "nuevo", "tracker_id": 7}]}
+
+        # Act: El cuadro con el evento nuevo seguido de cuadros sin eventos, y una cola llena solo de eventos
+        queue.put(new_event)
+        for frame in range(1, 6):
+            queue.put({"frame": frame, "events": []})
+        items = [queue.get(timeout=0), queue.get(timeout=0)]
+
+        events_queue = BoundedQueue(maxsize=1, overflow="drop-oldest", keep=lambda item: bool(item["events"]))
+        events_queue.put(new_event)
+        events_queue.put({"frame": 1, "events": [{"evento": "fin", "tracker_id": 7}]})
+        events_queue.put({"frame": 2, "events": []})
+
+        # Assert
+        self.assertEqual(items, [new_event, {"frame": 5, "events": []}])
+        self.assertEqual([item["frame"] for item in dropped], [1, 2, 3, 4])
+        self.assertEqual(events_queue.qsize(), 2)
+        self.assertEqual(events_queue.dropped, 1)
+
+
+    def test_bloquear(self):
+        """Prueba que la política block espere hasta que haya espacio."""
+        # Arrange
+        queue = BoundedQueue(maxsize=1, overflow="block")
+        queue.put("a")
+        producer = threading.Thread(target=queue.put, args=("b",))
+
+        # Act
+        producer.start()
+        time.sleep(0.05)
+        blocked = producer.is_alive()
+        first = queue.get(timeout=1)
+        producer.join(timeout=1)
+
+        # Assert
+        self.assertTrue(blocked)
+        self.assertEqual((first, queue.get(timeout=1)), ("a", "b"))
+
+
+    def test_etapas_encadenadas(self):
+        """Prueba que las etapas procesen en orden y que stop termine los pendientes."""
+        # Arrange
+        results = []
+        input_queue = BoundedQueue(maxsize=4)
+        middle_queue = BoundedQueue(maxsize=4)
+        double = Stage("doble", lambda item: 2 * item, input_queue, middle_queue).start()
+        collect = Stage("recolectar", results.append, middle_queue).start()
+
+        # Act
+        for item in range(10):
+            input_queue.put(item)
+        double.stop()
+        collect.stop()
+
+        # Assert
+        self.assertEqual(results, [2 * item for item in range(10)])
+        self.assertEqual(double.stats()["processed"], 10)
+        self.assertFalse(input_queue.put(99))
+
+
+    def test_cambio_en_el_hilo_de_la_etapa(self):
+        """Prueba que `submit` aplique un cambio de estado en el hilo de la etapa, entre
+        los elementos ya encolados y los siguientes, sin descartarse con la cola llena."""
+        # Arrange: La etapa lee un estado compartido, como el recorte del anotador
+        state = {"crop": "completo"}
+        results, threads = [], []
+        input_queue = BoundedQueue(maxsize=2, overflow="drop-oldest")
+        stage = Stage("anotar", lambda item: results.append((item, state["crop"])), input_queue)
+
+        def configure() -> None:
+            threads.append(threading.current_thread().name)
+            state["crop"] = "region"
+
+        # Act: Con la etapa detenida, el cambio queda entre el cuadro 0 y los siguientes
+        input_queue.put(0)
+        stage.submit(configure)
+        for item in range(1, 4):
+            input_queue.put(item)
+        stage.start()
+        stage.stop()
+
+        # Assert: Se descartan cuadros, pero no el cambio, que se aplica en el hilo de la etapa
+        self.assertEqual(results, [(3, "region")])
+        self.assertEqual(input_queue.dropped, 3)
+        self.assertEqual(threads, ["etapa-anotar"])
+        self.assertEqual(stage.stats()["processed"], 1)
+        self.assertFalse(stage.submit(configure))
+
+
+    def test_politica_no_valida(self):
+        """Prueba que una política desconocida se rechace."""
+        with self.assertRaises(ValueError):
+            BoundedQueue(overflow="drop-newest")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import tempfile
+import time
+import unittest
+
+import redis
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.publisher import RedisPublisher
+from modules.spool import DiskSpool
+
+
+class MockPipeline:
+    """Pipeline de MockRedis: acumula los comandos y los aplica en `execute`."""
+    def __init__(self, client: "MockRedis") -> None:
+        self.client = client
+        self.commands = []
+
+    def lpush(self, name: str, *values) -> "MockPipeline":
+        self.commands.append((name, values))
+        return self
+
+    def execute(self) -> list:
+        time.sleep(self.client.latency)
+        if self.client.down:
+            raise redis.ConnectionError("Connection refused")
+        self.client.executions.append(len(self.commands))
+        return [self.client.lpush(name, *values) for name, values in self.commands]
+
+
+class MockRedis:
+    """Redis local en memoria con latencia configurable y caída simulada."""
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.down = False
+        self.queues = {}
+        self.executions = []
+
+    def lpush(self, name: str, *values) -> int:
+        queue = self.queues.setdefault(name, [])
+        queue[:0] = reversed(values)
+        return len(queue)
+
+    def pipeline(self, transaction: bool = True) -> MockPipeline:
+        return MockPipeline(self)
+
+
+class TestRedisPublisher(unittest.TestCase):
+    """
+    Clase de las pruebas para el publicador de Redis en segundo plano.
+    """
+    def test_envio_en_lotes(self):
+        """Prueba que los mensajes pendientes se envíen en un solo pipeline y en el orden de LPUSH."""
+        # Arrange: Mensajes encolados antes de iniciar el hilo, a dos colas
+        client = MockRedis()
+        publisher = RedisPublisher(client=client, batch_size=32)
+        for index in range(10):
+            publisher.publish(f"m{index}")
+        publisher.publish("otro", queue="otra_cola")
+
+        # Act
+        publisher.start()
+        publisher.stop()
+
+        # Assert: Un solo viaje con un LPUSH por cola; el más reciente queda a la cabeza
+        self.assertEqual(client.executions, [2])
+        self.assertEqual(client.queues["detections_queue"], [f"m{index}" for index in reversed(range(10))])
+        self.assertEqual(client.queues["otra_cola"], ["otro"])
+        self.assertEqual(publisher.stats()["published"], 11)
+        self.assertEqual(publisher.stats()["batches"], 1)
+
+
+    def test_publicar_sin_esperar(self):
+        """Prueba que publicar no espere la latencia de Redis y que la cola refleje los pendientes."""
+        # Arrange
+        client = MockRedis(latency=0.2)
+        publisher = RedisPublisher(client=client, batch_size=2).start()
+
+        # Act
+        time_start = time.perf_counter()
+        for index in range(6):
+            publisher.publish(f"m{index}")
+        publish_time = time.perf_counter() - time_start
+        depth = publisher.stats()["depth"]
+        publisher.stop()
+
+        # Assert
+        self.assertLess(publish_time, 0.1)
+        self.assertGreater(depth, 0)
+        self.assertEqual(len(client.queues["detections_queue"]), 6)
+        self.assertGreaterEqual(publisher.stats()["latency_ms_p50"], 200)
+
+
+    def test_redis_caido(self):
+        """Prueba que un error de conexión cuente los mensajes perdidos sin detener el publicador."""
+        # Arrange
+        client = MockRedis()
+        client.down = True
+        publisher = RedisPublisher(client=client).start()
+
+        # Act: Un mensaje con Redis caído y otro después de recuperarse
+        publisher.publish("perdido")
+        while publisher.stats()["failed"] == 0:
+            time.sleep(0.01)
+        client.down = False
+        publisher.publish("enviado")
+        publisher.stop()
+
+        # Assert
+        self.assertEqual(publisher.stats()["failed"], 1)
+        self.assertEqual(client.queues["detections_queue"], ["enviado"])
+
+
+    def test_spool_durante_caida(self):
+        """Prueba que con Redis caído los mensajes vayan al spool y se reenvíen en orden al recuperarse."""
+        # Arrange
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        client = MockRedis()
+        client.down = True
+        spool = DiskSpool(os.path.join(tmp_dir.name, "spool"))
+        publisher = RedisPublisher(client=client, batch_size=4, spool=spool, drain_rate=1000).start()
+
+        # Act: Un mensaje que falla al enviarse, dos que se anexan detrás de él y la recuperación de Redis
+        publisher.publish("m0")
+        while spool.pending < 1:
+            time.sleep(0.01)
+        publisher.publish("m1")
+        publisher.publish("m2")
+        while spool.pending < 3:
+            time.sleep(0.01)
+        client.down = False
+        publisher._retry_at = 0.0
+        while spool.pending > 0:
+            time.sleep(0.01)
+        publisher.publish("m3")
+        publisher.stop()
+
+        # Assert: Nada se pierde y el orden de LPUSH se conserva
+        self.assertEqual(client.queues["detections_queue"], ["m3", "m2", "m1", "m0"])
+        self.assertEqual(publisher.stats()["failed"], 0)
+        self.assertEqual(publisher.stats()["spool"]["drained"], 3)
+
+
+
+    def test_cola_llena_al_spool(self):
+        """Prueba que con la cola llena los mensajes más antiguos pasen al spool y el evento nuevo llegue a Redis."""
+        # Arrange: Publicador sin iniciar, con capacidad para dos mensajes
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        client = MockRedis()
+        spool = DiskSpool(os.path.join(tmp_dir.name, "spool"))
+        publisher = RedisPublisher(client=client, maxsize=2, overflow="drop-oldest", spool=spool, drain_rate=1000)
+
+        # Act
+        publisher.publish('{"evento": "nuevo"}')
+        for index in range(4):
+            publisher.publish(f'{{"evento": "actualizado", "cuadro": {index}}}')
+        spilled = publisher.stats()["spilled"]
+        publisher.start()
+        while spool.pending > 0 or publisher.queue.qsize() > 0:
+            time.sleep(0.01)
+        publisher.stop()
+
+        # Assert: Nada se descarta y el orden de LPUSH se conserva
+        self.assertEqual(spilled, 3)
+        self.assertEqual(publisher.stats()["dropped"], 0)
+        self.assertEqual(client.queues["detections_queue"][-1], '{"evento": "nuevo"}')
+        self.assertEqual(len(client.queues["detections_queue"]), 5)
+
+if __name__ == "__main__":
+    unittest.main()
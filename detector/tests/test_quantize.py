@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quantize
+from modules.model_loader import export_path
+from quantize import mean_average_precision, split
+
+
+def reference(*detections) -> tuple:
+    """Cajas y clases de referencia de una imagen a partir de tuplas (x1, y1, x2, y2, clase)."""
+    values = np.array(detections, dtype=float).reshape(-1, 5)
+    return values[:, :4], values[:, 4].astype(int)
+
+
+def prediction(*detections) -> tuple:
+    """Cajas, clases y confianzas de una imagen a partir de tuplas (x1, y1, x2, y2, clase, confianza)."""
+    values = np.array(detections, dtype=float).reshape(-1, 6)
+    return values[:, :4], values[:, 4].astype(int), values[:, 5]
+
+
+class TestQuantize(unittest.TestCase):
+    """
+    Clase de las pruebas para la validación del modelo INT8 contra el FP32.
+    """
+    def test_map_contra_referencia(self):
+        """Prueba el mAP de predicciones iguales, con falsos positivos y con objetos perdidos."""
+        # Arrange
+        ground_truth = [reference((0, 0, 10, 10, 0), (20, 20, 40, 40, 3)), reference()]
+        same = [prediction((0, 0, 10, 10, 0, 0.9), (20, 20, 40, 40, 3, 0.8)), prediction()]
+        low_false_positive = [prediction((0, 0, 10, 10, 0, 0.9), (20, 20, 40, 40, 3, 0.8)), prediction((50, 50, 60, 60, 0, 0.01))]
+        high_false_positive = [prediction((0, 0, 10, 10, 0, 0.5), (20, 20, 40, 40, 3, 0.8)), prediction((50, 50, 60, 60, 0, 0.9))]
+        shifted = [prediction((0, 0, 10, 10, 0, 0.9), (22, 22, 42, 42, 3, 0.8)), prediction()]
+
+        # Act
+        map_same = mean_average_precision(ground_truth, same)
+        map_low = mean_average_precision(ground_truth, low_false_positive)
+        map_high = mean_average_precision(ground_truth, high_false_positive)
+        map_shifted = mean_average_precision(ground_truth, shifted)
+
+        # Assert: Un falso positivo de menor confianza no afecta, uno de mayor sí
+        np.testing.assert_allclose(map_same, 1.0)
+        np.testing.assert_allclose(map_low, 1.0)
+        self.assertAlmostEqual(map_high[0], (1.0 + 0.5) / 2)
+        self.assertEqual(map_shifted[0], 1.0)
+        self.assertLess(map_shifted.mean(), 1.0)
+        self.assertTrue(np.isnan(mean_average_precision([reference()], [prediction()])).all())
+
+
+    def test_separar_y_rutas(self):
+        """Prueba la separación intercalada de validación y las rutas de los modelos INT8 de lote fijo y dinámico."""
+        # Act
+        calibration, held_out = split(list(range(10)), holdout=0.2)
+
+        # Assert
+        self.assertEqual(held_out, [0, 5])
+        self.assertEqual(len(calibration), 8)
+        self.assertEqual(export_path("weights/tunel_yolo11n.pt", "openvino_int8", 352).as_posix(), "weights/tunel_yolo11n_352_b1_int8_openvino_model")
+        self.assertEqual(export_path("weights/tunel_yolo11n.pt", "onnx", 640, batch=4).name, "tunel_yolo11n_640_b4.onnx")
+        self.assertEqual(export_path("weights/tunel_yolo11n.pt", "openvino_int8", 352, batch=3).name, "tunel_yolo11n_352_dynamic_int8_openvino_model")
+        self.assertEqual(export_path("weights/tunel_yolo11n.pt", "openvino", 352, batch=2), export_path("weights/tunel_yolo11n.pt", "openvino", 352, batch=4))
+
+
+    def test_lote_todas_o_ninguna(self):
+        """Prueba que con --batched se cuantice el modelo de lote dinámico al tamaño del
+        lote y que --apply no cambie el backend de solo una parte del lote."""
+        # Arrange: Dos cámaras con los mismos pesos; la cámara 2 no pasa la validación
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        config_file = os.path.join(tmp_dir.name, "camera_config.json")
+        cameras = {
+            "1": {"nombre": "Túnel norte", "url": "rtsp://mock_1", "clases": [0], "size": 640},
+            "2": {"nombre": "Túnel sur", "url": "rtsp://mock_2", "clases": [0], "size": 1280},
+        }
+        Path(config_file).write_text(json.dumps(cameras))
+        images = [np.zeros((32, 32, 3), dtype=np.uint8)] * 5
+        datasets = {"rtsp://mock_1": {"images": images, "inference_size": 320}, "rtsp://mock_2": {"images": images, "inference_size": 480}}
+        quantized = []
+
+        def quantize_model(weights, image_size, calibration, batch=1):
+            quantized.append((image_size, batch))
+            return Path(tmp_dir.name)
+
+        # Act
+        with mock.patch.object(quantize, "collect", side_effect=lambda camera_id, camera_config, size, *args: datasets[camera_config["url"]]) as collect, \
+             mock.patch.object(quantize, "quantize_model", side_effect=quantize_model), \
+             mock.patch.object(quantize, "validate", side_effect=[{"accepted": True}, {"accepted": False}]) as validate, \
+             mock.patch.object(quantize, "preload"), \
+             mock.patch.object(quantize, "configure_torch_threads"), \
+             mock.patch.object(quantize.messages, "quantization_message"), \
+             mock.patch.object(quantize.messages, "step_message"):
+            report = quantize.main(["1", "2"], 10, 1, None, False, 0.2, 0.02, 1.0, apply=True, config_file=config_file, batched=True)
+
+        # Assert: Un solo modelo de lote dinámico con el tamaño del lote, y ningún cambio de backend
+        self.assertEqual([call.args[2] for call in collect.call_args_list], [1280, 1280])
+        self.assertEqual(quantized, [(480, 2)])
+        self.assertEqual([call.kwargs["batch"] for call in validate.call_args_list], [2, 2])
+        self.assertEqual(sorted(report), ["1", "2"])
+        self.assertNotIn("backend", json.loads(Path(config_file).read_text())["1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
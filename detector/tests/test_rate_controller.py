@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.rate_controller import RateController
+
+
+class MockClock:
+    """Reloj simulado que avanza lo que tarda cada cuadro."""
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def simulate(controller: RateController, clock: MockClock, frames: int, frame_time, latency) -> None:
+    """Simula `frames` cuadros leídos; frame_time y latency dependen del tamaño actual."""
+    for _ in range(frames):
+        clock.now += frame_time(controller.size) if callable(frame_time) else frame_time
+        if controller.should_process():
+            controller.update(latency=latency(controller.size) if callable(latency) else latency, lag=0.0)
+
+
+class TestRateController(unittest.TestCase):
+    """
+    Clase de las pruebas para el controlador de tasa de inferencia.
+    """
+    def setUp(self):
+        self.clock = MockClock()
+        patcher = mock.patch("modules.rate_controller.time.perf_counter", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def test_reducir_tamano_sobrecargado(self):
+        """Prueba que se reduzca el tamaño si la inferencia supera el presupuesto del objetivo."""
+        # Arrange: Objetivo 10 FPS, latencia proporcional al área
+        controller = RateController(target_fps=10, sizes=[640, 576, 512, 448], window=10)
+        latency = lambda size: 0.15 * (size / 640) ** 2
+
+        # Act
+        simulate(controller, self.clock, 200, frame_time=latency, latency=latency)
+
+        # Assert: 512 px tarda 0.096 s, el primero que cabe en 0.1 s
+        self.assertEqual(controller.size, 512)
+        self.assertEqual(controller.stride, 1)
+
+
+    def test_aumentar_paso_con_sobra(self):
+        """Prueba que una cámara rápida procese menos cuadros hasta el objetivo sin quedar por debajo."""
+        # Arrange: Transmisión de 30 FPS, objetivo 10 FPS
+        controller = RateController(target_fps=10, sizes=[640], window=10)
+
+        # Act
+        simulate(controller, self.clock, 600, frame_time=1 / 30, latency=0.01)
+
+        # Assert
+        self.assertEqual(controller.stride, 3)
+        self.assertGreaterEqual(controller.fps, 9.5)
+
+
+    def test_recuperar_con_holgura(self):
+        """Prueba que el tamaño vuelva a subir cuando la latencia baja."""
+        # Arrange
+        controller = RateController(target_fps=10, sizes=[640, 576, 512], window=10)
+        simulate(controller, self.clock, 100, frame_time=0.2, latency=0.2)
+        self.assertEqual(controller.size, 512)
+
+        # Act: La carga desaparece
+        simulate(controller, self.clock, 200, frame_time=0.1, latency=0.03)
+
+        # Assert
+        self.assertEqual(controller.size, 640)
+        self.assertEqual(controller.stride, 1)
+
+
+    def test_desde_configuracion(self):
+        """Prueba que la configuración genere la escala de tamaños en múltiplos de 32."""
+        controller = RateController.from_config({"target_fps": 8, "min_size": 288}, image_size=352)
+        fixed = RateController.from_config({"target_fps": 8, "min_size": 288}, image_size=352, adapt_size=False)
+
+        self.assertEqual(controller.sizes, [352, 320, 288])
+        self.assertEqual(fixed.sizes, [352])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+import supervision as sv
+import cv2
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.region import RegionOfInterest
+
+
+class TestRegionOfInterest(unittest.TestCase):
+    """
+    Clase de las pruebas para la región de interés.
+    """
+    def test_crop(self):
+        """Prueba que el recorte coincida con el enmascarado del cuadro completo.
+
+        Esta prueba verifica que recortar con la máscara precalculada produzca
+        los mismos pixeles que enmascarar el cuadro completo en cada cuadro.
+        """
+        # Arrange: Crear región y cuadro simulado
+        polygon = [[570, 120], [930, 120], [1240, 530], [540, 530]]
+        region = RegionOfInterest(polygon=polygon, resolution_wh=(1280, 720))
+        image = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+
+        # Act: Recortar la región
+        cropped = region.crop(image)
+
+        # Assert: Comparar con la máscara del cuadro completo
+        mask = cv2.fillPoly(np.zeros((720, 1280), dtype=np.uint8), [np.array(polygon)], 255)
+        expected = cv2.bitwise_and(image, image, mask=mask)[120:531, 540:1241]
+        self.assertEqual(region.crop_wh, (701, 411))
+        np.testing.assert_array_equal(cropped, expected)
+
+
+    def test_region_fuera_del_cuadro(self):
+        """Prueba que la región se limite al tamaño del cuadro."""
+        # Arrange / Act
+        region = RegionOfInterest(
+            polygon=[[300, 600], [1850, 600], [2050, 1200], [1, 1200], [1, 850]],
+            resolution_wh=(1280, 720) )
+
+        # Assert
+        self.assertEqual((region.x, region.y, region.width, region.height), (1, 600, 1279, 120))
+        self.assertEqual(region.crop(np.ones((720, 1280, 3), dtype=np.uint8)).shape, (120, 1279, 3))
+
+
+    def test_to_frame(self):
+        """Prueba que las detecciones vuelvan a coordenadas del cuadro completo."""
+        # Arrange
+        region = RegionOfInterest(polygon=[[100, 50], [500, 50], [500, 300]], resolution_wh=(1280, 720))
+        detections = sv.Detections(
+            xyxy=np.array([[10, 20, 30, 40]], dtype=np.float32),
+            confidence=np.array([0.9]),
+            class_id=np.array([2]) )
+
+        # Act
+        detections = region.to_frame(detections)
+
+        # Assert
+        np.testing.assert_array_equal(detections.xyxy, [[110, 70, 130, 90]])
+
+
+    def test_inference_size(self):
+        """Prueba que el recorte se infiera con la misma escala del cuadro completo."""
+        # Arrange
+        region = RegionOfInterest(polygon=[[570, 120], [930, 120], [1240, 530], [540, 530]], resolution_wh=(1280, 720))
+
+        # Act / Assert
+        self.assertEqual(region.inference_size(1280), 704)
+        self.assertEqual(region.inference_size(640), 352)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.spool import DiskSpool
+
+
+class TestDiskSpool(unittest.TestCase):
+    """
+    Clase de las pruebas para el spool local de mensajes.
+    """
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "spool")
+
+
+    def test_leer_en_orden(self):
+        """Prueba que los mensajes se lean en orden entre segmentos y solo se consuman al confirmar."""
+        # Arrange: Segmentos pequeños para forzar varios archivos
+        spool = DiskSpool(self.path, segment_bytes=64)
+        for index in range(10):
+            spool.append([("cola", f'{{"id": {index}}}')])
+
+        # Act
+        first = spool.peek(4)
+        again = spool.peek(4)
+        spool.commit()
+        rest = spool.peek(100)
+        spool.commit()
+
+        # Assert
+        self.assertEqual(first, again)
+        self.assertEqual([message for _, message in first + rest], [f'{{"id": {index}}}' for index in range(10)])
+        self.assertEqual(spool.stats()["pending"], 0)
+        self.assertEqual(spool.stats()["drained"], 10)
+        self.assertEqual(spool.stats()["progress"], 1.0)
+
+
+    def test_continuar_despues_de_reiniciar(self):
+        """Prueba que un spool nuevo sobre la misma carpeta continúe desde el último mensaje confirmado."""
+        # Arrange
+        spool = DiskSpool(self.path, segment_bytes=64)
+        spool.append([("cola", f"m{index}") for index in range(6)])
+        spool.peek(2)
+        spool.commit()
+        spool.close()
+
+        # Act
+        reopened = DiskSpool(self.path, segment_bytes=64)
+        reopened.append([("cola", "m6")])
+        records = reopened.peek(100)
+
+        # Assert
+        self.assertEqual(reopened.pending, 5)
+        self.assertEqual([message for _, message in records], ["m2", "m3", "m4", "m5", "m6"])
+
+
+    def test_limite_de_tamano(self):
+        """Prueba que al superar el tamaño máximo se descarten los segmentos más antiguos."""
+        # Arrange
+        spool = DiskSpool(self.path, max_bytes=1000, segment_bytes=200)
+
+        # Act: 40 mensajes de unos 60 bytes por línea
+        for index in range(40):
+            spool.append([("cola", f"{index:02d}" + "x" * 40)])
+        records = spool.peek(100)
+
+        # Assert: Quedan los más recientes y el tamaño en disco respeta el límite
+        self.assertLessEqual(spool.size_bytes, 1000)
+        self.assertGreater(spool.dropped, 0)
+        self.assertEqual(spool.dropped + len(records), 40)
+        self.assertEqual(records[-1][1][:2], "39")
+
+
+    def test_mensajes_vencidos(self):
+        """Prueba que los mensajes más antiguos que max_age se omitan al leer."""
+        # Arrange
+        spool = DiskSpool(self.path, max_age=60)
+        with mock.patch("modules.spool.time.time", return_value=1000.0):
+            spool.append([("cola", "viejo")])
+        with mock.patch("modules.spool.time.time", return_value=1100.0):
+            spool.append([("cola", "nuevo")])
+
+            # Act
+            records = spool.peek(10)
+            spool.commit()
+
+        # Assert
+        self.assertEqual(records, [("cola", "nuevo")])
+        self.assertEqual(spool.expired, 1)
+        self.assertEqual(spool.pending, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import tempfile
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.timing import StageTimer
+
+
+class TestStageTimer(unittest.TestCase):
+    """
+    Clase de las pruebas para el recolector de tiempos por etapa.
+    """
+    def test_percentiles_ventana_movil(self):
+        """Prueba que los percentiles usen solo la ventana reciente y que el total sea acumulado."""
+        # Arrange
+        stage_timer = StageTimer(window=100)
+
+        # Act: 100 muestras lentas que luego salen de la ventana, y 100 rápidas de 1 a 100 ms
+        for _ in range(100):
+            stage_timer.record("inference", 1.0)
+        for milliseconds in range(1, 101):
+            stage_timer.record("inference", milliseconds / 1000)
+        summary = stage_timer.summary()["inference"]
+
+        # Assert
+        self.assertAlmostEqual(summary["p50"], 0.0505, places=4)
+        self.assertAlmostEqual(summary["p99"], 0.09901, places=4)
+        self.assertEqual(summary["count"], 200)
+        self.assertAlmostEqual(summary["sum"], 100 + 5.05, places=6)
+
+
+    def test_series_para_times_message(self):
+        """Prueba que las series tengan las llaves que espera messages.times_message."""
+        # Arrange
+        stage_timer = StageTimer()
+        with stage_timer.measure("inference"):
+            pass
+
+        # Act
+        series = stage_timer.series()
+
+        # Assert
+        self.assertEqual(set(series), {"capture_time", "inference_time", "frame_time"})
+        self.assertEqual(series["capture_time"], [0.0])
+        self.assertEqual(len(series["inference_time"]), 1)
+
+
+    def test_exportar_prometheus(self):
+        """Prueba que la instantánea tenga el formato de exposición de Prometheus."""
+        # Arrange
+        stage_timer = StageTimer(labels={"camera": "1"})
+        stage_timer.record("frame", 0.04)
+        stage_timer.record("capture", 0.01)
+
+        # Act
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "detector_1.prom")
+            stage_timer.write_snapshot(path, extra=['detector_frames_dropped_total{camera="1"} 3'])
+            with open(path) as f:
+                lines = f.read().splitlines()
+
+        # Assert: Las etapas se exportan en el orden del procesamiento
+        self.assertEqual(lines[1], "# TYPE detector_stage_seconds summary")
+        self.assertEqual(lines[2], 'detector_stage_seconds{camera="1",stage="capture",quantile="0.5"} 0.010000')
+        self.assertIn('detector_stage_seconds_count{camera="1",stage="frame"} 1', lines)
+        self.assertEqual(lines[-1], 'detector_frames_dropped_total{camera="1"} 3')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+import supervision as sv
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.track_registry import TrackRegistry
+
+
+def mock_detections(tracks: list) -> sv.Detections:
+    """Crea detecciones con seguimiento a partir de tuplas (tracker_id, clase, confianza)."""
+    if not tracks:
+        return sv.Detections.empty()
+    return sv.Detections(
+        xyxy=np.array([[0, 0, 10, 10]] * len(tracks), dtype=np.float32),
+        confidence=np.array([confidence for _, _, confidence in tracks], dtype=np.float32),
+        class_id=np.zeros(len(tracks), dtype=int),
+        tracker_id=np.array([tracker_id for tracker_id, _, _ in tracks]),
+        data={"class_name": np.array([class_name for _, class_name, _ in tracks])} )
+
+
+class TestTrackRegistry(unittest.TestCase):
+    """
+    Clase de las pruebas para el registro de objetos seguidos.
+    """
+    def test_eventos_del_ciclo_de_vida(self):
+        """Prueba que un objeto visible en muchos cuadros genere solo sus eventos de ciclo de vida.
+
+        Esta prueba verifica el evento de objeto nuevo, la mejora de confianza
+        por encima del margen, el cambio de clase y el fin por TTL con resumen.
+        """
+        # Arrange
+        registry = TrackRegistry(ttl=1.0, confidence_margin=0.1)
+        frames = [[(1, "car", 0.50)]] * 20 + [[(1, "car", 0.55)], [(1, "car", 0.65)], [(1, "truck", 0.60)]]
+
+        # Act: 10 cuadros por segundo, luego el objeto desaparece
+        events = []
+        for frame_number, tracks in enumerate(frames):
+            events += registry.update(mock_detections(tracks), timestamp=frame_number / 10)
+        events += registry.update(mock_detections([]), timestamp=5.0)
+
+        # Assert
+        self.assertEqual([event["evento"] for event in events], ["nuevo", "mejor_confianza", "cambio_clase", "finalizado"])
+        self.assertEqual(events[0]["indice"], 0)
+        self.assertEqual(events[-1]["cuadros"], 23)
+        self.assertAlmostEqual(events[-1]["confianza"], 0.65, places=5)
+        self.assertEqual(registry.tracks, {})
+
+
+    def test_objeto_recuperado_dentro_del_ttl(self):
+        """Prueba que un objeto que reaparece antes del TTL no se anuncie de nuevo."""
+        # Arrange
+        registry = TrackRegistry(ttl=2.0)
+
+        # Act
+        first = registry.update(mock_detections([(3, "person", 0.8), (4, "car", 0.7)]), timestamp=0.0)
+        hidden = registry.update(mock_detections([(4, "car", 0.7)]), timestamp=1.5)
+        back = registry.update(mock_detections([(3, "person", 0.8)]), timestamp=1.9)
+
+        # Assert
+        self.assertEqual([event["tracker_id"] for event in first], [3, 4])
+        self.assertEqual(hidden + back, [])
+
+
+    def test_cerrar_seguimientos(self):
+        """Prueba que flush termine todos los objetos activos."""
+        # Arrange
+        registry = TrackRegistry()
+        registry.update(mock_detections([(1, "car", 0.9), (2, "car", 0.9)]), timestamp=0.0)
+
+        # Act
+        events = registry.flush()
+
+        # Assert
+        self.assertEqual(sorted(event["tracker_id"] for event in events), [1, 2])
+        self.assertTrue(all(event["evento"] == "finalizado" for event in events))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import unittest
+import tempfile
+from unittest import mock
+import time
+import numpy as np
+import cv2
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.frame_pool import FramePool
+from modules.video_stream import LatestFrameStream
+from tools.video_info import VideoInfo
+
+
+def mock_video(path: str, total_frames: int = 30, resolution_wh: tuple = (160, 120)) -> str:
+    """Crea un video local con un objeto en movimiento para simular una cámara."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, resolution_wh)
+    for i in range(total_frames):
+        frame = np.zeros((resolution_wh[1], resolution_wh[0], 3), dtype=np.uint8)
+        cv2.rectangle(frame, (4 * i, 40), (4 * i + 30, 80), (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+class TestLatestFrameStream(unittest.TestCase):
+    """
+    Clase de las pruebas para la captura del cuadro más reciente.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.video = mock_video(os.path.join(cls.tmp_dir.name, "mock.avi"))
+
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+
+    def test_modo_ordenado(self):
+        """Prueba que en modo ordenado se entreguen todos los cuadros del archivo.
+
+        Esta prueba verifica que no se descarten cuadros, que cada cuadro tenga
+        hora de captura y que los buffers vuelvan al pool.
+        """
+        # Arrange: Inicializar captura con pool de buffers
+        pool = FramePool.from_resolution((160, 120), size=3)
+        video_stream = LatestFrameStream(self.video, frame_pool=pool, drop_frames=False).start()
+
+        # Act: Leer hasta el final del video
+        frames_read = 0
+        timestamps = []
+        while video_stream.more():
+            frame = video_stream.read()
+            if frame is None:
+                continue
+            frames_read += 1
+            timestamps.append(video_stream.timestamp)
+            video_stream.release(frame)
+        video_stream.stop()
+
+        # Assert: Verificar conteo y marcas de tiempo
+        self.assertEqual(frames_read, 30)
+        self.assertEqual(video_stream.stats()["dropped"], 0)
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertLessEqual(pool.allocated, 3)
+
+
+    def test_modo_en_vivo(self):
+        """Prueba que un consumidor lento reciba el cuadro más reciente y se cuenten los descartes."""
+        # Arrange
+        video_stream = LatestFrameStream(self.video, drop_frames=True).start()
+
+        # Act: Esperar a que la captura termine antes de leer
+        while not video_stream.ended:
+            time.sleep(0.01)
+        frame = video_stream.read(timeout=0)
+        video_stream.stop()
+
+        # Assert: Solo queda el último cuadro; los demás se descartaron
+        stats = video_stream.stats()
+        self.assertEqual(stats["frames"], 30)
+        self.assertEqual(stats["dropped"], 29)
+        self.assertGreater(frame[60, 120:150, 2].mean(), 200)
+
+
+    def test_cuadros_duplicados(self):
+        """Prueba que los cuadros idénticos (cámara congelada) se cuenten y no se entreguen."""
+        # Arrange: Video con el mismo cuadro repetido
+        path = os.path.join(self.tmp_dir.name, "static.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (160, 120))
+        for _ in range(10):
+            writer.write(np.full((120, 160, 3), 90, dtype=np.uint8))
+        writer.release()
+
+        # Act
+        video_stream = LatestFrameStream(path, drop_frames=False).start()
+        frames_read = 0
+        while video_stream.more():
+            if video_stream.read() is not None:
+                frames_read += 1
+        video_stream.stop()
+
+        # Assert
+        self.assertEqual(frames_read, 1)
+        self.assertEqual(video_stream.stats()["duplicates"], 9)
+
+
+    def test_region_con_substream(self):
+        """Prueba que la región, en coordenadas del stream principal, se escale a la resolución del substream."""
+        # Arrange: Substream de 160 x 120 (4:3) de una cámara principal de 1280 x 720 (16:9)
+        options = {"substream": self.video, "source_wh": [1280, 720]}
+        region = [[640, 0], [1280, 720], [0, 720]]
+
+        # Act
+        source_info = VideoInfo(source="rtsp://camara/principal", capture_options=options)
+
+        # Assert
+        self.assertEqual(source_info.resolution_wh, (160, 120))
+        self.assertEqual(source_info.source_wh, (1280, 720))
+        self.assertEqual(source_info.scale_polygon(region), [[80, 0], [160, 120], [0, 120]])
+        self.assertEqual(VideoInfo(source=self.video).scale_polygon(region), region)
+
+
+    def test_reutilizar_captura_de_video_info(self):
+        """Prueba que la transmisión reutilice la captura abierta por VideoInfo sin abrir la fuente otra vez."""
+        # Arrange
+        source_info = VideoInfo(source=self.video, keep_open=True)
+
+        # Act
+        with mock.patch("modules.video_stream.open_capture") as open_capture:
+            video_stream = LatestFrameStream(self.video, drop_frames=False, capture=source_info.capture).start()
+            frames_read = 0
+            while video_stream.more():
+                frame = video_stream.read()
+                if frame is not None:
+                    frames_read += 1
+            video_stream.stop()
+
+        # Assert: Se leen todos los cuadros desde el inicio y la captura queda liberada
+        open_capture.assert_not_called()
+        self.assertEqual(source_info.resolution_wh, (160, 120))
+        self.assertEqual(frames_read, 30)
+        self.assertFalse(source_info.capture.isOpened())
+
+
+    def test_reconexion_con_espera(self):
+        """Prueba que una fuente caída se reintente con espera exponencial y no en ciclo continuo."""
+        # Arrange: Fuente local sin servidor
+        video_stream = LatestFrameStream(
+            "rtsp://127.0.0.1:9/mock",
+            reconnect_delay=0.05,
+            timeout_ms=200 ).start()
+
+        # Act
+        frame = video_stream.read(timeout=0.5)
+        video_stream.stop()
+
+        # Assert: 0.05 + 0.1 + 0.2 s de espera caben en 0.5 s
+        self.assertIsNone(frame)
+        self.assertFalse(video_stream.connected)
+        self.assertLessEqual(video_stream.stats()["reconnects"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
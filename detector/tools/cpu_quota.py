@@ -0,0 +1,98 @@
+import cv2
+import math
+import os
+from pathlib import Path
+
+
+CGROUP_V2_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+CGROUP_V1_CPU_DIRS = (Path("/sys/fs/cgroup/cpu"), Path("/sys/fs/cgroup/cpu,cpuacct"))
+
+
+def cpu_quota() -> float:
+    """Lee la cuota de CPU del contenedor desde el cgroup (v2 o v1).
+
+    returns:
+        float: CPUs disponibles según la cuota (por ejemplo 1.5), o None si no hay límite.
+    """
+    try:
+        quota, period = CGROUP_V2_CPU_MAX.read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    for cpu_dir in CGROUP_V1_CPU_DIRS:
+        try:
+            quota = int(cpu_dir.joinpath("cpu.cfs_quota_us").read_text())
+            period = int(cpu_dir.joinpath("cpu.cfs_period_us").read_text())
+        except (OSError, ValueError):
+            continue
+        return None if quota <= 0 or period <= 0 else quota / period
+
+    return None
+
+
+def available_cpus() -> float:
+    """CPUs utilizables: la cuota del cgroup, limitada por los núcleos asignados al proceso."""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    quota = cpu_quota()
+    return min(quota, cores) if quota is not None else cores
+
+
+def configure_capture_threads(threads: int = None) -> dict:
+    """Ajusta los hilos de OpenCV y del decodificador de FFmpeg a la cuota de CPU.
+
+    Debe llamarse antes de abrir la cámara. Por defecto usa la parte entera
+    de los CPUs disponibles (mínimo 1), porque el hilo de captura y las
+    etapas de anotación y publicación también consumen la cuota.
+
+    args:
+        threads (int, optional): Número de hilos; por defecto según la cuota.
+    returns:
+        dict: Cuota leída (quota), CPUs disponibles (cpus) y hilos elegidos (threads).
+    """
+    cpus = available_cpus()
+    threads = threads or max(1, math.floor(cpus))
+
+    cv2.setNumThreads(threads)
+
+    # Hilos de decodificación de las capturas de OpenCV que se abran después
+    capture_options = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS", "")
+    if "threads" not in capture_options:
+        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "|".join(filter(None, [capture_options, f"threads;{threads}"]))
+
+    return {
+        "quota": cpu_quota(),
+        "cpus": cpus,
+        "threads": threads,
+    }
+
+
+def configure_torch_threads(threads: int) -> None:
+    """Ajusta los hilos de torch; debe llamarse antes de cargar el modelo.
+
+    torch se importa aquí y no al inicio del módulo, para que la apertura de
+    la cámara pueda avanzar mientras se importa.
+    """
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Solo se puede fijar antes del primer trabajo en paralelo de torch
+        pass
+
+
+def configure_threads(threads: int = None) -> dict:
+    """Ajusta los hilos de torch, OpenCV y el decodificador de FFmpeg a la cuota de CPU.
+
+    Debe llamarse antes de abrir la cámara y de cargar el modelo.
+
+    args:
+        threads (int, optional): Número de hilos; por defecto según la cuota.
+    returns:
+        dict: Cuota leída (quota), CPUs disponibles (cpus) y hilos elegidos (threads).
+    """
+    settings = configure_capture_threads(threads)
+    configure_torch_threads(settings["threads"])
+    return settings
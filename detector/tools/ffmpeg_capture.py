@@ -0,0 +1,248 @@
+import re
+import shutil
+import subprocess
+import threading
+
+import cv2
+import numpy as np
+
+from typing import List, Tuple
+
+
+# Líneas del encabezado que FFmpeg escribe en stderr al abrir la entrada y la salida
+RESOLUTION_PATTERN = re.compile(r", (\d{2,5})x(\d{2,5})\b")
+FPS_PATTERN = re.compile(r", ([\d.]+) (?:fps|tbr)")
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):([\d.]+)")
+
+
+class FFmpegCapture:
+    """Captura de video con un proceso de FFmpeg, con la interfaz de cv2.VideoCapture
+    que usan VideoInfo y LatestFrameStream.
+
+    FFmpeg decodifica y reduce el video a `max_size` en su propio proceso y
+    entrega los cuadros BGR por una tubería; `read` los copia directamente en
+    el buffer recibido, sin asignar memoria por cuadro. Así la captura no
+    decodifica en Python la resolución completa de la cámara cuando la
+    inferencia y la evidencia solo necesitan una menor.
+
+    La fuente se abre una sola vez: FFmpeg calcula la escala con una expresión
+    sobre la resolución de entrada, y la resolución, los FPS y la duración se
+    leen del encabezado que escribe en stderr antes del primer cuadro.
+
+    attributes:
+        source (str): URL de la cámara o archivo de video.
+        max_size (int): Lado mayor de los cuadros entregados; None para la resolución original.
+        hwaccel (str): Aceleración de decodificación de FFmpeg, por ejemplo "cuda"; None decodifica en CPU.
+        threads (int): Hilos del decodificador; None para el valor de FFmpeg.
+        source_wh (Tuple[int, int]): Resolución original del video.
+        output_wh (Tuple[int, int]): Resolución de los cuadros entregados.
+        fps (float): Cuadros por segundo del video.
+        frame_count (int): Cuadros del archivo, estimados con la duración; 0 si no se conoce.
+    """
+    def __init__(
+        self,
+        source: str,
+        max_size: int = None,
+        timeout_ms: int = 10000,
+        hwaccel: str = None,
+        threads: int = None,
+        ffmpeg: str = "ffmpeg"
+    ) -> None:
+        self.source = str(source)
+        self.max_size = max_size
+        self.timeout_ms = timeout_ms
+        self.hwaccel = hwaccel
+        self.threads = threads
+        self.ffmpeg = ffmpeg
+
+        self.source_wh = (0, 0)
+        self.output_wh = (0, 0)
+        self.fps = 0.0
+        self.frame_count = 0
+
+        self._process = None
+        self._opened = False
+        if shutil.which(ffmpeg) is None:
+            print(f"FFmpeg no está disponible ({ffmpeg})")
+            return
+        self._start()
+
+
+    @property
+    def is_network(self) -> bool:
+        return "://" in self.source
+
+
+    def _input_options(self) -> List[str]:
+        """Opciones de entrada: transporte TCP para RTSP y tiempo de espera de lectura."""
+        options = []
+        if self.source.lower().startswith("rtsp://"):
+            options += ["-rtsp_transport", "tcp"]
+        if self.is_network:
+            options += ["-rw_timeout", str(int(self.timeout_ms * 1000))]
+        return options
+
+
+    def _start(self) -> None:
+        """Inicia FFmpeg con la salida BGR cruda y espera su encabezado con la resolución de entrada y de salida."""
+        command = [self.ffmpeg, "-nostdin", "-hide_banner", "-nostats", "-loglevel", "info", *self._input_options()]
+        if self.hwaccel:
+            command += ["-hwaccel", self.hwaccel]
+        if self.threads:
+            command += ["-threads", str(self.threads)]
+        command += ["-i", self.source, "-an", "-sn", "-dn"]
+        if self.max_size:
+            command += ["-vf", scale_filter(self.max_size)]
+        command += ["-pix_fmt", "bgr24", "-f", "rawvideo", "pipe:1"]
+
+        try:
+            self._process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+        except OSError as e:
+            print(f"Error al iniciar FFmpeg: {e}")
+            return
+
+        header = []
+        header_ready = threading.Event()
+        threading.Thread(target=read_log, args=(self._process.stderr, header, header_ready), name="ffmpeg-log", daemon=True).start()
+        stream = parse_header(header) if header_ready.wait(self.timeout_ms / 1000 + 1) else None
+        if stream is None:
+            self.release()
+            return
+
+        self.source_wh, self.output_wh = stream["source_wh"], stream["output_wh"]
+        self.fps = stream["fps"]
+        self.frame_count = round(stream["duration"] * self.fps)
+        self._opened = True
+
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+
+    def read(self, image: np.array = None) -> Tuple[bool, np.array]:
+        """Lee el siguiente cuadro, escrito en `image` si tiene la forma de salida.
+
+        args:
+            image (np.array, optional): Buffer reutilizable de alto x ancho x 3 bytes.
+        returns:
+            Tuple[bool, np.array]: Éxito de la lectura y cuadro leído.
+        """
+        if not self._opened:
+            return False, None
+
+        width, height = self.output_wh
+        if image is None or image.shape != (height, width, 3) or image.dtype != np.uint8 or not image.flags.c_contiguous:
+            image = np.empty((height, width, 3), dtype=np.uint8)
+
+        view = memoryview(image).cast("B")
+        offset = 0
+        while offset < len(view):
+            count = self._process.stdout.readinto(view[offset:])
+            if not count:
+                # Fin del archivo o fuente caída: la transmisión decide si reconectar
+                self.release()
+                return False, None
+            offset += count
+        return True, image
+
+
+    def get(self, prop: int) -> float:
+        """Propiedades de OpenCV: ancho y alto de salida, FPS y cuadros del archivo."""
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: self.output_wh[0],
+            cv2.CAP_PROP_FRAME_HEIGHT: self.output_wh[1],
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_FRAME_COUNT: self.frame_count,
+        }.get(prop, 0.0)
+
+
+    def release(self) -> None:
+        """Detiene el proceso de FFmpeg."""
+        self._opened = False
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self._process.stdout.close()
+        self._process = None
+
+
+def output_resolution(source_wh: Tuple[int, int], max_size: int = None) -> Tuple[int, int]:
+    """Resolución reducida para que el lado mayor no supere `max_size`, con lados pares.
+
+    args:
+        source_wh (Tuple[int, int]): Resolución original.
+        max_size (int, optional): Lado mayor máximo; None conserva la resolución original.
+    returns:
+        Tuple[int, int]: Resolución de salida.
+    """
+    width, height = source_wh
+    if not max_size or max(width, height) <= max_size:
+        return width, height
+    scale = max_size / max(width, height)
+    return max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+
+
+def scale_filter(max_size: int) -> str:
+    """Filtro de FFmpeg que reduce el lado mayor a `max_size` con lados pares, como
+    `output_resolution`, calculado por FFmpeg con la resolución de entrada.
+
+    args:
+        max_size (int): Lado mayor máximo.
+    returns:
+        str: Filtro para `-vf`.
+    """
+    def side(name: str) -> str:
+        return f"if(lte(max(iw\\,ih)\\,{max_size})\\,{name}\\,max(2\\,trunc({name}*{max_size}/max(iw\\,ih)/2)*2))"
+    return f"scale=w='{side('iw')}':h='{side('ih')}':flags=area"
+
+
+def read_log(stderr, header: List[str], header_ready: threading.Event) -> None:
+    """Lee el stderr de FFmpeg hasta que termina, para que nunca se bloquee al escribir.
+
+    Guarda las líneas en `header` hasta la del video de salida, que FFmpeg
+    escribe antes de entregar el primer cuadro, y entonces activa `header_ready`;
+    también lo activa si FFmpeg termina antes.
+    """
+    output = False
+    with stderr:
+        for line in iter(stderr.readline, b""):
+            if header_ready.is_set():
+                continue
+            line = line.decode(errors="replace")
+            header.append(line)
+            output = output or line.startswith("Output #")
+            if output and "Video:" in line:
+                header_ready.set()
+    header_ready.set()
+
+
+def parse_header(lines: List[str]) -> dict:
+    """Resolución de entrada y de salida, FPS y duración del encabezado de FFmpeg.
+
+    args:
+        lines (List[str]): Líneas de stderr hasta el video de salida.
+    returns:
+        dict: source_wh, output_wh, fps y duration (0 en transmisiones); None si falta la resolución.
+    """
+    stream = {"fps": 0.0, "duration": 0.0}
+    section = None
+    for line in lines:
+        if line.startswith(("Input #", "Output #")):
+            section = "source_wh" if line.startswith("Input #") else "output_wh"
+        elif section == "source_wh" and DURATION_PATTERN.search(line):
+            hours, minutes, seconds = DURATION_PATTERN.search(line).groups()
+            stream["duration"] = 3600 * int(hours) + 60 * int(minutes) + float(seconds)
+        elif section is not None and "Video:" in line and section not in stream:
+            resolution = RESOLUTION_PATTERN.search(line)
+            if resolution is not None:
+                stream[section] = (int(resolution.group(1)), int(resolution.group(2)))
+            fps = FPS_PATTERN.search(line)
+            if section == "source_wh" and fps is not None:
+                stream["fps"] = float(fps.group(1))
+    return stream if "source_wh" in stream and "output_wh" in stream else None
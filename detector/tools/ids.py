@@ -0,0 +1,111 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from typing import Tuple
+
+try:
+    from common.detection_ids import SEPARATOR, TIME_LENGTH, decode_base32, encode_base32, time_prefix, time_range  # noqa: F401
+except ImportError:
+    # Fuera del contenedor, common/ está en la raíz del repositorio
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from common.detection_ids import SEPARATOR, TIME_LENGTH, decode_base32, encode_base32, time_prefix, time_range  # noqa: F401
+
+
+def make_id(seconds: float, camera_id: str, track_id: int = None) -> str:
+    """Construye un ID con el tiempo, la cámara y opcionalmente el objeto seguido.
+
+    Los IDs se ordenan lexicográficamente por tiempo porque el tiempo va
+    primero y tiene largo fijo.
+
+    args:
+        seconds (float): Hora, en segundos desde la época.
+        camera_id (str): ID de la cámara.
+        track_id (int, optional): ID de seguimiento del objeto. Por defecto es None, para IDs de imagen.
+    returns:
+        str: ID, por ejemplo "01JAB3K5QZ-1-7".
+    """
+    return _join(int(seconds * 1000), camera_id, track_id)
+
+
+def _join(milliseconds: int, camera_id: str, track_id: int = None) -> str:
+    parts = [encode_base32(milliseconds, TIME_LENGTH), str(camera_id)]
+    if track_id is not None:
+        parts.append(encode_base32(int(track_id)))
+    return SEPARATOR.join(parts)
+
+
+def parse_id(detection_id: str) -> Tuple[float, str, int]:
+    """Separa un ID en su hora (segundos), cámara y objeto seguido (None en IDs de imagen)."""
+    time_part, camera_id, *track_part = detection_id.split(SEPARATOR)
+    return decode_base32(time_part) / 1000, camera_id, decode_base32(track_part[0]) if track_part else None
+
+
+class IdGenerator:
+    """Generador de IDs de una cámara con componente de tiempo monótono.
+
+    Cada objeto seguido conserva el mismo ID en todos sus eventos, con la hora
+    en que apareció; las imágenes reciben un ID por cuadro. La hora de cada ID
+    nuevo es estrictamente mayor que la del anterior, aunque el reloj del
+    sistema retroceda, de modo que los IDs de una cámara nunca se repiten.
+
+    attributes:
+        camera_id (str): ID de la cámara.
+        max_tracks (int): Objetos recordados; los más antiguos se olvidan primero.
+    """
+    def __init__(self, camera_id: str, max_tracks: int = 4096) -> None:
+        if SEPARATOR in str(camera_id):
+            raise ValueError(f"El ID de cámara {camera_id} no puede contener '{SEPARATOR}'")
+
+        self.camera_id = str(camera_id)
+        self.max_tracks = max_tracks
+
+        self._tracks = OrderedDict()
+        self._last_ms = 0
+        self._lock = threading.Lock()
+
+
+    def track(self, track_id: int, start: float = None) -> str:
+        """ID de un objeto seguido, creado la primera vez que se consulta.
+
+        args:
+            track_id (int): ID de seguimiento.
+            start (float, optional): Hora de aparición del objeto, en segundos. Por defecto es la hora actual.
+        returns:
+            str: ID del objeto.
+        """
+        with self._lock:
+            detection_id = self._tracks.get(track_id)
+            if detection_id is not None:
+                self._tracks.move_to_end(track_id)
+            else:
+                detection_id = _join(self._next_ms(start), self.camera_id, track_id)
+                self._tracks[track_id] = detection_id
+                if len(self._tracks) > self.max_tracks:
+                    self._tracks.popitem(last=False)
+            return detection_id
+
+
+    def end(self, track_id: int) -> None:
+        """Olvida un objeto terminado; si su ID de seguimiento se reutiliza, recibe un ID nuevo."""
+        with self._lock:
+            self._tracks.pop(track_id, None)
+
+
+    def image(self, seconds: float = None) -> str:
+        """ID de la imagen de un cuadro.
+
+        args:
+            seconds (float, optional): Hora del cuadro, en segundos. Por defecto es la hora actual.
+        returns:
+            str: ID de la imagen.
+        """
+        with self._lock:
+            return _join(self._next_ms(seconds), self.camera_id)
+
+
+    def _next_ms(self, seconds: float = None) -> int:
+        self._last_ms = max(self._last_ms + 1, int(1000 * (seconds if seconds is not None else time.time())))
+        return self._last_ms
@@ -2,8 +2,6 @@ from pathlib import Path
 
 from tools.video_info import VideoInfo
 
-# For debugging
-from icecream import ic
 
 # Constants
 # ---------
@@ -51,8 +49,12 @@ def source_message(video_info: VideoInfo):
     print(f"\n{green('*'*text_length)}\n")
 
 
-def progress_message(frame_number: int, total_frames: int, fps_value: float):
-    """Muestra el progreso del procesamiento de los cuadros en la terminal."""
+def progress_message(frame_number: int, total_frames: int, fps_value: float, details: dict = None):
+    """Muestra el progreso del procesamiento de los cuadros en la terminal.
+
+    args:
+        details (dict, optional): Indicadores adicionales que se muestran al final de la línea.
+    """
     if total_frames is not None:
         percentage_title = f"{'':11}"
         percentage = f"[ {frame_number/total_frames:6.1%} ] "
@@ -71,7 +73,8 @@ def progress_message(frame_number: int, total_frames: int, fps_value: float):
     frame_text_length = (2 * len(str(total_frames))) + 3
     if frame_number == 0:
         print(f"\n{percentage_title}{bold('Frame'):>{frame_text_length+9}}{bold('FPS'):>22}{bold('Est. End (h)'):>27}")
-    print(f"\r{green(percentage)}{frame_progress:>{frame_text_length}}     {fps_value:8.2f}     {hours_process}h {minutes_process}m  ", end="", flush=True)
+    details_text = "".join(f"  {bold(key)} {value}" for key, value in details.items()) if details else ""
+    print(f"\r{green(percentage)}{frame_progress:>{frame_text_length}}     {fps_value:8.2f}     {hours_process}h {minutes_process}m  {details_text}", end="", flush=True)
     
 
 def times_message(frame_number: int, total_frames: int, fps_value: float, progress_times: dict):
@@ -86,21 +89,58 @@ def times_message(frame_number: int, total_frames: int, fps_value: float, progre
         frame_progress = f"{frame_number} / {total_frames}"
         
         seconds = (total_frames-frame_number) / fps_value  if fps_value != 0 else 0
-        hours_process = seconds // 3600
-        minutes_process = (seconds % 3600) // 60
+        hours_process = f"{(seconds // 3600):8.0f}"
+        minutes_process = f"{((seconds % 3600) // 60):.0f}"
     else:
         percentage_title = ''
         percentage = ''
         frame_progress = f"{frame_number}"
-        hours_process = ''
-        minutes_process = ''
+        hours_process = '        -'
+        minutes_process = '-'
         
     frame_text_length = (2 * len(str(total_frames))) + 3
     if frame_number == 0:
         print(f"\n{percentage_title}{bold('Frame'):>{frame_text_length+9}}{bold('Capture'):>22}{bold('Inference'):>22}{bold('Total'):>22}{bold('FPS'):>22}{bold('Est. End (h)'):>27}")
-    print(f"\r{green(percentage)}{frame_progress:>{frame_text_length}}  {1000*(capture_average_time):8.2f} ms  {1000*(inference_average_time):8.2f} ms  {1000*(frame_average_time):8.2f} ms     {fps_value:8.2f}     {hours_process:8.0f}h {minutes_process:.0f}m  ", end="", flush=True)
+    print(f"\r{green(percentage)}{frame_progress:>{frame_text_length}}  {1000*(capture_average_time):8.2f} ms  {1000*(inference_average_time):8.2f} ms  {1000*(frame_average_time):8.2f} ms     {fps_value:8.2f}     {hours_process}h {minutes_process}m  ", end="", flush=True)
     
 
+def timing_message(summary: dict):
+    """Muestra los percentiles de tiempo de cada etapa del procesamiento en la terminal."""
+    print(f"\n{bold('Etapa'):<23}{bold('p50'):>20}{bold('p95'):>20}{bold('p99'):>20}{bold('Cuadros'):>20}")
+    for stage, values in summary.items():
+        print(f"{stage:<14}{1000*values['p50']:8.2f} ms  {1000*values['p95']:8.2f} ms  {1000*values['p99']:8.2f} ms  {values['count']:>9}")
+
+
+def publisher_message(step: str, publisher_stats: dict):
+    """Muestra el resumen de los mensajes publicados en Redis y del spool local en la terminal."""
+    lost = publisher_stats["failed"] + publisher_stats["dropped"]
+    spool_stats = publisher_stats.get("spool")
+    if spool_stats is not None:
+        lost += spool_stats["dropped"] + spool_stats["expired"]
+    message = f"Mensajes publicados: {publisher_stats['published']} en {publisher_stats['batches']} envíos (p95 {publisher_stats['latency_ms_p95']:.1f} ms, perdidos {lost})"
+    if spool_stats is not None and spool_stats["appended"]:
+        message += f" · spool: {spool_stats['drained']} reenviados, {spool_stats['pending']} pendientes ({spool_stats['bytes'] / 1024 ** 2:.1f} MB)"
+    step_message(step, message)
+
+def autotune_message(candidate: dict, meets_target: bool):
+    """Muestra la medición de una combinación de pesos, tamaño y backend en la terminal."""
+    status = green('✓') if meets_target else red('✗')
+    print(
+        f"  {status} {candidate['weights']:<32} {candidate['size']:>5} px {candidate['backend']:<9}"
+        f"  p50 {candidate['latency_ms_p50']:7.1f} ms   p95 {candidate['latency_ms_p95']:7.1f} ms"
+        f"   {candidate['fps']:6.1f} FPS   coincidencia {candidate['score']:.2f}" )
+
+
+def quantization_message(camera_id: str, result: dict):
+    """Muestra la validación del modelo INT8 de una cámara contra el FP32 en la terminal."""
+    status = green('✓') if result["accepted"] else red('✗')
+    print(
+        f"  {status} {bold('Cámara')} {camera_id:<6} mAP50 {result['map50']:.3f} ({result['map50_delta']:+.3f})"
+        f"   mAP50-95 {result['map50_95']:.3f} ({result['map50_95_delta']:+.3f})   coincidencia {result['agreement']:.2f}"
+        f"   p50 {result['fp32_latency_ms_p50']:.1f} -> {result['int8_latency_ms_p50']:.1f} ms (x{result['speedup']:.2f})"
+        f"   {result['references']} referencias en {result['images']} recortes" )
+
+
 def step_message(step: str = None, message: str = None):
     """Muestra un mensaje de progreso en la terminal."""
     step_text = green(f"[{step}]") if step != "Error" else red(f"[{step}]")
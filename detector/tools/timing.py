@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+from typing import Dict, Iterable
+
+
+# Etapas del procesamiento de un cuadro, en orden
+STAGES = ("capture", "masking", "inference", "conversion", "annotation", "encoding", "publish", "frame")
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageTimer:
+    """Recolector de tiempos por etapa con ventanas móviles.
+
+    Guarda las últimas `window` duraciones de cada etapa para calcular los
+    percentiles p50/p95/p99, y acumula el total y la cuenta desde el inicio.
+    Se puede usar desde varios hilos (etapas de anotación y publicación).
+
+    attributes:
+        window (int): Duraciones guardadas por etapa.
+        labels (dict): Etiquetas de las métricas exportadas, por ejemplo la cámara.
+    """
+    def __init__(self, window: int = 300, labels: dict = None) -> None:
+        self.window = window
+        self.labels = labels or {}
+
+        self._samples = {}
+        self._totals = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Registra la duración de una etapa, en segundos."""
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+                self._totals[stage] = 0.0
+                self._counts[stage] = 0
+            self._samples[stage].append(seconds)
+            self._totals[stage] += seconds
+            self._counts[stage] += 1
+
+
+    @contextmanager
+    def measure(self, stage: str):
+        """Mide la duración del bloque `with` como una etapa."""
+        time_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - time_start)
+
+
+    def samples(self, stage: str) -> list:
+        """Duraciones recientes de una etapa."""
+        with self._lock:
+            return list(self._samples.get(stage, ()))
+
+
+    def series(self) -> dict:
+        """Series recientes con las llaves que espera `messages.times_message`."""
+        return {
+            "capture_time": self.samples("capture") or [0.0],
+            "inference_time": self.samples("inference") or [0.0],
+            "frame_time": self.samples("frame") or [0.0],
+        }
+
+
+    def summary(self) -> Dict[str, dict]:
+        """Percentiles recientes, total y cuenta de cada etapa registrada.
+
+        returns:
+            Dict[str, dict]: Por etapa: p50, p95, p99 (s), sum (s) y count.
+        """
+        with self._lock:
+            stages = {stage: (list(samples), self._totals[stage], self._counts[stage]) for stage, samples in self._samples.items()}
+
+        summary = {}
+        for stage in sorted(stages, key=lambda stage: STAGES.index(stage) if stage in STAGES else len(STAGES)):
+            samples, total, count = stages[stage]
+            percentiles = np.percentile(samples, [100 * quantile for quantile in QUANTILES]) if samples else [0.0] * len(QUANTILES)
+            summary[stage] = {
+                **{f"p{int(100 * quantile)}": float(value) for quantile, value in zip(QUANTILES, percentiles)},
+                "sum": total,
+                "count": count,
+            }
+        return summary
+
+
+    def prometheus(self) -> str:
+        """Exporta los tiempos en el formato de texto de Prometheus, como un resumen por etapa."""
+        base_labels = "".join(f'{key}="{value}",' for key, value in self.labels.items())
+        lines = [
+            "# HELP detector_stage_seconds Duración de cada etapa del procesamiento de un cuadro.",
+            "# TYPE detector_stage_seconds summary",
+        ]
+        for stage, values in self.summary().items():
+            labels = f'{base_labels}stage="{stage}"'
+            for quantile in QUANTILES:
+                lines.append(f'detector_stage_seconds{{{labels},quantile="{quantile}"}} {values[f"p{int(100 * quantile)}"]:.6f}')
+            lines.append(f"detector_stage_seconds_sum{{{labels}}} {values['sum']:.6f}")
+            lines.append(f"detector_stage_seconds_count{{{labels}}} {values['count']}")
+        return "\n".join(lines) + "\n"
+
+
+    def write_snapshot(self, path: str, extra: Iterable[str] = ()) -> None:
+        """Escribe la exportación de Prometheus de forma atómica para que el lector nunca vea un archivo parcial.
+
+        args:
+            path (str): Archivo de destino, por ejemplo para el textfile collector de node_exporter.
+            extra (Iterable[str], optional): Líneas adicionales ya formateadas.
+        """
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as f:
+            f.write(self.prometheus())
+            f.writelines(f"{line}\n" for line in extra)
+        os.replace(temporary_path, path)
@@ -3,14 +3,69 @@ from __future__ import annotations
 import cv2
 from pathlib import Path
 
+from tools.ffmpeg_capture import FFmpegCapture
+
+
+# Backends de captura: OpenCV en el mismo proceso, o FFmpeg en un subproceso que entrega los cuadros ya reducidos
+CAPTURE_BACKENDS = ("opencv", "ffmpeg")
+
+
+def open_capture(source: str, timeout_ms: int = 10000, options: dict = None) -> cv2.VideoCapture:
+    """Abre una fuente de video con tiempos de espera acotados.
+
+    args:
+        source (str): URL de la cámara, índice de webcam o archivo de video.
+        timeout_ms (int, optional): Espera máxima de apertura y de lectura en milisegundos.
+        options (dict, optional): Llave "capture" de camera_config.json: backend, max_size,
+            substream, source_wh, hwaccel y threads. Por defecto OpenCV a la resolución original.
+    returns:
+        cv2.VideoCapture: Captura de OpenCV, o FFmpegCapture con la misma interfaz; puede no estar abierta.
+    """
+    options = options or {}
+    backend = options.get("backend", "opencv")
+    if backend not in CAPTURE_BACKENDS:
+        raise ValueError(f"Backend de captura no válido: {backend}. Opciones: {', '.join(CAPTURE_BACKENDS)}")
+
+    # El substream de la cámara (por ejemplo el de menor resolución) reemplaza a la URL principal
+    source = str(options.get("substream") or source)
+    if backend == "ffmpeg" and not source.isnumeric():
+        return FFmpegCapture(
+            source,
+            max_size=options.get("max_size"),
+            timeout_ms=timeout_ms,
+            hwaccel=options.get("hwaccel"),
+            threads=options.get("threads") )
+    if source.isnumeric():
+        return cv2.VideoCapture(int(source))
+    return cv2.VideoCapture(source, cv2.CAP_ANY, [
+        cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+        cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms ])
+
+
 class VideoInfo:
     """Clase para obtener información del video fuente.
+
+    Con `keep_open=True` la captura usada para leer la información queda
+    abierta en `capture`, para que la transmisión la reutilice sin repetir
+    la negociación RTSP.
+
+    Con un backend que reduce los cuadros, `width` y `height` son los de los
+    cuadros entregados; las coordenadas de camera_config.json, en la
+    resolución de la cámara, se convierten con `scale_polygon`.
+
+    Con un substream la resolución de la cámara no se puede leer del stream
+    abierto: se toma de `capture.source_wh`, la resolución del stream
+    principal en la que están las coordenadas de la región.
+
     attributes:
         source (str): URL de la cámara o archivo de video.
-        width (int): Ancho del video.
-        height (int): Alto del video.
+        width (int): Ancho de los cuadros entregados.
+        height (int): Alto de los cuadros entregados.
+        source_wh (tuple[int, int]): Resolución original de la cámara, la de las coordenadas de la región.
         fps (float): Cuadros por segundo del video.
         total_frames (int): Total de cuadros del video.
+        capture (cv2.VideoCapture): Captura abierta, o None si se liberó.
+        capture_options (dict): Opciones de la captura (backend, max_size, substream, source_wh, hwaccel, threads).
     """
     def __init__(
         self,
@@ -18,13 +73,19 @@ class VideoInfo:
         width: int = 0,
         height: int = 0,
         fps: float = 0,
-        total_frames: int = None
+        total_frames: int = None,
+        keep_open: bool = False,
+        capture_options: dict = None
     ) -> None:
         self.source = source
         self.width = width
         self.height = height
         self.fps = fps
         self.total_frames = total_frames
+        self.keep_open = keep_open
+        self.capture_options = capture_options
+        self.capture = None
+        self.source_wh = (width, height)
 
         self.get_source_info()
 
@@ -33,6 +94,23 @@ class VideoInfo:
         return self.width, self.height
 
 
+    @property
+    def scale(self) -> float:
+        """Escala de los cuadros entregados respecto a la resolución de la cámara."""
+        return self.width / self.source_wh[0] if self.source_wh[0] else 1.0
+
+
+    def scale_polygon(self, polygon: list) -> list:
+        """Convierte un polígono en coordenadas de la cámara a coordenadas de los cuadros entregados.
+
+        Cada eje se escala por separado, porque un substream puede tener otra proporción que el stream principal.
+        """
+        if polygon is None or not all(self.source_wh) or self.source_wh == self.resolution_wh:
+            return polygon
+        scale_x, scale_y = self.width / self.source_wh[0], self.height / self.source_wh[1]
+        return [[x * scale_x, y * scale_y] for x, y in polygon]
+
+
     def get_source_info(self) -> VideoInfo:
         """Obtiene información del video fuente."""
         if self.source.isnumeric():
@@ -48,12 +126,19 @@ class VideoInfo:
             self.source_type = 'file'
             video_source = self.source
 
-        cap = cv2.VideoCapture(video_source)
+        cap = open_capture(video_source, options=self.capture_options)
         if not cap.isOpened(): raise Exception('Source video not available ❌')
 
         self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         self.fps = cap.get(cv2.CAP_PROP_FPS)
         self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if self.source_type == 'file' else None
-        
-        cap.release()
+        self.source_wh = getattr(cap, "source_wh", self.resolution_wh)
+        if (self.capture_options or {}).get("substream"):
+            # La resolución leída es la del substream; las coordenadas están en la del stream principal
+            self.source_wh = tuple(self.capture_options["source_wh"])
+
+        if self.keep_open:
+            self.capture = cap
+        else:
+            cap.release()
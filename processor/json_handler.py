@@ -3,6 +3,7 @@ import time
 import threading
 
 from config import BASE_DIR
+from validators.detection_ids import records_between
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
@@ -55,19 +56,44 @@ class JSONHandler(FileSystemEventHandler):
         print(f"Eliminación programada: {os.path.basename(file_path)}")
 
 
+def expire_records(carpeta: str, tiempo: int) -> int:
+    """
+    Elimina los registros JSON cuyo objeto apareció hace más de `tiempo`
+    segundos. Las eliminaciones programadas se pierden al reiniciar el
+    procesador, así que los registros de antes del reinicio se eliminan aquí.
+
+    args:
+        carpeta (str): Carpeta de los registros.
+        tiempo (int): Tiempo en segundos antes de eliminar el archivo JSON.
+    returns:
+        int: Registros eliminados.
+    """
+    expired = records_between(0, time.time() - tiempo, carpeta)
+    for file_path in expired:
+        try:
+            os.remove(file_path)
+        except Exception as e:
+            print(f"Error de eliminación {file_path}: {str(e)}")
+    if expired:
+        print(f"Registros vencidos eliminados: {len(expired)}")
+    return len(expired)
+
+
 def monitor_folder(
         carpeta: str = str(BASE_DIR.resolve()),
         tiempo: int = 900
     ) -> None:
     """
     Monitorea una carpeta en busca de archivos JSON y los elimina después de un
-    tiempo, definido en segundos.
+    tiempo, definido en segundos. Al iniciar elimina los registros que vencieron
+    mientras el procesador estaba detenido.
 
     args:
         tiempo (int): Tiempo en segundos antes de eliminar el archivo JSON.
             Por defecto es 900 segundos (15 minutos).
     """
 
+    expire_records(carpeta, tiempo)
     event_handler = JSONHandler(
         carpeta = carpeta,
         tiempo = tiempo
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+from typing import List
+
+try:
+    from common.detection_ids import is_sortable_id, time_range
+except ImportError:
+    # Fuera del contenedor, common/ está en la raíz del repositorio
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from common.detection_ids import is_sortable_id, time_range
+
+
+def records_between(start: float, end: float, folder: Path = Path(".")) -> List[Path]:
+    """Registros de detección guardados cuya hora de aparición está en [start, end).
+
+    args:
+        start (float): Hora inicial, en segundos desde la época.
+        end (float): Hora final (excluida), en segundos desde la época.
+        folder (Path, optional): Carpeta de los registros {id}.json. Por defecto la carpeta actual.
+    returns:
+        List[Path]: Registros ordenados por hora.
+    """
+    lower, upper = time_range(start, end)
+    return sorted(path for path in Path(folder).glob("*.json") if is_sortable_id(path.stem) and lower <= path.stem < upper)
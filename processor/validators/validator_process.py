@@ -1,11 +1,45 @@
 import json
-import pandas as pd
 from pathlib import Path
 from config import BUFFER_QUEUE
 from clients.redis_client import redis_client
 from clients.websocket_client import send_to_alert_device
 
 
+# Eventos del ciclo de vida de los objetos seguidos por el detector
+EVENT_NEW = "nuevo"
+EVENT_ENDED = "finalizado"
+
+
+def expand_frame_message(frame_message: dict) -> list:
+    """Convierte un mensaje de cuadro en registros por detección.
+
+    Cada registro apunta a la imagen compartida del cuadro mediante
+    `id_imagen`, sin copiar la imagen. También acepta el formato anterior de
+    una detección por mensaje, que se trata como un cuadro de una detección.
+
+    args:
+        frame_message (dict): Mensaje del detector, sin la imagen.
+    returns:
+        list: Registros de detección.
+    """
+    if "detecciones" not in frame_message:
+        frame_message = {
+            **frame_message,
+            "id_imagen": frame_message.get("id"),
+            "detecciones": [{key: frame_message[key] for key in ("id", "confianza", "clase") if key in frame_message}]
+        }
+
+    return [
+        {
+            "nombre_camara": frame_message.get("nombre_camara"),
+            "tiempo": frame_message.get("tiempo"),
+            "id_imagen": frame_message.get("id_imagen"),
+            **detection
+        }
+        for detection in frame_message["detecciones"]
+    ]
+
+
 def process_message(detections_json, threshold):
     """Procesa un mensaje individual."""
     try:
@@ -16,19 +50,40 @@ def process_message(detections_json, threshold):
         if isinstance(detections_data, dict):
             detections_data = [detections_data]
 
-        # Crear DataFrame desde lista
-        detections_df = pd.DataFrame(detections_data)
+        # Procesar cada cuadro: la imagen se conserva una sola vez por cuadro
+        for frame_message in detections_data:
+            image = frame_message.pop("imagen", "")
+            new_records = []
+
+            for detection in expand_frame_message(frame_message):
+                # La miniatura viaja con la alerta pero no se guarda en el registro del objeto
+                thumbnail = detection.pop("miniatura", None)
+                detection_file = Path(f"{detection['id']}.json")
+                event = detection.get("evento", EVENT_NEW)
+
+                if detection_file.exists():
+                    # Los eventos posteriores de un objeto ya alertado solo actualizan su registro
+                    if event != EVENT_NEW:
+                        stored_detection = json.loads(detection_file.read_text())
+                        stored_detection.update(detection)
+                        detection_file.write_text(json.dumps(stored_detection))
 
-        # Procesar cada detección
-        for _, detection in detections_df.iterrows():
-            if detection['confianza'] > threshold:
-                detection_id = detection['id']
+                # Alertar la primera vez que el objeto supera el umbral, aunque
+                # ocurra en un evento posterior a su aparición
+                elif detection['confianza'] > threshold and event != EVENT_ENDED:
+                    with open(detection_file, 'w') as f:
+                        json.dump(detection, f)
+                    new_records.append(detection if thumbnail is None else {**detection, "miniatura": thumbnail})
 
-                # Guardar detección en archivo si no existe
-                if not Path(f"{detection_id}.json").exists():
-                    with open(f"{detection_id}.json", 'w') as f:
-                        f.write(detection.to_json())
-                    send_to_alert_device(detection.to_json())
+            # Enviar las detecciones nuevas del cuadro con su imagen compartida
+            if new_records:
+                send_to_alert_device(json.dumps({
+                    "nombre_camara": frame_message.get("nombre_camara"),
+                    "tiempo": frame_message.get("tiempo"),
+                    "id_imagen": new_records[0]["id_imagen"],
+                    "imagen": image,
+                    "detecciones": new_records
+                }))
 
         # Procesar mensajes acumulados en BUFFER_QUEUE
         buffered_messages = redis_client.lrange(BUFFER_QUEUE, 0, -1)  # Leer todos los mensajes en la cola
@@ -43,13 +43,19 @@ async def handle_detections(websocket):
     
         # Se obtienen del JSON los valores necesarios
         caid = data.get("nombre_camara", "")
-        id = data.get("id", "")
         frame = data.get("imagen", "")
-        confidence = data.get("confianza", 0.0)
-        detection_class = data.get("clase", "")
         detection_time = data.get("tiempo", "")
-        detection_report(id, caid, frame, confidence, detection_class, detection_time)
-        plot_dispatcher(caid, detection_time,detection_class, frame)
+
+        # Un mensaje por cuadro: todas las detecciones comparten la misma imagen.
+        # El formato anterior (una detección por mensaje) se trata como un cuadro de una detección.
+        id_image = data.get("id_imagen", data.get("id", ""))
+        detections = data.get("detecciones", [data])
+        for detection in detections:
+            id = detection.get("id", "")
+            confidence = detection.get("confianza", 0.0)
+            detection_class = detection.get("clase", "")
+            detection_report(id, caid, frame, confidence, detection_class, detection_time, id_image=id_image)
+            plot_dispatcher(caid, detection_time,detection_class, frame)
         await websocket.send("Detección recibida") 
 
 async def main_handler(websocket, path):
@@ -24,6 +24,35 @@ import datetime as dt
 from config import CLASSES
 
 
+# Columnas de detections.csv; los archivos anteriores no tienen "imagen"
+DETECTIONS_HEADER = ["id", "camara", "confianza", "clase", "tiempo", "imagen"]
+
+
+def migrate_detections_csv(csv_file):
+    """
+    Agrega la columna "imagen" a un detections.csv escrito con el encabezado
+    anterior, para que todas sus filas tengan las mismas columnas. Antes cada
+    detección guardaba su propia imagen, así que las filas previas apuntan a
+    la imagen con su ID.
+
+    Args:
+        csv_file: Ruta al archivo CSV existente.
+    """
+    with open(csv_file, newline="") as f:
+        reader = csv.reader(f)
+        if next(reader, None) != DETECTIONS_HEADER[:-1]:
+            return
+        rows = [row + [row[0]] for row in reader if row]
+
+    # Reescribir en un archivo temporal y reemplazar el original
+    tmp_file = csv_file + ".tmp"
+    with open(tmp_file, mode="w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(DETECTIONS_HEADER)
+        writer.writerows(rows)
+    os.replace(tmp_file, csv_file)
+
+
 def detection_report(
     id_detection,
     id_camera,
@@ -31,14 +60,20 @@ def detection_report(
     confidence,
     detection_class,
     time_detection,
+    id_image=None,
 ):
     """
     Maneja los mensajes recibidos por WebSocket, decodifica los datos de detección en formato JSON,
     y registra los datos en un archivo CSV.
 
+    Las detecciones de un mismo cuadro comparten la imagen `id_image`, que se
+    guarda una sola vez; cada fila del CSV apunta a ella.
+
     Args:
         websocket: Conexión WebSocket desde la cual se reciben los datos de detección.
+        id_image: ID de la imagen compartida del cuadro. Por defecto es el ID de la detección.
     """
+    id_image = id_image or id_detection
 
     # Obtener fecha actual y construir carpeta para los csv y las imágenes
     fecha = datetime.now().strftime("%Y-%m-%d")
@@ -53,28 +88,32 @@ def detection_report(
     os.makedirs(carpeta, exist_ok=True)
     os.makedirs(imgcarpeta, exist_ok=True)
 
-    try:
-        # Decodificar la imagen desde base64
-        image = Image.open(BytesIO(base64.b64decode(frame_detection)))
+    # La imagen del cuadro se guarda solo con la primera detección del mismo cuadro
+    file_img = os.path.join(imgcarpeta, f"{id_image}.png")
+    if not os.path.exists(file_img):
+        try:
+            # Decodificar la imagen desde base64
+            image = Image.open(BytesIO(base64.b64decode(frame_detection)))
 
-        # Convertir la imagen a bytes (por ejemplo, en formato PNG)
-        img_byte_arr = io.BytesIO()
-        image.save(img_byte_arr, format="PNG")
-        img_bytes = img_byte_arr.getvalue()
-        file_img = os.path.join(imgcarpeta, f"{id_detection}.png")
-        if not frame_detection:
-            raise ValueError("La imagen está vacía.")
+            # Convertir la imagen a bytes (por ejemplo, en formato PNG)
+            img_byte_arr = io.BytesIO()
+            image.save(img_byte_arr, format="PNG")
+            img_bytes = img_byte_arr.getvalue()
+            if not frame_detection:
+                raise ValueError("La imagen está vacía.")
 
-        with open(file_img, "wb") as fg:
-            fg.write(img_bytes)
+            with open(file_img, "wb") as fg:
+                fg.write(img_bytes)
 
 
-    except (ValueError, UnidentifiedImageError, base64.binascii.Error) as e:
-        print(f"Error al procesar la imagen: {e}")
+        except (ValueError, UnidentifiedImageError, base64.binascii.Error) as e:
+            print(f"Error al procesar la imagen: {e}")
 
     # Ruta al archivo CSV
     csv_file = os.path.join(carpeta, "detections.csv")
     new_file = not os.path.exists(csv_file)
+    if not new_file:
+        migrate_detections_csv(csv_file)
     clase_key = detection_class.lower()
     class_name = CLASSES.get(clase_key, {}).get("name", "indefinida").upper()
 
@@ -82,17 +121,9 @@ def detection_report(
     with open(csv_file, mode="a", newline="") as f:
         writer = csv.writer(f)
         if new_file:
-            writer.writerow(
-                [
-                    "id",
-                    "camara",
-                    "confianza",
-                    "clase",
-                    "tiempo",
-                ]
-            )
+            writer.writerow(DETECTIONS_HEADER)
         writer.writerow(
-            [id_detection, id_camera, confidence, class_name, time_detection]
+            [id_detection, id_camera, confidence, class_name, time_detection, id_image]
         )
 
 
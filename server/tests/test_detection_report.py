@@ -47,3 +47,25 @@ def test_detection_report(
 
     # Verificar que se llamó plot_dispatcher
     assert mock_plot_dispatcher.called
+
+
+def test_migrate_detections_csv(tmp_path):
+    from server.storage_controller import DETECTIONS_HEADER, migrate_detections_csv
+    import csv
+
+    # Un detections.csv escrito antes de la columna "imagen"
+    csv_file = tmp_path / "detections.csv"
+    csv_file.write_text("id,camara,confianza,clase,tiempo\r\nabc123,1,0.9,AUTO,12:00\r\n")
+
+    migrate_detections_csv(str(csv_file))
+    migrate_detections_csv(str(csv_file))
+    with open(csv_file, mode="a", newline="") as f:
+        csv.writer(f).writerow(["def456", "1", "0.8", "BUS", "12:01", "abc123"])
+
+    # Todas las filas tienen las mismas columnas; las anteriores apuntan a su propia imagen
+    with open(csv_file, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == DETECTIONS_HEADER
+    assert [row["imagen"] for row in rows] == ["abc123", "abc123"]
+    assert None not in rows[1]
+